@@ -30,6 +30,9 @@ from datetime import datetime
 import os
 import sys
 import codecs
+from vivofoundation import RdfWriter
+
+RDF_COMPRESS = False # write the add file gzip compressed, as .gz
 
 action_report = {} # determine the action to be taken for each UFID
 
@@ -39,8 +42,7 @@ debug = False
 sample = 1.0 # Fraction of records to be processed.  Set to 1.0 to process all
 
 file_name = "courses"
-add_file = codecs.open(file_name+"_add.rdf", mode='w', encoding='ascii',
-                       errors='xmlcharrefreplace')
+add_file = RdfWriter(file_name+"_add.rdf", compress=RDF_COMPRESS)
 pos_file = codecs.open(file_name+"_pos.txt", mode='w', encoding='ascii',
                        errors='xmlcharrefreplace')
 log_file = codecs.open(file_name+"_log.txt", mode='w', encoding='ascii',
@@ -49,8 +51,6 @@ exc_file = codecs.open(file_name+"_exc.txt", mode='w', encoding='ascii',
                        errors='xmlcharrefreplace')
 add_ufid = {}
 
-print >>add_file, vt.rdf_header()
-
 print >>log_file, datetime.now(), "Course ingest. Version", __version__,\
     "VIVOTools", vt.__version__
 print >>log_file, datetime.now(), "Make UF Taught Dictionary"
@@ -152,7 +152,6 @@ for ufid in sorted(add_ufid.keys()):
         "NULL" + "|" + "NULL" + "|" + "NULL" + "|" + "NULL" + "|" + \
         "NULL" + "|" + "0"
 
-print >>add_file, vt.rdf_footer()
 print >>log_file, datetime.now(), "End Processing"
 
 add_file.close()
@@ -41,6 +41,9 @@ import sys
 import os
 import vivotools as vt
 import codecs
+from vivofoundation import RdfWriter
+
+RDF_COMPRESS = False # write the add and sub files gzip compressed, as .gz
 
 def make_dsp_dictionary(file_name="grant_data.csv", debug=False):
     """
@@ -229,10 +232,8 @@ else:
     dsp_file_name = "vivo_grants.txt"
 file_name, file_extension = os.path.splitext(dsp_file_name)
 
-add_file = codecs.open(file_name+"_add.rdf", mode='w', encoding='ascii',
-                       errors='xmlcharrefreplace')
-sub_file = codecs.open(file_name+"_sub.rdf", mode='w', encoding='ascii',
-                       errors='xmlcharrefreplace')
+add_file = RdfWriter(file_name+"_add.rdf", compress=RDF_COMPRESS)
+sub_file = RdfWriter(file_name+"_sub.rdf", compress=RDF_COMPRESS)
 log_file = codecs.open(file_name+"_log.txt", mode='w', encoding='ascii',
                        errors='xmlcharrefreplace')
 exc_file = codecs.open(file_name+"_exc.txt", mode='w', encoding='ascii',
@@ -241,9 +242,6 @@ exc_file = codecs.open(file_name+"_exc.txt", mode='w', encoding='ascii',
 print >>log_file, datetime.now(), "Grant Ingest Version", __version__
 print >>log_file, datetime.now(), "VIVO Tools Version", vt.__version__
 
-add_file.write(vt.rdf_header())
-sub_file.write(vt.rdf_header())
-
 print >>log_file, datetime.now(), "Make VIVO DeptID Dictionary"
 deptid_dictionary = vt.make_deptid_dictionary(debug=debug)
 print >>log_file, datetime.now(), "VIVO deptid dictionary has ", \
@@ -378,8 +376,6 @@ for pcn in sorted(action_report.keys()):
 
 #   Done processing the Grants.  Wrap-up
 
-add_file.write(vt.rdf_footer())
-sub_file.write(vt.rdf_footer())
 print >>log_file, datetime.now(), "End Processing"
 
 add_file.close()
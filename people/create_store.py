@@ -0,0 +1,52 @@
+#!/usr/bin/env/python
+
+"""
+    create_store.py: Create the store of source data for person ingest.  Each
+    source file is loaded into its own indexed table of person_ingest.db.
+    Sources whose files have not changed since they were last loaded are not
+    loaded again.  Use -f to reload every source.
+
+    Version 0.1 MC 2014-07-27
+     -- replaces create_shelves.py.  Six sources, one store
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from datetime import datetime
+from vivofoundation import CsvStore
+import sys
+
+#   Start here
+
+print datetime.now(), "Start"
+
+force = len(sys.argv) > 1 and sys.argv[1] == '-f'
+
+# name, source file, key column, columns to keep (None for all)
+
+sources = [
+    ['contact', 'contact_data.txt', 'UFID', None],
+    ['deptid_exceptions', 'deptid_exceptions_data.txt', 'deptid_pattern',
+        None],
+    ['ufid_exceptions', 'ufid_exceptions_data.txt', 'ufid', None],
+    ['uri_exceptions', 'uri_exceptions_data.txt', 'uri', None],
+    ['position_exceptions', 'position_exceptions_data.txt',
+        'position_title', None],
+    ['privacy', 'privacy1_data.txt', 'UFID', ['UFID', 'UF_PROTECT_FLG']]
+    ]
+
+store = CsvStore('person_ingest.db')
+for [name, file_name, key, columns] in sources:
+    count = store.load(name, file_name, key, columns=columns, force=force)
+    if count is None:
+        print datetime.now(), name, 'unchanged.', len(store.table(name)), \
+            'entries'
+    else:
+        print datetime.now(), name, 'loaded from', file_name + '.', \
+            len(store.table(name)), 'entries'
+store.close()
+
+print datetime.now(), "End"
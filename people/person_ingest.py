@@ -37,10 +37,10 @@ __copyright__ = "Copyright 2014, University of Florida"
 __license__ = "BSD 3-Clause license"
 __version__ = "2.00"
 
-from vivofoundation import rdf_header
-from vivofoundation import rdf_footer
+from vivofoundation import RdfWriter
+from vivofoundation import threaded_map
 
-from vivopeople import get_person
+from vivopeople import read_person
 from vivopeople import add_person
 from vivopeople import update_person
 
@@ -54,57 +54,94 @@ import vivofoundation as vf
 __harvest_text__ = "Python Person Ingest " + __version__
 __harvest_time__ = datetime.now().isoformat()
 
+PREPARE_CHUNK_SIZE = 250 # positions prepared together, in one worker
+RDF_CHUNK_TRIPLES = 0 # triples per add and sub file. 0 for a single file
+RDF_COMPRESS = False # write the add and sub files gzip compressed, as .gz
+
+lookups = {}
+
+class DeptidMatcher(object):
+    """
+    Deptid exception patterns, compiled once.  Patterns that are a literal
+    prefix, such as ^1180, are held in a table by prefix length.  All other
+    patterns are compiled one by one and tried in turn.
+    """
+    def __init__(self, patterns):
+        import re
+        self.prefixes = {}
+        self.patterns = []
+        for pattern in patterns:
+            if re.match(r'\^[0-9A-Za-z]+$', pattern):
+                prefix = pattern[1:]
+                self.prefixes.setdefault(len(prefix), {})[prefix] = pattern
+            else:
+                self.patterns.append(pattern)
+        self.lengths = sorted(self.prefixes.keys())
+        self.regexes = [re.compile(pattern) for pattern in self.patterns]
+
+    def match(self, deptid):
+        """
+        Return the exception pattern that matches deptid, or None if no
+        pattern matches
+        """
+        for length in self.lengths:
+            pattern = self.prefixes[length].get(deptid[0:length], None)
+            if pattern is not None:
+                return pattern
+        i = 0
+        while i < len(self.regexes):
+            if self.regexes[i].search(deptid) is not None:
+                return self.patterns[i]
+            i = i + 1
+        return None
+
 def ok_deptid(deptid, deptid_exceptions):
     """
-    Some deptids are in an exception dictionary of patterns.  If a person is
+    Some deptids are in an exception list of patterns.  If a person is
     in one of these departments, they will not be listed in VIVO.
 
-    Deptids in the exception dictionary are regular expressions
+    Deptids in the exception list are regular expressions, held in a
+    DeptidMatcher
 
     Given a dept id, the deptid exception list is checked.  True is
     returned if the deptid is not matched.  False is returned
     if the deptid is matched.
     """
-    import re
-    ok = True
-    for pattern_string in deptid_exceptions.keys():
-        pattern = re.compile(pattern_string)
-        if pattern.search(deptid) is not None:
-            ok = False
-            break
-    return ok
+    return deptid_exceptions.match(deptid) is None
 
 # Prepare, add, update
 
-def prepare_people(position_file_name):
+def open_lookups(store_file_name):
     """
-    Given a UF position file, return a list of people to be added to VIVO.
-    Process each data value.  Reject bad values.  Return clean data ready
-    to add. If more than one position qualifies for inclusion, use the last
-    one in the file.
-
-    Field by field.  Check.  Improve.  Dereference. Generate exceptions.
-    The result should be clean, complete data, ready to be added.
-
-    Requires
-    -- a shelve of privacy data keyed by UFID containing privacy flags
-    -- a shelve of contact data keyed by UFID
-    -- a shelve of deptid exception patterns
-    -- a shelve of UFIDs that will not be touched in VIVO
-    -- a shelve of URI that will not be touched in VIVO
+    Open the tables of the person ingest store into lookups.  Each worker
+    process of prepare_people opens its own connection to the store.
+    Return the store.
+    """
+    from vivofoundation import CsvStore
+    store = CsvStore(store_file_name)
+    lookups['privacy'] = store.table('privacy')
+    lookups['contact'] = store.table('contact')
+    lookups['deptid_exceptions'] = \
+        DeptidMatcher(store.table('deptid_exceptions').keys())
+    lookups['ufid_exceptions'] = store.table('ufid_exceptions')
+    lookups['uri_exceptions'] = store.table('uri_exceptions')
+    lookups['position_exceptions'] = store.table('position_exceptions')
+    return store
+
+def prepare_person(position):
+    """
+    Given a row of UF position data, check, improve and dereference each
+    data value.  Return the person, or None if there are errors, and a list
+    of lines for the exception file.  Lookups must be open.
     """
-    import shelve
-    from vivofoundation import read_csv
     from vivofoundation import find_vivo_uri
-    from vivofoundation import get_vivo_uri
     from vivofoundation import untag_predicate
     from vivofoundation import comma_space
     from vivopeople import improve_jobcode_description
     from vivopeople import get_position_type
     from vivopeople import repair_phone_number
     from vivopeople import repair_email
-    from operator import itemgetter
-    
+
     person_type_table = {
         'faculty':'vivo:FacultyMember',
         'postdoc':'vivo:Postdoc',
@@ -114,168 +151,271 @@ def prepare_people(position_file_name):
         'temp-faculty':'ufv:TemporaryFaculty',
         'non-academic':'vivo:NonAcademic'
         }
-    privacy = shelve.open('privacy')
-    contact = shelve.open('contact')
-    deptid_exceptions = shelve.open('deptid_exceptions')
-    ufid_exceptions = shelve.open('ufid_exceptions')
-    uri_exceptions = shelve.open('uri_exceptions')
-    position_exceptions = shelve.open('position_exceptions')
-    people = {}
-    positions = read_csv(position_file_name)
-    for row, position in sorted(positions.items(), key=itemgetter(1)):
-        anyerrors = False
-        person = {}
-        ufid = str(position['UFID'])
-        
-        if ufid in ufid_exceptions:
-            exc_file.write(ufid+' in ufid_exceptions.  Will be skipped.\n')
-            anyerrors = True
-        else:   
-            person['ufid'] = ufid
-        
-        person['uri'] = find_vivo_uri('ufv:ufid', ufid)
-        if person['uri'] is not None and str(person['uri']) in uri_exceptions:
-            exc_file.write(person['uri']+' in uri_exceptions.'+\
-            '  Will be skipped.\n')
-            anyerrors = True
-            
-        person['hr_position'] = position['HR_POSITION'] == "1"
+    privacy = lookups['privacy']
+    contact = lookups['contact']
+    deptid_exceptions = lookups['deptid_exceptions']
+    ufid_exceptions = lookups['ufid_exceptions']
+    uri_exceptions = lookups['uri_exceptions']
+    position_exceptions = lookups['position_exceptions']
+    exc = []
+    anyerrors = False
+    person = {}
+    ufid = str(position['UFID'])
+    
+    if ufid in ufid_exceptions:
+        exc.append(ufid+' in ufid_exceptions.  Will be skipped.\n')
+        anyerrors = True
+    else:   
+        person['ufid'] = ufid
+    
+    person['uri'] = find_vivo_uri('ufv:ufid', ufid)
+    if person['uri'] is not None and str(person['uri']) in uri_exceptions:
+        exc.append(person['uri']+' in uri_exceptions.'+\
+        '  Will be skipped.\n')
+        anyerrors = True
         
-        if ok_deptid(position['DEPTID'], deptid_exceptions):
-            person['position_deptid'] = position['DEPTID']
-            depturi = find_vivo_uri('ufv:deptID', position['DEPTID'])
-            person['position_orguri'] = depturi
-            if depturi is None:
-                exc_file.write(ufid+' has deptid ' + position['DEPTID'] +\
-                               ' not found.\n')
-                anyerrors = True
-        else:
-            exc_file.write(ufid+' has position in department '+\
-                position['DEPTID']+' which is on the department exception '+
-                ' list.  No position will be added.\n')
-            anyerrors = True
-        if person['hr_position'] == True:
-            person['position_type'] = \
-                get_position_type(position['SAL_ADMIN_PLAN'])
-            if person['position_type'] is None:
-                exc_file.write(ufid+' invalid salary plan '+\
-                               position['SAL_ADMIN_PLAN']+'\n')
-                anyerrors = True
-        else:
-            person['position_type'] = None
-        if person['position_type'] in person_type_table:
-            person['person_type'] = \
-                untag_predicate(person_type_table[\
-                    person['position_type']])
-        elif person['position_type'] is not None:
-            exc_file.write(ufid+' has position type ' +
-                person['position_type']+' not in person_type_table\n')
+    person['hr_position'] = position['HR_POSITION'] == "1"
+    
+    pattern = deptid_exceptions.match(position['DEPTID'])
+    if pattern is None:
+        person['position_deptid'] = position['DEPTID']
+        depturi = find_vivo_uri('ufv:deptID', position['DEPTID'])
+        person['position_orguri'] = depturi
+        if depturi is None:
+            exc.append(ufid+' has deptid ' + position['DEPTID'] +\
+                           ' not found.\n')
             anyerrors = True
-        if ufid not in privacy:
-            exc_file.write(ufid+' not found in privacy data\n')
+    else:
+        exc.append(ufid+' has position in department '+\
+            position['DEPTID']+' which is on the department exception '+
+            ' list (pattern '+pattern+').  No position will be added.\n')
+        anyerrors = True
+    if person['hr_position'] == True:
+        person['position_type'] = \
+            get_position_type(position['SAL_ADMIN_PLAN'])
+        if person['position_type'] is None:
+            exc.append(ufid+' invalid salary plan '+\
+                           position['SAL_ADMIN_PLAN']+'\n')
             anyerrors = True
-        else:
-            person['privacy_flag'] = privacy[ufid]['UF_PROTECT_FLG']
-            if person['privacy_flag'] == 'Y':
-                exc_file.write(ufid+' has protect flag Y\n')
-                anyerrors = True
-        if ufid not in contact:
-            exc_file.write(ufid+' not found in contact data\n')
+    else:
+        person['position_type'] = None
+    if person['position_type'] in person_type_table:
+        person['person_type'] = \
+            untag_predicate(person_type_table[\
+                person['position_type']])
+    elif person['position_type'] is not None:
+        exc.append(ufid+' has position type ' +
+            person['position_type']+' not in person_type_table\n')
+        anyerrors = True
+    if ufid not in privacy:
+        exc.append(ufid+' not found in privacy data\n')
+        anyerrors = True
+    else:
+        person['privacy_flag'] = privacy[ufid]['UF_PROTECT_FLG']
+        if person['privacy_flag'] == 'Y':
+            exc.append(ufid+' has protect flag Y\n')
             anyerrors = True
-        else:
-            info = contact[ufid]
+    if ufid not in contact:
+        exc.append(ufid+' not found in contact data\n')
+        anyerrors = True
+    else:
+        info = contact[ufid]
 
-            if info['FIRST_NAME'].title() != '':
-                person['given_name'] = info['FIRST_NAME'].title()
+        if info['FIRST_NAME'].title() != '':
+            person['given_name'] = info['FIRST_NAME'].title()
 
-            if info['LAST_NAME'].title() != '':
-                person['family_name'] = info['LAST_NAME'].title()
+        if info['LAST_NAME'].title() != '':
+            person['family_name'] = info['LAST_NAME'].title()
 
-            if info['MIDDLE_NAME'].title() != '':
-                person['additional_name'] = info['MIDDLE_NAME'].title()
+        if info['MIDDLE_NAME'].title() != '':
+            person['additional_name'] = info['MIDDLE_NAME'].title()
 
-            if info['NAME_SUFFIX'].title() != '':
-                person['honorific_suffix'] = info['NAME_SUFFIX'].title()
+        if info['NAME_SUFFIX'].title() != '':
+            person['honorific_suffix'] = info['NAME_SUFFIX'].title()
 
-            if info['NAME_PREFIX'].title() != '':
-                person['honorific_prefix'] = info['NAME_PREFIX'].title()
+        if info['NAME_PREFIX'].title() != '':
+            person['honorific_prefix'] = info['NAME_PREFIX'].title()
 
-            if info['DISPLAY_NAME'] != '':
-                person['display_name'] = comma_space(info['DISPLAY_NAME'].\
-                                                     title())
+        if info['DISPLAY_NAME'] != '':
+            person['display_name'] = comma_space(info['DISPLAY_NAME'].\
+                                                 title())
 
-            if info['GATORLINK'] != '':
-                person['gatorlink'] = info['GATORLINK'].lower()
+        if info['GATORLINK'] != '':
+            person['gatorlink'] = info['GATORLINK'].lower()
 
-            if info['WORKINGTITLE'] != '':
-                if info['WORKINGTITLE'].upper() == info['WORKINGTITLE']:
-                    person['title'] = \
-                        improve_jobcode_description(\
-                            position['JOBCODE_DESCRIPTION'])
-                else:
-                    person['preferred_title'] = info['WORKINGTITLE']
-                    
-            if info['UF_BUSINESS_EMAIL'] != '':
-                person['primary_email'] = \
-                                        repair_email(info['UF_BUSINESS_EMAIL'])
-            if info['UF_BUSINESS_PHONE'] != '':
-                person['phone'] = repair_phone_number(info['UF_BUSINESS_PHONE'])
-                
-            if info['UF_BUSINESS_FAX'] != '':
-                person['fax'] = repair_phone_number(info['UF_BUSINESS_FAX'])
-                    
-            if ok_deptid(info['HOME_DEPT'], deptid_exceptions):
-                person['home_deptid'] = info['HOME_DEPT']
-                homedept_uri = find_vivo_uri('ufv:deptID', info['HOME_DEPT'])
-                person['homedept_uri'] = homedept_uri
-                if homedept_uri is None:
-                    exc_file.write(ufid + ' has home department deptid '+\
-                        info['HOME_DEPT'] + ' not found in VIVO\n')
-                    anyerrors = True
+        if info['WORKINGTITLE'] != '':
+            if info['WORKINGTITLE'].upper() == info['WORKINGTITLE']:
+                person['title'] = \
+                    improve_jobcode_description(\
+                        position['JOBCODE_DESCRIPTION'])
             else:
-                exc_file.write(ufid+' has home department on exception list.'+\
-                    ' This person will not be added to VIVO.\n')
+                person['preferred_title'] = info['WORKINGTITLE']
+                
+        if info['UF_BUSINESS_EMAIL'] != '':
+            person['primary_email'] = \
+                                    repair_email(info['UF_BUSINESS_EMAIL'])
+        if info['UF_BUSINESS_PHONE'] != '':
+            person['phone'] = repair_phone_number(info['UF_BUSINESS_PHONE'])
+            
+        if info['UF_BUSINESS_FAX'] != '':
+            person['fax'] = repair_phone_number(info['UF_BUSINESS_FAX'])
+                
+        pattern = deptid_exceptions.match(info['HOME_DEPT'])
+        if pattern is None:
+            person['home_deptid'] = info['HOME_DEPT']
+            homedept_uri = find_vivo_uri('ufv:deptID', info['HOME_DEPT'])
+            person['homedept_uri'] = homedept_uri
+            if homedept_uri is None:
+                exc.append(ufid + ' has home department deptid '+\
+                    info['HOME_DEPT'] + ' not found in VIVO\n')
                 anyerrors = True
+        else:
+            exc.append(ufid+' has home department on exception list'+\
+                ' (pattern '+pattern+').'+\
+                ' This person will not be added to VIVO.\n')
+            anyerrors = True
 
-        if position['START_DATE'] != '':
-            try:
-                person['start_date'] = datetime.strptime(position['START_DATE'],\
-                    '%Y-%m-%d')
-            except ValueError:
-                exc_file.write(ufid + ' invalid start date ' +\
-                               position['START_DATE']+'\n')
-                anyerrors = True
+    if position['START_DATE'] != '':
+        try:
+            person['start_date'] = datetime.strptime(position['START_DATE'],\
+                '%Y-%m-%d')
+        except ValueError:
+            exc.append(ufid + ' invalid start date ' +\
+                           position['START_DATE']+'\n')
+            anyerrors = True
 
-        if position['END_DATE'] != '':
-            try:
-                person['end_date'] = datetime.strptime(position['END_DATE'],\
-                    '%Y-%m-%d')
-            except ValueError:
-                exc_file.write(ufid + ' invalid end date ' +\
-                               position['END_DATE']+'\n')
-                anyerrors = True
+    if position['END_DATE'] != '':
+        try:
+            person['end_date'] = datetime.strptime(position['END_DATE'],\
+                '%Y-%m-%d')
+        except ValueError:
+            exc.append(ufid + ' invalid end date ' +\
+                           position['END_DATE']+'\n')
+            anyerrors = True
 
-        if position['JOBCODE_DESCRIPTION'] != '':            
-            person['position_label'] = \
-                improve_jobcode_description(position['JOBCODE_DESCRIPTION'])
-            if str(person['position_label']) in position_exceptions:
-                exc_file.write(ufid+' has position description '+
-                    person['position_label'] +\
-                    ' found in position exceptions.' +\
-                    'The position will not be added.\n')
-                anyerrors = True
-        person['date_harvested'] = __harvest_time__
-        person['harvested_by'] = __harvest_text__
-        if not anyerrors:
-            people[row] = person
-    privacy.close()
-    contact.close()
-    deptid_exceptions.close()
-    ufid_exceptions.close()
-    uri_exceptions.close()
-    position_exceptions.close()
+    if position['JOBCODE_DESCRIPTION'] != '':            
+        person['position_label'] = \
+            improve_jobcode_description(position['JOBCODE_DESCRIPTION'])
+        if str(person['position_label']) in position_exceptions:
+            exc.append(ufid+' has position description '+
+                person['position_label'] +\
+                ' found in position exceptions.' +\
+                'The position will not be added.\n')
+            anyerrors = True
+    person['date_harvested'] = __harvest_time__
+    person['harvested_by'] = __harvest_text__
+    if anyerrors:
+        person = None
+    return [person, exc]
+
+def prepare_chunk(chunk):
+    """
+    Given a list of [row, position], fetch the lookups for the UFIDs in
+    the list in batches and repair the phone numbers and emails of their
+    contact data in batches, then prepare each person.  Return a list of
+    [row, person, exc] in the order given.
+    """
+    from vivopeople import repair_phone_numbers
+    from vivopeople import repair_emails
+    ufids = []
+    for [row, position] in chunk:
+        ufids.append(str(position['UFID']))
+    lookups['privacy'].prefetch(ufids)
+    lookups['contact'].prefetch(ufids)
+    lookups['ufid_exceptions'].prefetch(ufids)
+
+    # prepare_person finds the repaired values remembered by vivopeople
+
+    contact = lookups['contact']
+    phones = []
+    emails = []
+    for ufid in ufids:
+        if ufid in contact:
+            info = contact[ufid]
+            for name in ['UF_BUSINESS_PHONE', 'UF_BUSINESS_FAX']:
+                if info[name] != '':
+                    phones.append(info[name])
+            if info['UF_BUSINESS_EMAIL'] != '':
+                emails.append(info['UF_BUSINESS_EMAIL'])
+    repair_phone_numbers(phones)
+    repair_emails(emails)
+    results = []
+    for [row, position] in chunk:
+        [person, exc] = prepare_person(position)
+        results.append([row, person, exc])
+    return results
+
+def prepare_people(position_file_name, processes=1,
+                   chunk_size=PREPARE_CHUNK_SIZE):
+    """
+    Given a UF position file, return a list of people to be added to VIVO.
+    Process each data value.  Reject bad values.  Return clean data ready
+    to add. If more than one position qualifies for inclusion, use the last
+    one in the file.
+
+    Field by field.  Check.  Improve.  Dereference. Generate exceptions.
+    The result should be clean, complete data, ready to be added.
+
+    Positions are prepared in chunks of chunk_size.  If processes is more
+    than one, chunks are prepared by a pool of that many worker processes.
+    People and exceptions are collected in the order of the position file
+    either way.
+
+    Requires person_ingest.db, made by create_store.py, with tables of
+    -- privacy data keyed by UFID containing privacy flags
+    -- contact data keyed by UFID
+    -- deptid exception patterns
+    -- UFIDs that will not be touched in VIVO
+    -- URI that will not be touched in VIVO
+    -- position titles that will not be added to VIVO
+    """
+    from vivofoundation import iter_csv
+    from vivofoundation import load_uri_index
+
+    position_columns = ['UFID', 'HR_POSITION', 'DEPTID', 'SAL_ADMIN_PLAN',
+        'JOBCODE_DESCRIPTION', 'START_DATE', 'END_DATE']
+    chunks = []
+    for row, position in iter_csv(position_file_name, position_columns):
+        if len(chunks) == 0 or len(chunks[-1]) == chunk_size:
+            chunks.append([])
+        chunks[-1].append([row, position])
+
+    # Worker processes inherit the uri indexes
+
+    load_uri_index('ufv:ufid')
+    load_uri_index('ufv:deptID')
+    if processes > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes, open_lookups,
+                                    ('person_ingest.db',))
+        results = pool.map(prepare_chunk, chunks)
+        pool.close()
+        pool.join()
+    else:
+        store = open_lookups('person_ingest.db')
+        results = map(prepare_chunk, chunks)
+        store.close()
+    people = {}
+    for chunk_results in results:
+        for [row, person, exc] in chunk_results:
+            for line in exc:
+                exc_file.write(line)
+            if person is not None:
+                people[row] = person
     return people
 
+def read_vivo_person(source_person):
+    """
+    Given a source person, return the source person and the person read
+    from VIVO, or None if the person is not in VIVO and is to be added.
+    Run by threaded_map so that many people are read at once
+    """
+    if 'uri' in source_person and source_person['uri'] is not None:
+        vivo_person = read_person(source_person['uri'])
+    else:
+        vivo_person = None
+    return [source_person, vivo_person]
+
 # Start here
 
 debug = True
@@ -283,32 +423,47 @@ if len(sys.argv) > 1:
     input_file_name = str(sys.argv[1])
 else:
     input_file_name = "position_test.txt"
-file_name, file_extension = os.path.splitext(input_file_name)
-
-add_file = codecs.open(file_name+"_add.rdf", mode='w', encoding='ascii',
-                       errors='xmlcharrefreplace')
-sub_file = codecs.open(file_name+"_sub.rdf", mode='w', encoding='ascii',
-                       errors='xmlcharrefreplace')
+if len(sys.argv) > 2:
+    processes = int(sys.argv[2])
+else:
+    processes = 1
+if len(sys.argv) > 3:
+    threads = int(sys.argv[3])
+else:
+    threads = vf.SPARQL_THREADS
+if len(sys.argv) > 4:
+    rdf_format = str(sys.argv[4])
+else:
+    rdf_format = vf.RDF_FORMAT
+file_name = input_file_name
+if file_name.endswith(".gz"):
+    file_name = file_name[:-3]
+file_name, file_extension = os.path.splitext(file_name)
+rdf_extension = vf.RDF_SERIALIZERS[rdf_format].extension
+
+add_file = RdfWriter(file_name+"_add"+rdf_extension, format=rdf_format,
+                     max_triples=RDF_CHUNK_TRIPLES, compress=RDF_COMPRESS)
+sub_file = RdfWriter(file_name+"_sub"+rdf_extension, format=rdf_format,
+                     max_triples=RDF_CHUNK_TRIPLES, compress=RDF_COMPRESS)
 log_file = sys.stdout
 ##log_file = codecs.open(file_name+"_log.txt", mode='w', encoding='ascii',
 ##                       errors='xmlcharrefreplace')
 exc_file = codecs.open(file_name+"_exc.txt", mode='w', encoding='ascii',
                        errors='xmlcharrefreplace')
 
-ardf = rdf_header()
-srdf = rdf_header()
-
 print >>log_file, datetime.now(), "Start"
 print >>log_file, datetime.now(), "Person Ingest Version", __version__
 print >>log_file, datetime.now(), "VIVO Foundation Version", vf.__version__
 print >>log_file, datetime.now(), "Read Position Data"
-people = prepare_people(input_file_name)
+people = prepare_people(input_file_name, processes=processes)
 print >>log_file, datetime.now(), "Position data has", len(people),\
     "people"
 
-# Main loop
+# Main loop.  People are read from VIVO by several threads at once.  They
+# are updated and written here, one at a time, in order
 
-for source_person in people.values():
+for [source_person, vivo_person] in threaded_map(read_vivo_person,
+                                                 people.values(), threads):
 
     if debug:
         print
@@ -321,21 +476,16 @@ for source_person in people.values():
             view_person['start_date'] = view_person['start_date'].isoformat()       
         print json.dumps(view_person, indent=4)
     
-    if 'uri' in source_person and source_person['uri'] is not None:
+    if vivo_person is not None:
         print >>log_file, "Updating person at", source_person['uri']
-        vivo_person = get_person(source_person['uri'])
         [add, sub] = update_person(vivo_person, source_person)
-        ardf = ardf + add
-        srdf = srdf + sub
+        add_file.write(add)
+        sub_file.write(sub)
     else:
         print >>log_file, "Adding person", source_person['ufid']
         [add, person_uri] = add_person(source_person)
-        ardf = ardf + add
+        add_file.write(add)
 
-adrf = ardf + rdf_footer()
-srdf = srdf + rdf_footer()
-add_file.write(adrf)
-sub_file.write(srdf)
 add_file.close()
 sub_file.close()
 exc_file.close()
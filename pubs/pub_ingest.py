@@ -30,15 +30,20 @@
 __author__ = "Michael Conlon"
 __copyright__ = "Copyright 2014, University of Florida"
 __license__ = "BSD 3-Clause license"
-__version__ = "1.3"
+__version__ = "1.4"
 
 import sys
 from datetime import datetime, date
 from pybtex.database.input import bibtex
 import tempita
 import vivotools
+from vivofoundation import make_concept_dictionary
+from vivofoundation import RdfWriter
+from vivopubs import get_pubmed_values_many
+from vivopubs import make_author_index
+from vivopubs import update_pubmed
 
-MAX_AUTHORS = 50
+RDF_COMPRESS = False # write the rdf file gzip compressed, as .gz
 
 publisher_report = {}
 journal_report = {}
@@ -46,7 +51,6 @@ title_report = {}
 author_report = {}
 disambiguation_report = {}
 
-dictionaries = []
 journal_dictionary = {}
 publisher_dictionary = {}
 title_dictionary = {}
@@ -59,7 +63,7 @@ def open_files(bibtex_file_name):
     base = bibtex_file_name[:bibtex_file_name.find('.')]
     rpt_file = open(base+'.rpt', 'w')
     lst_file = open(base+'.lst', 'w')
-    rdf_file = open(base+'.rdf', 'w')
+    rdf_file = RdfWriter(base+'.rdf', compress=RDF_COMPRESS)
     return [rdf_file, rpt_file, lst_file]
 
 def update_disambiguation_report(authors, publication_uri):
@@ -88,8 +92,6 @@ bib_data = parser.parse_file(bibtex_file_name)
 bib_sorted = sorted(bib_data.entries.items(),
     key=lambda x: x[1].fields['title'])
 
-print >>rdf_file, "<!--", len(bib_data.entries.keys()),\
-    "publications to be processed -->"
 print datetime.now(), len(bib_data.entries.keys()),\
     "publications to be processed."
 
@@ -101,32 +103,32 @@ publisher_dictionary = vivotools.make_publisher_dictionary()
 print datetime.now(), "Journals"
 journal_dictionary = vivotools.make_journal_dictionary()
 print datetime.now(), "People"
-dictionaries = make_people_dictionaries()
+author_index = make_author_index()
 print datetime.now(), "Titles"
 title_dictionary = vivotools.make_title_dictionary()
 print datetime.now(), "Concepts"
-vivotools.make_concept_dictionary()
+make_concept_dictionary()
 
-# process the papers
+#  PubMed values for all the papers with a DOI, in a few Entrez requests
+
+print datetime.now(), "PubMed"
+pubmed_values = get_pubmed_values_many([value.fields['doi'] for key, value
+    in bib_sorted if 'doi' in value.fields])
 
-print >>rdf_file, vivotools.rdf_header()
+# process the papers
 
 for key, value in bib_sorted:
     try:
         title = value.fields['title'].title() + " "
     except:
         title_report["No title"] = ["No Title", None, 1]
-        print >>rdf_file, "<!-- No title found. No RDF necessary -->"
         continue
     title = abbrev_to_words(title)
     title = title[0:-1]
     if title in title_report:
-        print >>rdf_file, "<!-- Title", title,\
-            "handled previously.  No RDF necessary -->"
         title_report[title][2] = title_report[title][2] + 1
         continue
     else:
-        print >>rdf_file, "<!-- Begin RDF for " + title + " -->"
         print datetime.now(), "<!-- Begin RDF for " + title + " -->"
         document = {}
         document['title'] = title
@@ -140,8 +142,6 @@ for key, value in bib_sorted:
             [author_rdf, authors] = make_author_rdf(value)
             document['authors'] = make_document_authors(authors)
             if count_uf_authors(authors) == 0:
-                print >>rdf_file, "<!-- End RDF.  No UF authors for " +\
-                    title + " No RDF necessary -->"
                 title_report[title][0] = "No UF Auth"
                 continue
             update_author_report(authors)
@@ -192,8 +192,9 @@ for key, value in bib_sorted:
 
             pubmed_rdf = ""
             if 'doi' in value.fields:
-                [pubmed_rdf, sub] = vivotools.update_pubmed(publication_uri,\
-                    value.fields['doi'])
+                [pubmed_rdf, sub] = update_pubmed(publication_uri,\
+                    value.fields['doi'], inVivo=False,\
+                    values=pubmed_values[value.fields['doi']])
                 if sub != "":
                     raise Exception("Non empty subtraction RDF"+\
                         "for Update PubMed")
@@ -202,19 +203,16 @@ for key, value in bib_sorted:
 
             publication_rdf = make_publication_rdf(value,\
                 title,publication_uri,datetime_uri,authorship_uris)
-            print >>rdf_file, datetime_rdf, publisher_rdf, journal_rdf,\
-                publisher_journal_rdf, author_rdf, authorship_rdf,\
-                author_in_authorship_rdf, journal_publication_rdf,\
-                publication_rdf, pubmed_rdf
-            print >>rdf_file, "<!-- End RDF for " + title + " -->"
+            rdf_file.write(datetime_rdf + publisher_rdf + journal_rdf +\
+                publisher_journal_rdf + author_rdf + authorship_rdf +\
+                author_in_authorship_rdf + journal_publication_rdf +\
+                publication_rdf + pubmed_rdf)
             print >>lst_file, vivotools.string_from_document(document),\
                 'VIVO uri', publication_uri, '\n'
             update_disambiguation_report(authors, publication_uri)
         else:
             title_report[title][0] = "Found"
             title_report[title][1] = uri
-            print >>rdf_file, "<!-- Found: " + title + " No RDF necessary -->"
-print >>rdf_file, vivotools.rdf_footer()
 
 #
 # Reports
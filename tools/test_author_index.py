@@ -0,0 +1,28 @@
+"""
+    test_author_index.py -- Make an author index of a few people and find
+    authors by each case of their names
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopubs import AuthorIndex
+from datetime import datetime
+
+print datetime.now(),"Start"
+index = AuthorIndex([
+    ["http://vivo.ufl.edu/individual/n25562", "Conlon", "Michael", "W"],
+    ["http://vivo.ufl.edu/individual/n1", "Conlon", "Mary", ""],
+    ["http://vivo.ufl.edu/individual/n2", "O'Connor", u"Ren\u00e9e", "Ann"],
+    ["http://vivo.ufl.edu/individual/n3", "Conlon", "", ""]])
+print datetime.now(), len(index), "keys"
+for author in ["Conlon", "Conlon, M", "Conlon, Michael", "Conlon, M. W.",
+               "Conlon, M. William", "Conlon, Michael W.", "Conlon, Mary",
+               "OConnor, Renee A", "O'Connor, R. Ann", "Smith, J."]:
+    print author, index.find(author)
+print datetime.now(),"Finished"
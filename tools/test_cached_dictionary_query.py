@@ -0,0 +1,46 @@
+"""
+    test_cached_dictionary_query.py -- Make the deptid dictionary twice.  The
+    first call queries VIVO and saves a snapshot, the second is read from the
+    snapshot.  Then age the snapshot past the TTL and refresh it from the
+    entities harvested since
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+import vivofoundation as vf
+from vivofoundation import make_deptid_dictionary
+from datetime import datetime
+import json
+import os
+
+print datetime.now(),"Start"
+
+vf.DICTIONARY_CACHE_TTL = 12
+file_name = os.path.join(vf.DICTIONARY_CACHE_DIR, "deptid.json")
+if os.path.exists(file_name):
+    os.remove(file_name)
+
+deptid_dictionary = make_deptid_dictionary(debug=True)
+print datetime.now(), "Full query.", len(deptid_dictionary), "entries"
+
+deptid_dictionary = make_deptid_dictionary(debug=True)
+print datetime.now(), "From snapshot.", len(deptid_dictionary), "entries"
+
+snapshot_file = open(file_name)
+snapshot = json.load(snapshot_file)
+snapshot_file.close()
+snapshot['taken'] = "2014-01-01T00:00:00"
+snapshot_file = open(file_name, "w")
+json.dump(snapshot, snapshot_file)
+snapshot_file.close()
+
+deptid_dictionary = make_deptid_dictionary(debug=True)
+print datetime.now(), "Refreshed.", len(deptid_dictionary), "entries"
+
+print datetime.now(),"Finished"
@@ -0,0 +1,39 @@
+"""
+    test_cached_template.py -- Templates are parsed once and reused.  The
+    fast assert_resource_property produces the same text as its template
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import cached_template
+from vivofoundation import assert_resource_property
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+template_text = """    <rdf:Description rdf:about="{{uri}}">
+        <{{resource_property}} rdf:resource="{{resource_uri}}"/>
+    </rdf:Description>
+"""
+template = cached_template(template_text)
+print template is cached_template(template_text)
+
+for [uri, resource_property, resource_uri] in [
+    ["http://a.b", "http://c.d", "http://e.f"],
+    ["http://a.b", "vivo:authorInAuthorship", u"http://c.d/\u00e9"],
+    ["http://a.b", "vivo:authorinauthorlist", None]]:
+    print template.substitute(uri=uri, resource_property=resource_property,
+        resource_uri=resource_uri) == \
+        assert_resource_property(uri, resource_property, resource_uri)
+
+for i in range(0,100000):
+    assert_resource_property("http://a.b", "rdf:type", "http://e.f")
+print datetime.now(), "100000 resource properties asserted"
+
+print datetime.now(),"Finished"
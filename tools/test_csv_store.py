@@ -0,0 +1,55 @@
+"""
+    test_csv_store.py -- Load a CSV file into a CsvStore, load it again
+    unchanged, and look up rows one at a time and in batches
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import CsvStore
+from vivofoundation import UnloadedSource
+from datetime import datetime
+import os
+
+print datetime.now(),"Start"
+
+csv_file = open("test_csv_store.txt", "w")
+print >>csv_file, "UFID|FIRST_NAME|LAST_NAME|UF_PROTECT_FLG"
+for i in range(0,100000):
+    print >>csv_file, str(10000000+i)+"|First|Last "+str(i)+"|N"
+csv_file.close()
+if os.path.exists("test_csv_store.db"):
+    os.remove("test_csv_store.db")
+
+store = CsvStore("test_csv_store.db")
+print datetime.now(), store.load('contact', 'test_csv_store.txt', 'UFID'), \
+    "rows loaded"
+print datetime.now(), store.load('contact', 'test_csv_store.txt', 'UFID'), \
+    "rows loaded from unchanged file"
+
+contact = store.table('contact')
+print datetime.now(), len(contact), "rows in table"
+print contact['10000042']
+print '10000042' in contact, '42' in contact, contact.get('42')
+
+ufids = [str(10000000+i) for i in range(0, 100000, 7)]
+rows = contact.get_many(ufids)
+print datetime.now(), len(rows), "rows fetched in batches"
+contact.prefetch(ufids)
+k = 0
+for ufid in ufids:
+    if contact[ufid]['UF_PROTECT_FLG'] == 'N':
+        k = k + 1
+print datetime.now(), k, "prefetched rows with protect flag N"
+try:
+    store.table('privacy')
+except UnloadedSource as error:
+    print error
+store.close()
+
+print datetime.now(),"Finished"
@@ -0,0 +1,35 @@
+"""
+    test_entrez_cache.py -- Get the pubmed values of a list of dois twice.
+    The second time the answers come from the Entrez cache.  Then get them
+    offline, from the cache alone
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+import vivopubs
+from vivopubs import get_pubmed_values_many
+from vivopubs import get_pubmed_values
+from datetime import datetime
+
+print datetime.now(),"Start"
+dois = ["10.1111/j.1752-8062.2011.00348.x",
+        "10.1016/j.arcmed.2006.09.002",
+        "unfindable",
+        "10.1111/j.1365-2036.2010.04512.x"]
+first = get_pubmed_values_many(dois)
+print datetime.now(), "From Entrez or the cache"
+second = get_pubmed_values_many(dois)
+print datetime.now(), "From the cache.  Same as before:", first == second
+vivopubs.ENTREZ_OFFLINE = True
+offline = get_pubmed_values_many(dois + ["10.1000/never.seen"])
+print datetime.now(), "Offline.  Same as before:", \
+    first == dict([(doi, offline[doi]) for doi in dois])
+print offline["10.1000/never.seen"]
+print get_pubmed_values("10.1016/j.arcmed.2006.09.002")
+print datetime.now(),"Finished"
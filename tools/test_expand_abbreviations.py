@@ -0,0 +1,37 @@
+"""
+    test_expand_abbreviations.py -- Expand the abbreviations in grant titles,
+    job code descriptions and journal names, each with its own table
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import expand_abbreviations
+from vivogrants import improve_grant_title
+from vivopeople import improve_jobcode_description
+from vivopubs import abbrev_to_words
+from datetime import datetime
+
+print datetime.now(),"Start"
+print expand_abbreviations("Ast Prof, Ast-R Alumn Aff",
+    "Ast|Assistant\nProf|Professor\nAst-R|Research Assistant\n" +
+    "Aff|Affiliate\nAlumn Aff|Alumni Affairs\nAst|Assist")
+for title in ["A MULTI-CTR,RNDMZD,DBL-BL,PLCB-CNTRL STDY TO EVAL THE EFF/SAF",
+              "GENE THERAPY FOR CLARIN-MEDIATED USHERS 3A",
+              "PROJECT #2 HIV/AIDS IN CHILDREN'S HLTH,,"]:
+    print title
+    print improve_grant_title(title)
+for description in ["AST PROF", "ASSOC PROF & CHR", "AST-R", "ALUMN AFF DIR",
+                    "RSCH AST PROF, EMER", "TECH/SR"]:
+    print description, "=", improve_jobcode_description(description)
+print abbrev_to_words("Am Assoc For The Advancement Of Sci ")
+print abbrev_to_words("Univ Florida Dept Med Gainesville")
+print abbrev_to_words("Ieee Trans On Med Imaging <Soc> \\& Natl Acad")
+for name in ["Vitamin A, B And C ", "Hepatitis A-B ", "Ann Intern Med"]:
+    print name, "=", abbrev_to_words(name)
+print datetime.now(),"Finished"
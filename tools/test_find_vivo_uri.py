@@ -6,15 +6,19 @@
     --  Initial version.
     Version 0.2 MC 2014-07-22
     --  Updated for tools 2.0
+    Version 0.3 MC 2014-07-27
+    --  Find deptIDs from an index loaded with load_uri_index, with and
+        without fallback to VIVO
 
 """
 
 __author__ = "Michael Conlon"
 __copyright__ = "Copyright 2014, University of Florida"
 __license__ = "BSD 3-Clause license"
-__version__ = "0.2"
+__version__ = "0.3"
 
 from vivofoundation import find_vivo_uri
+from vivofoundation import load_uri_index
 from datetime import datetime
 
 print datetime.now(),"Start"
@@ -29,4 +33,10 @@ print find_vivo_uri("bibo:issn","0028-4793") # Journal from ISSN
 print find_vivo_uri("bibo:issn","9876-5432") # No such ISSN
 print find_vivo_uri("bibo:pmid","12763083") # paper from PubMed ID
 
+print datetime.now(), load_uri_index("ufv:deptID"), "deptIDs indexed"
+print find_vivo_uri("ufv:deptID","29680100") # Org from index
+print find_vivo_uri("ufv:deptID","99999999") # Not in index, not queried
+load_uri_index("ufv:deptID", fallback=True)
+print find_vivo_uri("ufv:deptID","99999999") # Not in index, queried
+
 print datetime.now(),"Finished"
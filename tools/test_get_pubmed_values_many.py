@@ -0,0 +1,25 @@
+"""
+    test_get_pubmed_values_many.py -- Given a list of dois, use Entrez to get
+    the pubmed values of all of them in a few requests
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopubs import get_pubmed_values_many
+from datetime import datetime
+
+print datetime.now(),"Start"
+dois = ["10.1111/j.1752-8062.2011.00348.x",
+        "10.1016/j.arcmed.2006.09.002",
+        "unfindable",
+        "10.1111/J.1365-2036.2010.04512.X"]
+pubmed_values = get_pubmed_values_many(dois)
+for doi in dois:
+    print "\n", doi, pubmed_values[doi]
+print datetime.now(),"Finished"
@@ -0,0 +1,49 @@
+"""
+    test_get_triples_many.py -- Given a list of URIs, get the triples for each
+    URI in batched queries
+
+    Version 0.1 MC 2014-07-26
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import get_triples_many
+from vivofoundation import get_triples
+from vivofoundation import prefetch_triples
+from vivofoundation import clear_triples_cache
+from datetime import datetime
+
+uris = [
+    "http://vivo.ufl.edu/individual/n7860108656",
+    "http://vivo.ufl.edu/individual/n182882417",
+    "http://vivo.ufl.edu/individual/n8763427",
+    "http://vivo.ufl.edu/individual/n148010391",
+    "http://vivo.ufl.edu/individual/n1864549239",
+    "http://vivo.ufl.edu/individual/n3715",
+    "http://vivo.ufl.edu/notfound",
+    "http://vivo.ufl.edu/individual/n378789540",
+    "http://vivo.ufl.edu/individual/n4703866415",
+    "http://vivo.ufl.edu/individual/n614029206",
+    "http://vivo.ufl.edu/individual/n42801"
+    ]
+
+print datetime.now(), "Start"
+
+#  Test cases for get_triples_many.  Small batches to force several queries
+
+triples = get_triples_many(uris, batch_size=4)
+for uri in uris:
+    print "\n", uri, len(triples[uri]["results"]["bindings"]), "triples"
+
+#  Batched and single queries should agree
+
+prefetch_triples(uris)
+for uri in uris:
+    print uri, get_triples(uri) == triples[uri]
+clear_triples_cache()
+
+print datetime.now(), "Finish"
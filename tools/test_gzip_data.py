@@ -0,0 +1,49 @@
+"""
+    test_gzip_data.py -- Write RDF as a gzip stream with an RdfWriter and
+    read CSV data from a gzip file, named with and without .gz
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import RdfWriter
+from vivofoundation import open_data_file
+from vivofoundation import read_csv
+from vivofoundation import assert_data_property
+from datetime import datetime
+import gzip
+import os
+
+print datetime.now(),"Start"
+
+writer = RdfWriter("test_gzip_data.rdf", compress=True)
+for i in range(0,10000):
+    uri = "http://vivo.ufl.edu/individual/n" + str(i)
+    writer.write(assert_data_property(uri, "rdfs:label",
+        u"Label \u00e9 " + str(i)))
+writer.close()
+rdf = gzip.open("test_gzip_data.rdf.gz").read()
+print datetime.now(), os.path.getsize("test_gzip_data.rdf.gz"),\
+    "bytes compressed", len(rdf), "bytes of RDF", rdf.count("</rdf:RDF>"),\
+    "footer(s)"
+print rdf[-200:]
+os.remove("test_gzip_data.rdf.gz")
+
+data_file = open_data_file("test_gzip_data.txt.gz", "wb")
+print >>data_file, "UFID|NAME"
+for i in range(0,1000):
+    print >>data_file, str(i) + "|" + u"Name \u00e9 ".encode('utf-8') + str(i)
+data_file.close()
+data = read_csv("test_gzip_data.txt.gz")
+print datetime.now(), len(data), "rows read from test_gzip_data.txt.gz"
+data = read_csv("test_gzip_data.txt")
+print datetime.now(), len(data), "rows read for test_gzip_data.txt"
+print data[1000]
+os.remove("test_gzip_data.txt.gz")
+
+print datetime.now(),"Finished"
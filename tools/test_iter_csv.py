@@ -0,0 +1,39 @@
+"""
+    test_iter_csv.py -- Read a CSV file a row at a time, keeping all
+    columns and then only selected columns
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import iter_csv
+from vivofoundation import read_csv
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+csv_file = open("test_iter_csv.txt", "w")
+print >>csv_file, "UFID|FIRST_NAME|LAST_NAME|UF_PROTECT_FLG"
+for i in range(0,10000):
+    print >>csv_file, str(i)+"|First "+str(i)+"|Last "+str(i)+"|N"
+print >>csv_file, "bad row|with too few values"
+csv_file.close()
+
+k = 0
+for row_number, row in iter_csv("test_iter_csv.txt"):
+    k = k + 1
+print datetime.now(), k, "rows.  Last row", row_number, row
+
+for row_number, row in iter_csv("test_iter_csv.txt",
+                                ['UFID', 'UF_PROTECT_FLG']):
+    pass
+print datetime.now(), "Selected columns", row
+
+print datetime.now(), len(read_csv("test_iter_csv.txt")), "rows from read_csv"
+
+print datetime.now(),"Finished"
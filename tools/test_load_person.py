@@ -0,0 +1,27 @@
+"""
+    test_load_person.py -- Given a URI of a person entity in VIVO, return a
+    python structure containing attributes of the person using a single
+    query.  Compare to get_person.
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopeople import load_person
+from vivopeople import get_person
+from datetime import datetime
+import json
+
+print datetime.now(),"Start"
+for uri in ["http://vivo.ufl.edu/individual/n3715",
+            "http://vivo.ufl.edu/individual/n4452",
+            "http://vivo.ufl.edu/individual/n3428"]:
+    person = load_person(uri)
+    print "\n",json.dumps(person, indent=4)
+    print "Same as get_person:", person == get_person(uri)
+print datetime.now(),"Finish"
@@ -0,0 +1,48 @@
+"""
+    test_make_authors.py -- Find the corresponding and UF authors of a paper
+    from its affiliation text, including names that are subsets of other
+    names and a paper with hundreds of authors
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivopubs import make_authors
+from vivopubs import NameMatcher
+from datetime import datetime
+
+class Entry(object):
+    def __init__(self, fields):
+        self.fields = fields
+
+print datetime.now(),"Start"
+print NameMatcher(["Childs, A.", "Childs, A. Baker", "A. B"]).matches(
+    "Childs, A. Baker; Childs, A.")
+entry = Entry({'author': "Childs, A. and Childs, A. Baker and Smith, J.",
+               'affiliation': "Childs, A (Reprint Author), Univ Florida, " +
+               "Gainesville, FL 32611 USA. Childs, A. Baker, Univ Florida, " +
+               "Gainesville, FL 32611 USA. Smith, J., Mayo Clin, " +
+               "Rochester, MN USA."})
+for author, value in sorted(make_authors(entry).items()):
+    print author, value
+names = ["Author%d, A. B." % i for i in range(500)]
+affiliation = ""
+i = 0
+while i < len(names):
+    if i % 100 == 0:
+        affiliation = affiliation + "; ".join(names[i:i+100]) + \
+            ", Mayo Clin, Rochester, MN USA. "
+    else:
+        affiliation = affiliation + "; ".join(names[i:i+100]) + \
+            ", Univ Florida, Gainesville, FL 32611 USA. "
+    i = i + 50
+entry = Entry({'author': " and ".join(names), 'affiliation': affiliation})
+authors = make_authors(entry)
+print datetime.now(), len(authors), "authors", \
+    len([a for a in authors.values() if a[2]]), "UF authors"
+print datetime.now(),"Finished"
@@ -0,0 +1,54 @@
+"""
+    test_rdf_chunks.py -- Write RDF with an RdfWriter to a series of files
+    capped by triple count and by size.  Check each file is a complete
+    document and the manifest accounts for every triple
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import RdfWriter
+from vivofoundation import RDF_SERIALIZERS
+from vivofoundation import read_csv
+from vivofoundation import assert_data_property
+from vivofoundation import assert_resource_property
+from datetime import datetime
+import os
+
+print datetime.now(),"Start"
+
+for [format, max_triples, max_bytes] in [['rdfxml', 1000, 0],
+                                         ['rdfxml', 0, 50000],
+                                         ['turtle', 700, 20000]]:
+    file_name = "test_rdf_chunks" + RDF_SERIALIZERS[format].extension
+    writer = RdfWriter(file_name, format=format,
+                       max_triples=max_triples, max_bytes=max_bytes)
+    for i in range(0,1000):
+        uri = "http://vivo.ufl.edu/individual/n" + str(i)
+        writer.write(assert_resource_property(uri, "rdf:type",
+            "http://xmlns.com/foaf/0.1/Person") +
+            assert_data_property(uri, "rdfs:label", "Person " + str(i)))
+        writer.assert_data_property(uri, "vivo:overview", "x" * (i % 50))
+    writer.close()
+    print datetime.now(), format, max_triples, "triples", max_bytes, "bytes"
+    manifest = read_csv("test_rdf_chunks_manifest.txt")
+    total = 0
+    for row in sorted(manifest.keys()):
+        name = manifest[row]['file']
+        rdf = open(name).read()
+        total = total + int(manifest[row]['triples'])
+        print "   ", name, manifest[row]['triples'], "triples",\
+            manifest[row]['bytes'], "bytes", os.path.getsize(name),\
+            "in file", rdf.count("<rdf:RDF"), "header(s)",\
+            rdf.count("</rdf:RDF>"), "footer(s)", rdf.count("@prefix rdf:"),\
+            "prefixes"
+        os.remove(name)
+    print datetime.now(), total, "triples in", len(manifest), "files"
+    os.remove("test_rdf_chunks_manifest.txt")
+
+print datetime.now(),"Finished"
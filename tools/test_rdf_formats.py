@@ -0,0 +1,56 @@
+"""
+    test_rdf_formats.py -- Write the same RDF as RDF/XML, N-Triples and
+    Turtle with RdfWriter and compare the sizes of the files
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import RdfWriter
+from vivofoundation import RDF_SERIALIZERS
+from vivofoundation import rdf_statements
+from vivofoundation import assert_data_property
+from vivofoundation import assert_resource_property
+from datetime import datetime
+import os
+
+print datetime.now(),"Start"
+
+template_rdf = """
+    <!-- A person -->
+    <rdf:Description rdf:about="http://vivo.ufl.edu/individual/n1">
+        <rdf:type rdf:resource="http://xmlns.com/foaf/0.1/Person"/>
+        <rdfs:label xml:lang="en-US">Conlon, Michael</rdfs:label>
+        <ufVivo:harvestedBy>Python People version 2.00</ufVivo:harvestedBy>
+    </rdf:Description>"""
+for statement in rdf_statements(template_rdf):
+    print statement
+for statement in rdf_statements(
+    '<rdf:Description rdf:about="http://vivo.ufl.edu/individual/n2">' +
+    '<rdfs:label>Ren&#233;e &#xE9; &amp;#233; &lt;&gt;</rdfs:label>' +
+    '</rdf:Description>'):
+    print statement, statement[0][2] == u"Ren\u00e9e \u00e9 &#233; <>"
+
+for format in ['rdfxml', 'ntriples', 'turtle']:
+    file_name = "test_rdf_formats" + RDF_SERIALIZERS[format].extension
+    writer = RdfWriter(file_name, format=format)
+    writer.write(template_rdf)
+    for i in range(0,1000):
+        uri = "http://vivo.ufl.edu/individual/n" + str(i)
+        writer.write(assert_data_property(uri, "rdfs:label",
+            u"Se\u00f1or \"Label\" & <" + str(i) + ">") +
+            assert_resource_property(uri, "rdf:type", "foaf:Person"))
+        writer.assert_data_property(uri, "vivo:dateTime",
+            {'value': '2014-07-27T00:00:00',
+            'datatype': 'http://www.w3.org/2001/XMLSchema#dateTime'})
+    writer.close()
+    print datetime.now(), format, os.path.getsize(file_name), \
+        "characters in", file_name
+    print open(file_name).read()[-300:]
+
+print datetime.now(),"Finished"
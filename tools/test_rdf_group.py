@@ -0,0 +1,42 @@
+"""
+    test_rdf_group.py -- Write RDF with repeated subjects and duplicate
+    triples with and without an RdfWriter window.  With a window, each
+    subject is written once and duplicates are dropped
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import RdfWriter
+from vivofoundation import assert_data_property
+from vivofoundation import assert_resource_property
+from datetime import datetime
+import os
+
+print datetime.now(),"Start"
+
+for window in [0, 100, 5000]:
+    file_name = "test_rdf_group_" + str(window) + ".rdf"
+    writer = RdfWriter(file_name, window=window)
+    for i in range(0,1000):
+        uri = "http://vivo.ufl.edu/individual/n" + str(i % 200)
+        writer.write(assert_resource_property(uri, "rdf:type",
+            "http://www.w3.org/2002/07/owl#Thing") +
+            assert_resource_property(uri, "rdf:type",
+            "http://vivoweb.org/ontology/core#Role") +
+            assert_data_property(uri, "rdfs:label", "Role " + str(i % 200)))
+        writer.assert_data_property(uri, "ufv:dateHarvested",
+            "2014-07-27T00:00:" + str(i % 2))
+    writer.close()
+    rdf = open(file_name).read()
+    print datetime.now(), "window", window, writer.duplicates,\
+        "duplicates dropped", rdf.count("<rdf:Description"),\
+        "descriptions", os.path.getsize(file_name), "characters"
+print rdf[-400:]
+
+print datetime.now(),"Finished"
@@ -0,0 +1,35 @@
+"""
+    test_rdf_writer.py -- Stream RDF to a file with an RdfWriter and check
+    the result is a single well formed RDF document
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import RdfWriter
+from vivofoundation import assert_data_property
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+writer = RdfWriter("test_rdf_writer.rdf")
+for i in range(0,10000):
+    uri = "http://vivo.ufl.edu/individual/n" + str(i)
+    writer.write(assert_data_property(uri, "rdfs:label", "Label " + str(i)))
+    writer.assert_resource_property(uri, "rdf:type", "foaf:Person")
+writer.write("")
+print datetime.now(), writer.count, "chunks written"
+writer.close()
+
+rdf = open("test_rdf_writer.rdf").read()
+print datetime.now(), len(rdf), "characters in file"
+print datetime.now(), rdf.count("<rdf:RDF"), "header(s)",\
+    rdf.count("</rdf:RDF>"), "footer(s)"
+print rdf[-200:]
+
+print datetime.now(),"Finished"
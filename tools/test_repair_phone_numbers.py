@@ -0,0 +1,40 @@
+"""
+    test_repair_phone_numbers.py -- Repair a column of phone numbers and a
+    column of emails in one call each.  Repeated values are repaired once
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+import vivopeople
+from vivopeople import repair_phone_numbers
+from vivopeople import repair_emails
+from datetime import datetime
+
+print datetime.now(),"Start"
+befores = [
+    "27737",
+    "352 484 2999",
+    "377 9999",
+    "3-48812 X 9943",
+    "+1 352 388 2888",
+    "888388",
+    "272 2822 ext. 2999",
+    "bd282"
+    ]
+for [before, after] in zip(befores, repair_phone_numbers(befores)):
+    print "Before",before.ljust(20),"After",after.ljust(20)
+phones = ["(352) 392-%04d" % (i % 100) for i in range(100000)]
+print datetime.now(), len(phones), "phone numbers"
+repaired = repair_phone_numbers(phones)
+print datetime.now(), len(vivopeople.phone_number_cache), \
+    "distinct phone numbers repaired", repaired[0:2]
+emails = ["Conlon, Mike <mconlon@ufl.edu>", "mconlon@ufl.edu", "none",
+          "mconlon@ufl.edu"]
+print repair_emails(emails)
+print datetime.now(),"Finished"
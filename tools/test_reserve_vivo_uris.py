@@ -0,0 +1,30 @@
+"""
+    test_reserve_vivo_uris.py -- Reserve a block of unused VIVO URIs with one
+    query, then issue URIs from the reserve
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import reserve_vivo_uris
+from vivofoundation import get_vivo_uri
+from vivofoundation import vivo_uri_reserve
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+reserve_vivo_uris(1000)
+print datetime.now(), len(vivo_uri_reserve), "uris reserved"
+
+uris = []
+for i in range(0,2000):
+    uris.append(get_vivo_uri())
+print datetime.now(), len(set(uris)), "distinct uris issued"
+print uris[0:9]
+
+print datetime.now(),"Finished"
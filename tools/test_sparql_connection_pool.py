@@ -0,0 +1,41 @@
+"""
+    test_sparql_connection_pool.py -- issue a series of SPARQL queries to VIVO
+    through the keep-alive connection pool and compare the elapsed time with
+    one connection per query
+
+    Version 0.1 MC 2014-07-26
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import vivo_sparql_query
+from vivofoundation import set_sparql_pool_size
+from vivofoundation import VIVO_QUERY_POOL_SIZE
+from datetime import datetime
+
+query = """
+    SELECT ?p ?o
+    WHERE {
+      <http://vivo.ufl.edu/individual/n3715> ?p ?o
+    }
+    """
+
+print datetime.now(), "Start"
+
+print datetime.now(), "100 queries, no pooled connections"
+set_sparql_pool_size(0)
+for i in range(100):
+    data = vivo_sparql_query(query)
+print datetime.now(), "Items found = ", len(data["results"]["bindings"])
+
+print datetime.now(), "100 queries, pool size", VIVO_QUERY_POOL_SIZE
+set_sparql_pool_size(VIVO_QUERY_POOL_SIZE)
+for i in range(100):
+    data = vivo_sparql_query(query)
+print datetime.now(), "Items found = ", len(data["results"]["bindings"])
+
+print datetime.now(), "Finish"
@@ -0,0 +1,33 @@
+"""
+    test_threaded_map.py -- Read people from VIVO with several threads at
+    once.  Results come back in the order of the uris given
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import threaded_map
+from vivopeople import read_person
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+uris = [
+    "http://vivo.ufl.edu/individual/n3715",
+    "http://vivo.ufl.edu/individual/n4452",
+    "http://vivo.ufl.edu/individual/n3428"
+    ]
+for threads in [1, 4]:
+    k = 0
+    for person in threaded_map(read_person, uris, threads=threads):
+        print uris[k], person.get('display_name', None), \
+            len(person['positions']), "positions"
+        k = k + 1
+    print datetime.now(), threads, "threads"
+
+print datetime.now(),"Finished"
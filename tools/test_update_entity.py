@@ -0,0 +1,57 @@
+"""
+    test_update_entity.py -- Update an entity with each kind of action.
+    Lists are compared as sets of triples
+
+    Version 0.1 MC 2014-07-27
+    --  Initial version.
+"""
+
+__author__ = "Michael Conlon"
+__copyright__ = "Copyright 2014, University of Florida"
+__license__ = "BSD 3-Clause license"
+__version__ = "0.1"
+
+from vivofoundation import update_entity
+from datetime import datetime
+
+print datetime.now(),"Start"
+
+key_table = {
+    'label': {'predicate': 'rdfs:label', 'action': 'literal'},
+    'title': {'predicate': 'bibo:title', 'action': 'literal'},
+    'publisher': {'predicate': 'vivo:publisher', 'action': 'resource'},
+    'keywords': {'predicate': 'vivo:freetextKeyword',
+                 'action': 'literal_list'},
+    'concepts': {'predicate': 'vivo:hasSubjectArea',
+                 'action': 'resource_list'}
+    }
+vivo_entity = {
+    'uri': 'http://vivo.ufl.edu/individual/n1',
+    'label': 'Old label',
+    'title': {'value': 'Title', 'xml:lang': 'en-US'},
+    'publisher': 'http://vivo.ufl.edu/individual/n2',
+    'keywords': ['alpha', 'beta', 'gamma'],
+    'concepts': ['http://vivo.ufl.edu/individual/n3',
+                 'http://vivo.ufl.edu/individual/n4']
+    }
+source_entity = {
+    'label': 'New label',
+    'title': {'value': 'Title', 'xml:lang': 'en-US'},
+    'publisher': 'http://vivo.ufl.edu/individual/n2',
+    'keywords': ['beta', 'gamma', 'delta'],
+    'concepts': ['http://vivo.ufl.edu/individual/n4',
+                 'http://vivo.ufl.edu/individual/n5']
+    }
+[add, sub] = update_entity(vivo_entity, source_entity, key_table)
+print "Add\n", add
+print "Sub\n", sub
+
+vivo_entity = {'uri': 'http://vivo.ufl.edu/individual/n1',
+               'keywords': [str(i) for i in range(0, 20000)]}
+source_entity = {'keywords': [str(i) for i in range(10000, 30000)]}
+[add, sub] = update_entity(vivo_entity, source_entity,
+                           {'keywords': key_table['keywords']})
+print datetime.now(), add.count('</vivo:freetextKeyword>'), "added", \
+    sub.count('</vivo:freetextKeyword>'), "subtracted"
+
+print datetime.now(),"Finished"
@@ -37,7 +37,8 @@ def make_course_rdf(taught_data):
     Given taught_data, generate the RDF for a course,
     a teacher role and links between course, teacher role and instructor
     """
-    course_rdf_template = tempita.Template("""
+    from vivofoundation import cached_template
+    course_rdf_template = cached_template("""
     <rdf:Description rdf:about="{{course_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://vivo.ufl.edu/ontology/vivo-ufl/Course"/>
@@ -61,7 +62,8 @@ def make_section_rdf(taught_data):
     the section to its teaching role, to its course and term.  Link the
     role to the instructor.
     """
-    section_rdf_template = tempita.Template("""
+    from vivofoundation import cached_template
+    section_rdf_template = cached_template("""
     <rdf:Description rdf:about="{{section_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://vivo.ufl.edu/ontology/vivo-ufl/CourseSection"/>
@@ -160,7 +162,8 @@ def make_term_dictionary(debug=False):
     Make a term dictionary for academic terms.  Key is term name such as
     "Spring 2011".  Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    query = cached_template("""
     SELECT ?x ?label
     WHERE {
       ?x a vivo:AcademicTerm .
@@ -192,7 +195,8 @@ def make_course_dictionary(debug=False):
     Make a course dictionary from VIVO contents.  Key is course number
     such as ABF2010C. Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    query = cached_template("""
     SELECT ?x ?label ?coursenum
     WHERE {
       ?x a ufVivo:Course .
@@ -224,7 +228,8 @@ def make_section_dictionary(debug=False):
     Make a section dictionary from VIVO contents.  Key is section number.
     Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    query = cached_template("""
     SELECT ?x ?label
         WHERE {
         ?x a ufVivo:CourseSection .
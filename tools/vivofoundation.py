@@ -10,18 +10,50 @@ __license__ = "BSD 3-Clause license"
 __version__ = "2.00"
 
 concept_dictionary = {}
+triples_cache = {}
+template_cache = {}
+abbreviation_cache = {}
+uri_index = {}
+uri_index_fallback = {}
+vivo_uri_reserve = []
+vivo_uris_issued = set()
 
 VIVO_URI_PREFIX = "http://vivo.ufl.edu/individual/"
 VIVO_QUERY_URI = "http://localhost:8000/ds/sparql" # For vagrant development
+VIVO_QUERY_POOL_SIZE = 4 # keep-alive connections held open to VIVO_QUERY_URI
+TRIPLES_BATCH_SIZE = 200 # subjects per query in get_triples_many
+VIVO_URI_BLOCK_SIZE = 100 # candidate uris checked per query in get_vivo_uri
+DICTIONARY_CACHE_DIR = "dictionary_cache" # snapshots of dictionary queries
+DICTIONARY_CACHE_TTL = 0 # hours a snapshot is used as is. 0, no snapshots
+DICTIONARY_CACHE_REBUILD = 7 # days before a snapshot is rebuilt in full
+CSV_STORE_BATCH_SIZE = 500 # keys per query in CsvStoreTable.get_many
+SPARQL_THREADS = 4 # threads, and so queries in flight, in threaded_map
+RESOURCE_PROPERTY_FORMAT = """    <rdf:Description rdf:about="%s">
+        <%s rdf:resource="%s"/>
+    </rdf:Description>
+"""
+RDF_FORMAT = "rdfxml" # RdfWriter output. A key of RDF_SERIALIZERS
+RDF_GROUP_WINDOW = 0 # statements RdfWriter groups by subject. 0 for none
+RDF_CHUNK_TRIPLES = 0 # triples per file written by RdfWriter. 0 for no limit
+RDF_CHUNK_BYTES = 0 # bytes per file written by RdfWriter. 0 for no limit
+RDF_COMPRESS = False # RdfWriter writes gzip files, named with .gz added
+RDF_TAG_ALIASES = {"ufVivo:": "ufv:", "core:": "vivo:"} # older template tags
 
 import urllib, urllib2, json, random
 import string
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import time
 from xml.dom.minidom import parseString
 import sys, httplib
+import os
+import socket
+import threading
+import urlparse
 import tempita
 import csv
+import codecs
+import gzip
+import re
 from Bio import Entrez
 
 class UnknownDateTimePrecision(Exception):
@@ -31,6 +63,27 @@ class UnknownDateTimePrecision(Exception):
     """
     pass
 
+class ActionError(Exception):
+    """
+    update_entity will throw this exception if a key table names an action
+    other than literal, resource, literal_list or resource_list
+    """
+    pass
+
+class UnknownRdfFormat(Exception):
+    """
+    RdfWriter will throw this exception if the requested format is not one of
+    the formats in RDF_SERIALIZERS
+    """
+    pass
+
+class RdfSyntaxError(Exception):
+    """
+    rdf_statements will throw this exception for RDF it can not read as
+    rdf:Description elements of simple properties
+    """
+    pass
+
 def comma_space(s):
     """
     insert a space after every comma in s unless s ends in a comma
@@ -45,12 +98,12 @@ def make_datetime_rdf(value, title):
     Given a bibtex publication value, create the RDF for a datetime object
     expressing the date of publication
     """
-    datetime_template = tempita.Template(
+    datetime_template = cached_template(
     """
     <rdf:Description rdf:about="{{uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://vivoweb.org/ontology/core#DateTimeValue"/>
-        <core:dateTimePrecision rdf:resource=vivo:yearMonthPrecision"/>
+        <core:dateTimePrecision rdf:resource="http://vivoweb.org/ontology/core#yearMonthPrecision"/>
         <core:dateTime>{{pub_datetime}}</core:dateTime>
         <ufVivo:harvestedBy>Python Pubs version 1.3</ufVivo:harvestedBy>
         <ufVivo:dateHarvested>{{harvest_datetime}}</ufVivo:dateHarvested>
@@ -142,73 +195,114 @@ def update_entity(vivo_entity, source_entity, key_table):
     or an empty list, the corresponding change is made to VIVO.
     """
     entity_uri = vivo_entity['uri']
-    ardf = ""
-    srdf = ""
+    ardf = []
+    srdf = []
     for key in key_table.keys():
         action = key_table[key]['action']
-        if action == 'literal':
-            if key in vivo_entity:
-                vivo_value = vivo_entity[key]
-            else:
-                vivo_value = None
-            if key in source_entity:
-                source_value = source_entity[key]
-            else:
-                continue # if key is not in source, do nothing
-            [add, sub] = update_data_property(entity_uri,
-                key_table[key]['predicate'], vivo_value, source_value)
-            ardf = ardf + add
-            srdf = srdf + sub
-        elif action == 'resource':
-            if key in vivo_entity:
-                vivo_value = vivo_entity[key]
-            else:
-                vivo_value = None
-            if key in source_entity:
-                source_value = source_entity[key]
-            else:
-                continue # if key is not in source, do nothing
-            [add, sub] = update_resource_property(entity_uri,
-                key_table[key]['predicate'], vivo_value, source_value)
-            ardf = ardf + add
-            srdf = srdf + sub
-        elif action == 'literal_list':
-            if key not in source_entity:
-                continue # no key => no change
-            vals = vivo_entity.get(key,[])+source_entity.get(key,[])
-            for val in vals:
-                if val in vivo_entity and val in source_entity:
-                    pass
-                elif val in vivo_entity and val not in source_entity:
-                    [add, sub] = update_data_property(entity_uri,
-                        key_table[key]['predicate'], val, None)
-                    ardf = ardf + add
-                    srdf = srdf + sub
-                else:
-                    [add, sub] = update_data_property(entity_uri,
-                        key_table[key]['predicate'], None, val)
-                    ardf = ardf + add
-                    srdf = srdf + sub
-        elif action == 'resource_list':
-            if key not in source_entity:
-                continue # no key => no change
-            vals = vivo_entity.get(key,[])+source_entity.get(key,[])
-            for val in vals:
-                if val in vivo_entity and val in source_entity:
-                    pass
-                elif val in vivo_entity and val not in source_entity:
-                    [add, sub] = update_resource_property(entity_uri,
-                        key_table[key]['predicate'], val, None)
-                    ardf = ardf + add
-                    srdf = srdf + sub
-                else:
-                    [add, sub] = update_resource_property(entity_uri,
-                        key_table[key]['predicate'], None, val)
-                    ardf = ardf + add
-                    srdf = srdf + sub
-        else:
+        if action not in ['literal', 'resource', 'literal_list',
+                          'resource_list']:
             raise ActionError(action)
-    return [ardf, srdf]
+        if key not in source_entity:
+            continue # if key is not in source, do nothing
+        predicate = key_table[key]['predicate']
+        vivo_value = vivo_entity.get(key, None)
+        source_value = source_entity[key]
+        if action in ['literal', 'resource']:
+            vivo_values = [] if vivo_value is None else [vivo_value]
+            source_values = [] if source_value is None else [source_value]
+        else:
+            vivo_values = vivo_value or []
+            source_values = source_value or []
+        resource = action in ['resource', 'resource_list']
+        vivo_triples = []
+        for value in vivo_values:
+            vivo_triples.append(make_triple(entity_uri, predicate, value))
+        source_triples = []
+        for value in source_values:
+            source_triples.append(make_triple(entity_uri, predicate, value))
+        [add, sub] = diff_triples(vivo_triples, source_triples)
+        for triple in add:
+            ardf.append(triple_rdf(triple, resource))
+        for triple in sub:
+            srdf.append(triple_rdf(triple, resource))
+    return ["".join(ardf), "".join(srdf)]
+
+def make_triple(uri, predicate, value):
+    """
+    Given a uri, a predicate and a value, return the triple as a tuple of
+    (subject, predicate, object, lang, datatype).  Value can be a string or
+    a dictionary with xml:lang and/or datatype, as for assert_data_property
+    """
+    if isinstance(value, dict):
+        return (uri, predicate, value['value'], value.get('xml:lang', None),
+                value.get('datatype', None))
+    return (uri, predicate, value, None, None)
+
+def diff_triples(vivo_triples, source_triples):
+    """
+    Given the triples in VIVO and the triples from the source, return the
+    triples to add -- those in the source and not in VIVO -- and the triples
+    to subtract -- those in VIVO and not in the source.  Each is a list in
+    the order given, without duplicates.  Comparison is by set, so the
+    time taken grows with the number of triples, not its square
+    """
+    vivo_set = set(vivo_triples)
+    source_set = set(source_triples)
+    add = []
+    for triple in source_triples:
+        if triple not in vivo_set:
+            add.append(triple)
+            vivo_set.add(triple)
+    sub = []
+    for triple in vivo_triples:
+        if triple not in source_set:
+            sub.append(triple)
+            source_set.add(triple)
+    return [add, sub]
+
+def triple_rdf(triple, resource=False):
+    """
+    Given a triple made by make_triple, return RDF asserting it.  If
+    resource is True the object is a uri, otherwise a literal
+    """
+    [uri, predicate, value, lang, datatype] = triple
+    if resource:
+        return assert_resource_property(uri, predicate, value)
+    if lang is None and datatype is None:
+        return assert_data_property(uri, predicate, value)
+    literal = {'value': value}
+    if lang is not None:
+        literal['xml:lang'] = lang
+    if datatype is not None:
+        literal['datatype'] = datatype
+    return assert_data_property(uri, predicate, literal)
+
+def cached_template(content):
+    """
+    Return a tempita template for content, parsing content only the first
+    time it is seen.  Templates are held in template_cache for the life of
+    the process
+    """
+    template = template_cache.get(content, None)
+    if template is None:
+        template = tempita.Template(content)
+        template_cache[content] = template
+    return template
+
+def template_text(value):
+    """
+    Return value as tempita would render it in a template.  None renders
+    as the empty string, unicode is encoded as utf-8
+    """
+    if value is None:
+        return ''
+    if isinstance(value, unicode):
+        return value.encode('utf8')
+    if not isinstance(value, str):
+        if hasattr(value, '__unicode__'):
+            return unicode(value).encode('utf8')
+        return str(value)
+    return value
 
 def assert_data_property(uri, data_property, value):
     """
@@ -249,13 +343,8 @@ def assert_resource_property(uri, resource_property, resource_uri):
     This is often called in invertable pairs -- each uri has the other as
     a resource. Example: homeDept and homeDeptFor
     """
-    resource_property_template = tempita.Template(
-    """    <rdf:Description rdf:about="{{uri}}">
-        <{{resource_property}} rdf:resource="{{resource_uri}}"/>
-    </rdf:Description>
-""")
-    rdf = resource_property_template.substitute(uri=uri, \
-        resource_property=resource_property, resource_uri=resource_uri)
+    rdf = RESOURCE_PROPERTY_FORMAT % (template_text(uri),
+        template_text(resource_property), template_text(resource_uri))
     return rdf
 
 def update_data_property(uri, data_property, vivo_value, source_value):
@@ -431,10 +520,10 @@ def merge_uri(from_uri, to_uri):
         "foaf:lastName",
         "bibo:middlename"
         ]
-    srdf = ""
-    ardf = ""
+    srdf = []
+    ardf = []
     if from_uri == to_uri:
-        return [ardf, srdf]
+        return ["".join(ardf), "".join(srdf)]
 
     # merge triples
 
@@ -450,8 +539,8 @@ def merge_uri(from_uri, to_uri):
             sub = assert_data_property(from_uri, p, o)
             if p not in single_valued_predicates:
                 add = assert_data_property(to_uri, p, o)
-        srdf = srdf + sub
-        ardf = ardf + add
+        srdf.append(sub)
+        ardf.append(add)
 
     # merge references
 
@@ -460,17 +549,17 @@ def merge_uri(from_uri, to_uri):
         s = triple["s"]["value"]
         p = translate_predicate(triple["p"]["value"])
         [add, sub] = update_resource_property(s, p, from_uri, to_uri)
-        srdf = srdf + sub
-        ardf = ardf + add
+        srdf.append(sub)
+        ardf.append(add)
 
-    return [ardf, srdf]
+    return ["".join(ardf), "".join(srdf)]
 
 def remove_uri(uri):
     """
     Given a URI, generate subtraction URI to remove all triples containing
     the URI as either a subject or object
     """
-    srdf = ""
+    srdf = []
 
     # Remove triples
 
@@ -482,7 +571,7 @@ def remove_uri(uri):
             [add, sub] = update_resource_property(uri, p, o["value"], None)
         else:
             [add, sub] = update_data_property(uri, p, o, None)
-        srdf = srdf + sub
+        srdf.append(sub)
 
     # Remove references
 
@@ -491,8 +580,8 @@ def remove_uri(uri):
         s = triple["s"]["value"]
         p = translate_predicate(triple["p"]["value"])
         [add, sub] = update_resource_property(s, p, uri, None)
-        srdf = srdf + sub
-    return srdf
+        srdf.append(sub)
+    return "".join(srdf)
 
 
 class UnicodeCsvReader(object):
@@ -523,6 +612,86 @@ class UnicodeDictReader(csv.DictReader):
         csv.DictReader.__init__(self, f, fieldnames=fieldnames, **kwds)
         self.reader = UnicodeCsvReader(f, encoding=encoding, **kwds)
 
+def data_file_name(file_name):
+    """
+    Given the name of an input file, return the name of the file to read.
+    If file_name does not exist but a gzip file of the same name with .gz
+    added does, return the name of the gzip file
+    """
+    if not os.path.exists(file_name) and os.path.exists(file_name + ".gz"):
+        return file_name + ".gz"
+    return file_name
+
+def open_data_file(file_name, mode='rb'):
+    """
+    Open a data file.  Files named with .gz are read and written as gzip
+    streams, a line at a time, without reading or writing the whole file.
+    Input files are found by data_file_name, so contact_data.txt is read
+    from contact_data.txt.gz if only the compressed file is present
+    """
+    if 'r' in mode:
+        file_name = data_file_name(file_name)
+    if file_name.endswith(".gz"):
+        return gzip.open(file_name, mode)
+    return open(file_name, mode)
+
+class RowError(Exception):
+    """
+    read_csv and iter_csv throw this exception for a row with the wrong
+    number of data values when skip is False
+    """
+    pass
+
+def iter_csv(filename, columns=None, skip=True):
+    """
+    Given a filename, read the CSV file with that name one row at a time,
+    following the conventions of read_csv.  Yield the row number and a
+    dictionary of the row's values keyed by column heading.  If columns
+    is a list of column headings, only those columns are kept in each row.
+
+    Rows are not held once yielded, so files far larger than memory can be
+    processed.  Files compressed by gzip are read as they are, see
+    open_data_file:
+
+        for row_number, row in iter_csv('contact_data.txt', ['UFID']):
+            ...
+    """
+    heading = []
+    row_number = 0
+    csv_file = open_data_file(filename, 'rb')
+    try:
+        for row in UnicodeCsvReader(csv_file, delimiter="|"):
+            i = 0
+            for r in row:
+                # remove white space fore and aft
+                row[i] = r.strip(string.whitespace)
+                if row[i] == 'NULL' or row[i] == 'None':
+                    row[i] = ''
+                i = i + 1
+            if heading == []:
+                heading = row # the first row is the heading
+                number_of_columns = len(heading)
+                if columns is None:
+                    keep = range(number_of_columns)
+                else:
+                    keep = [heading.index(c) for c in columns if c in heading]
+                continue
+            row_number = row_number + 1
+            if len(row) == number_of_columns:
+                data = {}
+                for i in keep:
+                    data[heading[i]] = row[i]
+                yield [row_number, data]
+            elif skip == False:
+                raise RowError("On row "+str(row_number)+", expecting "+
+                               str(number_of_columns)+ " data values. Found "+
+                               str(len(row))+" data values. Row contents = "+
+                               str(row))
+            else:
+                pass #  row has wrong number of columns and skip is True
+    finally:
+        csv_file.close()
+
 def read_csv(filename, skip=True):
     """
     Given a filename, read the CSV file with that name.  We use "|" as a
@@ -541,47 +710,193 @@ def read_csv(filename, skip=True):
 
     CSV files processed by read_CSV will be returned as a dictionary of
     dictionaries, one dictionary per row with a name of and an
-    integer value for the row number of data.
+    integer value for the row number of data.  Use iter_csv to process
+    large files a row at a time.
 
     To Do:
     --  "know" some of the VIVO data elements, checking and converting as
         appropriate.  In particular, handle dates and convert to datetime
     """
-
-    class RowError(Exception):
-        pass
-    heading = []
-    row_number = 0
     data = {}
-    for row in UnicodeCsvReader(open(filename, 'rb'), delimiter="|"):
-        i = 0
-        for r in row:
-            # remove white space fore and aft
-            row[i] = r.strip(string.whitespace)
-            if row[i] == 'NULL' or row[i] == 'None':
-                row[i] = ''
-            i = i + 1
-        if heading == []:
-            heading = row # the first row is the heading
-            number_of_columns = len(heading)
-            continue
-        row_number = row_number + 1
-        if len(row) == number_of_columns:
-            data[row_number] = {}
-            i = 0
-            for r in row:
-                data[row_number][heading[i]] = r
-                i = i + 1
-        elif skip == False:
-            raise RowError("On row "+str(row_number)+", expecting "+
-                           str(number_of_columns)+ " data values. Found "+
-                           str(len(row))+" data values. Row contents = "+
-                           str(row))
-        else:
-            pass #  row has wrong number of columns and skip is True
+    for [row_number, row] in iter_csv(filename, skip=skip):
+        data[row_number] = row
     return data
 
 
+class UnloadedSource(Exception):
+    """
+    CsvStore.table throws this exception for a source that has not been
+    loaded into the store
+    """
+    pass
+
+class CsvStore(object):
+    """
+    An SQLite file holding CSV sources as indexed tables, one table per
+    source, keyed by a column of the source.  Loading a source records the
+    size and modification time of its file.  A source whose file has not
+    changed since it was loaded is not loaded again.
+
+        store = CsvStore('person_ingest.db')
+        store.load('privacy', 'privacy1_data.txt', 'UFID',
+                   columns=['UFID', 'UF_PROTECT_FLG'])
+        privacy = store.table('privacy')
+        privacy.prefetch(ufids)
+        if ufid in privacy:
+            flag = privacy[ufid]['UF_PROTECT_FLG']
+    """
+    def __init__(self, file_name):
+        import sqlite3
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute("""CREATE TABLE IF NOT EXISTS sources
+            (name TEXT PRIMARY KEY, file_name TEXT, key TEXT, size INTEGER,
+            mtime REAL)""")
+
+    def loaded(self, name, file_name):
+        """
+        Return True if source name was loaded from file_name and the file
+        has not changed since
+        """
+        file_name = data_file_name(file_name)
+        stat = os.stat(file_name)
+        row = self.connection.execute("""SELECT file_name, size, mtime
+            FROM sources WHERE name = ?""", (name,)).fetchone()
+        return row is not None and row[0] == file_name and \
+            row[1] == stat.st_size and row[2] == stat.st_mtime
+
+    def load(self, name, file_name, key, columns=None, force=False):
+        """
+        Load the CSV file file_name into table name, keyed by column key.
+        If columns is a list of column headings, only those columns are kept.
+        Rows with a key seen before replace the earlier row.  Return the
+        number of rows loaded, or None if the file is unchanged since it was
+        last loaded and force is False
+        """
+        if not force and self.loaded(name, file_name):
+            return None
+        file_name = data_file_name(file_name)
+        stat = os.stat(file_name)
+        rows = iter_csv(file_name, columns=columns)
+        first = None
+        for [row_number, first] in rows:
+            break
+        if columns is not None:
+            heading = list(columns)
+        elif first is not None:
+            heading = [key] + sorted([c for c in first.keys() if c != key])
+        else:
+            heading = [key]
+        self.connection.execute('DROP TABLE IF EXISTS "' + name + '"')
+        definitions = []
+        for c in heading:
+            if c == key:
+                definitions.append('"' + c + '" TEXT PRIMARY KEY')
+            else:
+                definitions.append('"' + c + '" TEXT')
+        self.connection.execute('CREATE TABLE "' + name + '" (' +
+            ", ".join(definitions) + ')')
+        insert = 'INSERT OR REPLACE INTO "' + name + '" VALUES (' + \
+            ",".join(["?"] * len(heading)) + ')'
+
+        def values(rows):
+            if first is not None:
+                yield [first.get(c, '') for c in heading]
+            for [row_number, row] in rows:
+                yield [row.get(c, '') for c in heading]
+
+        count = self.connection.executemany(insert, values(rows)).rowcount
+        self.connection.execute("""INSERT OR REPLACE INTO sources VALUES
+            (?, ?, ?, ?, ?)""", (name, file_name, key, stat.st_size,
+            stat.st_mtime))
+        self.connection.commit()
+        return count
+
+    def table(self, name):
+        """
+        Return a CsvStoreTable for looking up rows of table name by key.
+        Throw UnloadedSource if name has not been loaded
+        """
+        return CsvStoreTable(self, name)
+
+    def close(self):
+        self.connection.close()
+
+class CsvStoreTable(object):
+    """
+    Dictionary style lookups by key in one table of a CsvStore.  Rows for
+    many keys can be fetched in batches with get_many, or held in memory for
+    the lookups to come with prefetch.
+    """
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        row = store.connection.execute(
+            "SELECT key FROM sources WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise UnloadedSource("Source " + name + " is not in " +
+                store.file_name + ".  Run create_store.py to load it")
+        self.key = row[0]
+        self.heading = [r[1] for r in store.connection.execute(
+            'PRAGMA table_info("' + name + '")')]
+        self.select = 'SELECT * FROM "' + name + '" WHERE "' + self.key + '"'
+        self.cache = {}
+
+    def get_many(self, keys):
+        """
+        Return a dictionary of the rows for keys, keyed by key.  Keys not in
+        the table are not in the dictionary
+        """
+        keys = list(keys)
+        rows = {}
+        start = 0
+        while start < len(keys):
+            batch = keys[start:start+CSV_STORE_BATCH_SIZE]
+            start = start + CSV_STORE_BATCH_SIZE
+            query = self.select + " IN (" + ",".join(["?"] * len(batch)) + ")"
+            for values in self.store.connection.execute(query, batch):
+                row = dict(zip(self.heading, values))
+                rows[row[self.key]] = row
+        return rows
+
+    def prefetch(self, keys):
+        """
+        Fetch the rows for keys in batches and hold them for lookups.  Keys
+        not in the table are remembered as missing
+        """
+        rows = self.get_many(keys)
+        for key in keys:
+            self.cache[key] = rows.get(key, None)
+
+    def get(self, key, default=None):
+        if key in self.cache:
+            row = self.cache[key]
+        else:
+            values = self.store.connection.execute(self.select + " = ?",
+                (key,)).fetchone()
+            row = None if values is None else dict(zip(self.heading, values))
+        if row is None:
+            return default
+        return row
+
+    def keys(self):
+        return [r[0] for r in self.store.connection.execute(
+            'SELECT "' + self.key + '" FROM "' + self.name + '"')]
+
+    def __getitem__(self, key):
+        row = self.get(key)
+        if row is None:
+            raise KeyError(key)
+        return row
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self.store.connection.execute(
+            'SELECT COUNT(*) FROM "' + self.name + '"').fetchone()[0]
+
+
 def rdf_header():
     """
     Return a text string containing the standard VIVO RDF prefixes suitable as
@@ -628,6 +943,510 @@ def rdf_footer():
 """
     return rdf_footer
 
+def turtle_prefixes():
+    """
+    Return a text string containing the standard VIVO prefixes as Turtle
+    @prefix directives, suitable as the beginning of a Turtle file to add or
+    remove triples to/from VIVO.  The prefixes are those of rdf_header
+    """
+    turtle_prefixes = """@prefix rdf:    <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs:   <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd:    <http://www.w3.org/2001/XMLSchema#> .
+@prefix owl:    <http://www.w3.org/2002/07/owl#> .
+@prefix swrl:   <http://www.w3.org/2003/11/swrl#> .
+@prefix swrlb:  <http://www.w3.org/2003/11/swrlb#> .
+@prefix vitro:  <http://vitro.mannlib.cornell.edu/ns/vitro/0.7#> .
+@prefix bibo:   <http://purl.org/ontology/bibo/> .
+@prefix c4o:    <http://purl.org/spar/c4o/> .
+@prefix cito:   <http://purl.org/spar/cito/> .
+@prefix event:  <http://purl.org/NET/c4dm/event.owl#> .
+@prefix fabio:  <http://purl.org/spar/fabio/> .
+@prefix foaf:   <http://xmlns.com/foaf/0.1/> .
+@prefix geo:    <http://aims.fao.org/aos/geopolitical.owl#> .
+@prefix obo:    <http://purl.obolibrary.org/obo/> .
+@prefix ocrer:  <http://purl.org/net/OCRe/research.owl#> .
+@prefix ocresd: <http://purl.org/net/OCRe/study_design.owl#> .
+@prefix skos:   <http://www.w3.org/2004/02/skos/core#> .
+@prefix ufv:    <http://vivo.ufl.edu/ontology/vivo-ufl/> .
+@prefix vcard:  <http://www.w3.org/2006/vcard/ns#> .
+@prefix vitro-public: <http://vitro.mannlib.cornell.edu/ns/vitro/public#> .
+@prefix vivo:   <http://vivoweb.org/ontology/core#> .
+@prefix scires: <http://vivoweb.org/ontology/scientific-research#> .
+
+"""
+    return turtle_prefixes
+
+RDF_COMMENT = re.compile(r'<!--.*?-->', re.S)
+RDF_DESCRIPTION = re.compile(
+    r'<rdf:Description\s+rdf:about="([^"]*)"\s*>(.*?)</rdf:Description\s*>',
+    re.S)
+RDF_PROPERTY = re.compile(
+    r'<([\w.-]+:[\w.-]+)((?:\s+[\w.:-]+\s*=\s*"[^"]*")*)\s*'
+    r'(?:/>|>([^<]*)</\1\s*>)', re.S)
+RDF_ATTRIBUTE = re.compile(r'([\w.:-]+)\s*=\s*"([^"]*)"')
+RDF_REFERENCE = re.compile(r'&(#[0-9]+|#x[0-9A-Fa-f]+|amp|lt|gt|quot|apos);')
+RDF_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+TURTLE_NAME = re.compile(r'^[\w-]+:[A-Za-z_][\w-]*$')
+
+def rdf_tag(tag):
+    """
+    Given a tag such as ufVivo:ufid, as used in some templates, return the
+    tag using the prefixes of rdf_header, here ufv:ufid
+    """
+    prefix = tag[0:tag.find(':')+1]
+    if prefix in RDF_TAG_ALIASES:
+        tag = RDF_TAG_ALIASES[prefix] + tag[len(prefix):]
+    return tag
+
+def rdf_unescape(s):
+    """
+    Given text from RDF/XML, return it with the five XML entities and
+    character references such as &#233; and &#xE9; replaced by the
+    characters they stand for.  Each reference is replaced once, so &amp;lt;
+    becomes &lt;
+    """
+    def replace(match):
+        name = match.group(1)
+        if name.startswith('#x'):
+            return unichr(int(name[2:], 16))
+        elif name.startswith('#'):
+            return unichr(int(name[1:]))
+        return RDF_ENTITIES[name]
+    if '&' not in s:
+        return s
+    return RDF_REFERENCE.sub(replace, s)
+
+def rdf_statements(rdf):
+    """
+    Given RDF/XML as made by assert_data_property, assert_resource_property
+    and the templates of the vivo modules -- rdf:Description elements, each
+    holding simple property elements -- return the statements it makes as a
+    list of (triple, resource) pairs.  Each triple is as made by make_triple.
+    resource is True if the object is a uri.  Comments are ignored.  Any
+    other RDF/XML raises RdfSyntaxError rather than losing triples.  Text is
+    unescaped by rdf_unescape
+    """
+    rdf = RDF_COMMENT.sub('', rdf)
+    statements = []
+    end = 0
+    for description in RDF_DESCRIPTION.finditer(rdf):
+        if rdf[end:description.start()].strip() != "":
+            raise RdfSyntaxError("Expecting rdf:Description. Found " +
+                                 rdf[end:description.start()].strip())
+        end = description.end()
+        uri = rdf_unescape(description.group(1))
+        body = description.group(2)
+        body_end = 0
+        for element in RDF_PROPERTY.finditer(body):
+            if body[body_end:element.start()].strip() != "":
+                raise RdfSyntaxError("Expecting a property of " + uri +
+                    ". Found " + body[body_end:element.start()].strip())
+            body_end = element.end()
+            [tag, attributes, text] = element.groups()
+            predicate = rdf_tag(tag)
+            attributes = dict(RDF_ATTRIBUTE.findall(attributes))
+            if 'rdf:resource' in attributes:
+                resource_uri = rdf_unescape(attributes['rdf:resource'])
+                statements.append([(uri, predicate, resource_uri, None, None),
+                                   True])
+            else:
+                lang = attributes.get('xml:lang', None)
+                datatype = attributes.get('datatype',
+                    attributes.get('rdf:datatype', None))
+                value = rdf_unescape(text or "")
+                statements.append([(uri, predicate, value, lang, datatype),
+                                   False])
+        if body[body_end:].strip() != "":
+            raise RdfSyntaxError("Expecting a property of " + uri +
+                                 ". Found " + body[body_end:].strip())
+    if rdf[end:].strip() != "":
+        raise RdfSyntaxError("Expecting rdf:Description. Found " +
+                             rdf[end:].strip())
+    return statements
+
+def rdf_literal_text(value):
+    """
+    Given the value of a literal, return it quoted and escaped for N-Triples
+    and Turtle.  Characters beyond ASCII are written as \u escapes so that
+    the text is unchanged by an ASCII file
+    """
+    text = []
+    for c in value:
+        if c == '\\':
+            text.append('\\\\')
+        elif c == '"':
+            text.append('\\"')
+        elif c == '\n':
+            text.append('\\n')
+        elif c == '\r':
+            text.append('\\r')
+        elif c == '\t':
+            text.append('\\t')
+        elif ord(c) > 0xFFFF:
+            text.append('\\U%08X' % ord(c))
+        elif ord(c) > 126 or ord(c) < 32:
+            text.append('\\u%04X' % ord(c))
+        else:
+            text.append(c)
+    return '"' + "".join(text) + '"'
+
+def rdf_uri_text(uri):
+    """
+    Given a uri, or a tag such as foaf:Person, return the full uri in angle
+    brackets for N-Triples and Turtle
+    """
+    if not uri.startswith('http'):
+        full_uri = untag_predicate(rdf_tag(uri))
+        if full_uri is not None:
+            uri = full_uri
+    return '<' + uri + '>'
+
+class RdfXmlSerializer(object):
+    """
+    RDF/XML, as made by assert_data_property and assert_resource_property.
+    Statements of the same subject in succession are written as the
+    properties of a single rdf:Description.  RDF/XML emitted as text can be
+    written as is
+    """
+    extension = ".rdf"
+    verbatim = True
+
+    def header(self):
+        return rdf_header()
+
+    def footer(self):
+        return rdf_footer()
+
+    def serialize(self, statements):
+        from xml.sax.saxutils import escape
+        entities = {'"': '&quot;'}
+        lines = []
+        subject = None
+        for [triple, resource] in statements:
+            [uri, predicate, value, lang, datatype] = triple
+            if uri != subject:
+                if subject is not None:
+                    lines.append('    </rdf:Description>\n')
+                lines.append('    <rdf:Description rdf:about="' +
+                             escape(uri, entities) + '">\n')
+                subject = uri
+            if resource:
+                lines.append('        <' + predicate + ' rdf:resource="' +
+                             escape(value, entities) + '"/>\n')
+                continue
+            element = '        <' + predicate
+            if lang is not None:
+                element = element + ' xml:lang="' + lang + '"'
+            if datatype is not None:
+                element = element + ' datatype="' + datatype + '"'
+            lines.append(element + '>' + escape(value) + '</' + predicate +
+                         '>\n')
+        if subject is not None:
+            lines.append('    </rdf:Description>\n')
+        return "".join(lines)
+
+    def serialize_rdf(self, rdf, statements):
+        return rdf
+
+class NTriplesSerializer(object):
+    """
+    N-Triples.  One line per triple, each term written in full
+    """
+    extension = ".nt"
+    verbatim = False
+
+    def header(self):
+        return ""
+
+    def footer(self):
+        return ""
+
+    def uri_text(self, uri):
+        return rdf_uri_text(uri)
+
+    def object_text(self, triple, resource):
+        [uri, predicate, value, lang, datatype] = triple
+        if resource:
+            return self.uri_text(value)
+        text = rdf_literal_text(value)
+        if lang is not None:
+            text = text + '@' + lang
+        elif datatype is not None:
+            text = text + '^^' + self.uri_text(datatype)
+        return text
+
+    def serialize(self, statements):
+        lines = []
+        for [triple, resource] in statements:
+            lines.append(rdf_uri_text(triple[0]) + ' ' +
+                         rdf_uri_text(triple[1]) + ' ' +
+                         self.object_text(triple, resource) + ' .\n')
+        return "".join(lines)
+
+    def serialize_rdf(self, rdf, statements):
+        return self.serialize(statements)
+
+class TurtleSerializer(NTriplesSerializer):
+    """
+    Turtle.  The triples of each subject are grouped.  Predicates, and
+    objects where possible, are written as tags using the prefixes of
+    turtle_prefixes
+    """
+    extension = ".ttl"
+
+    def header(self):
+        return turtle_prefixes()
+
+    def uri_text(self, uri):
+        text = rdf_uri_text(uri)
+        tag = tag_predicate(text[1:-1])
+        if tag is not None and TURTLE_NAME.match(tag):
+            return tag
+        return text
+
+    def serialize(self, statements):
+        subjects = []
+        properties = {}
+        for [triple, resource] in statements:
+            uri = triple[0]
+            if uri not in properties:
+                subjects.append(uri)
+                properties[uri] = []
+            properties[uri].append(rdf_tag(triple[1]) + ' ' +
+                                   self.object_text(triple, resource))
+        lines = []
+        for uri in subjects:
+            lines.append(rdf_uri_text(uri) + '\n    ' +
+                         ' ;\n    '.join(properties[uri]) + ' .\n\n')
+        return "".join(lines)
+
+RDF_SERIALIZERS = {
+    'rdfxml': RdfXmlSerializer,
+    'ntriples': NTriplesSerializer,
+    'turtle': TurtleSerializer
+    }
+
+class RdfWriter(object):
+    """
+    Write RDF to a file as it is produced.  Ingests used to build the whole
+    of the add and sub RDF in a single string, copying the string for every
+    entity processed.  An RdfWriter writes the header when opened, each chunk
+    of RDF as it is emitted, and the footer when closed, so memory use stays
+    flat however many entities are processed.
+
+    format names the serializer in RDF_SERIALIZERS used to write the file,
+    RDF_FORMAT by default.  The RDF/XML emitted is read back as statements
+    by rdf_statements.  Statements are held until window of them have been
+    emitted, RDF_GROUP_WINDOW by default.  Exact duplicates in the window are
+    dropped and the rest written grouped by subject, one rdf:Description per
+    subject.  With a window of 0 and no chunking, RDF/XML is written as
+    emitted, without being read
+
+    If max_triples or max_bytes is more than 0, RDF_CHUNK_TRIPLES and
+    RDF_CHUNK_BYTES by default, the RDF is written to a series of files,
+    each a complete document of no more than max_triples triples and
+    max_bytes bytes.  people_add.rdf is written as people_add_0001.rdf,
+    people_add_0002.rdf and so on.  A subject's statements in a window are
+    kept in one file.  When the writer is closed, people_add_manifest.txt
+    lists the files written and their triple and byte counts, separated by
+    "|" as for read_csv.  manifest holds the same as a list.
+
+    If compress is True, RDF_COMPRESS by default, each file is written as a
+    gzip stream, named with .gz added: people_add.rdf.gz.  max_bytes and
+    the manifest count bytes before compression.
+
+    Usage:
+        add_file = RdfWriter(file_name+"_add.rdf")
+        [add, sub] = update_person(vivo_person, source_person)
+        add_file.write(add)
+        add_file.close()
+
+        add_file = RdfWriter(file_name+"_add.nt", format='ntriples')
+        add_file = RdfWriter(file_name+"_add.rdf", max_triples=50000)
+        add_file = RdfWriter(file_name+"_add.rdf", compress=True)
+    """
+    def __init__(self, file_name, format=None, window=None, max_triples=None,
+                 max_bytes=None, compress=None):
+        if format is None:
+            format = RDF_FORMAT
+        if format not in RDF_SERIALIZERS:
+            raise UnknownRdfFormat(format)
+        if window is None:
+            window = RDF_GROUP_WINDOW
+        if max_triples is None:
+            max_triples = RDF_CHUNK_TRIPLES
+        if max_bytes is None:
+            max_bytes = RDF_CHUNK_BYTES
+        if compress is None:
+            compress = RDF_COMPRESS
+        self.file_name = file_name
+        self.format = format
+        self.serializer = RDF_SERIALIZERS[format]()
+        self.window = window
+        self.pending = []
+        self.seen = set()
+        self.duplicates = 0
+        self.max_triples = max_triples
+        self.max_bytes = max_bytes
+        self.chunked = max_triples > 0 or max_bytes > 0
+        self.compress = compress
+        self.footer_size = len(self.serializer.footer())
+        self.manifest = []
+        self.count = 0
+        self.open_file()
+
+    def open_file(self):
+        """
+        Open the next file and write the header
+        """
+        if self.chunked:
+            [root, extension] = os.path.splitext(self.file_name)
+            name = root + "_%04d" % (len(self.manifest) + 1) + extension
+        else:
+            name = self.file_name
+        if self.compress:
+            name = name + ".gz"
+        self.file = open_data_file(name, 'wb')
+        self.manifest.append([name, 0, 0])
+        self.emit(self.serializer.header(), 0)
+
+    def close_file(self):
+        """
+        Write the footer and close the current file
+        """
+        self.emit(self.serializer.footer(), 0)
+        self.file.close()
+        self.file = None
+
+    def emit(self, text, triples):
+        """
+        Write text making triples to the current file, starting the next
+        file first if the text would take the current one over max_triples
+        or max_bytes.  Characters beyond ASCII are written as XML character
+        references
+        """
+        if isinstance(text, unicode):
+            text = text.encode('ascii', 'xmlcharrefreplace')
+        entry = self.manifest[-1]
+        if self.chunked and triples > 0 and entry[1] > 0 and \
+            ((self.max_triples > 0 and
+              entry[1] + triples > self.max_triples) or
+             (self.max_bytes > 0 and
+              entry[2] + len(text) + self.footer_size > self.max_bytes)):
+            self.close_file()
+            self.open_file()
+            entry = self.manifest[-1]
+        self.file.write(text)
+        entry[1] = entry[1] + triples
+        entry[2] = entry[2] + len(text)
+
+    def write(self, rdf):
+        """
+        Emit a chunk of RDF, such as the add or sub returned by an update
+        function.  Empty chunks are ignored.  The RDF is read as statements
+        only when they are needed, to group them, to count them for chunking
+        or to write another format
+        """
+        if rdf is None or rdf == "":
+            return
+        self.count = self.count + 1
+        if self.window == 0 and not self.chunked and self.serializer.verbatim:
+            self.emit(rdf, 0)
+            return
+        statements = rdf_statements(rdf)
+        if self.window > 0:
+            self.hold(statements)
+        else:
+            self.emit(self.serializer.serialize_rdf(rdf, statements),
+                      len(statements))
+
+    def write_statements(self, statements):
+        """
+        Emit statements, given as (triple, resource) pairs as returned by
+        rdf_statements
+        """
+        if statements == []:
+            return
+        self.count = self.count + 1
+        if self.window > 0:
+            self.hold(statements)
+        else:
+            self.emit(self.serializer.serialize(statements), len(statements))
+
+    def hold(self, statements):
+        """
+        Hold statements not seen in the window, flushing when the window is
+        full
+        """
+        for [triple, resource] in statements:
+            if (triple, resource) in self.seen:
+                self.duplicates = self.duplicates + 1
+                continue
+            self.seen.add((triple, resource))
+            self.pending.append([triple, resource])
+        if len(self.pending) >= self.window:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the statements held, grouped by subject in the order the
+        subjects were first emitted, and start a new window
+        """
+        if self.pending == []:
+            return
+        subjects = []
+        grouped = {}
+        for statement in self.pending:
+            uri = statement[0][0]
+            if uri not in grouped:
+                subjects.append(uri)
+                grouped[uri] = []
+            grouped[uri].append(statement)
+        for uri in subjects:
+            self.emit(self.serializer.serialize(grouped[uri]),
+                      len(grouped[uri]))
+        self.pending = []
+        self.seen = set()
+
+    def assert_data_property(self, uri, data_property, value):
+        """
+        Emit a single data property statement
+        """
+        self.write_statements([[make_triple(uri, data_property, value),
+                                False]])
+
+    def assert_resource_property(self, uri, resource_property, resource_uri):
+        """
+        Emit a single resource property statement
+        """
+        self.write_statements([[make_triple(uri, resource_property,
+                                            resource_uri), True]])
+
+    def close(self):
+        """
+        Write the statements held and the footer, and close the file.  If
+        the RDF was written to a series of files, write the manifest
+        """
+        if self.file is None:
+            return
+        self.flush()
+        self.close_file()
+        if self.chunked:
+            [root, extension] = os.path.splitext(self.file_name)
+            manifest_file = open(root + "_manifest.txt", 'w')
+            print >>manifest_file, "file|triples|bytes"
+            for [name, triples, size] in self.manifest:
+                print >>manifest_file, os.path.basename(name) + "|" + \
+                    str(triples) + "|" + str(size)
+            manifest_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
 def make_rdf_uri(uri):
     """
     Given a uri of a VIVO profile, generate the URI of the corresponding
@@ -650,11 +1469,102 @@ def key_string(s):
     k = k.lower()
     return k
 
+ABBREVIATION_TOKEN = re.compile(r'[^\W_]+|[\W_]', re.U)
+ABBREVIATION_ENDS = set([' ', '/', ',', '-', '']) # '' is the end of the string
+
+class Abbreviations(object):
+    """
+    The expansions of a table of abbreviations.  The table is text, one
+    abbreviation|words per line.  An abbreviation is one or more tokens, a
+    token being a run of letters and digits or a single other character,
+    as in Prof, Ast-R or Alumn Aff.  Where an abbreviation appears twice,
+    the first is used.
+
+    expand tokenises a string once and replaces each abbreviation that is
+    followed by one of the tokens in ends, '' standing for the end of the
+    string.  By default, ABBREVIATION_ENDS, that is a space, a slash, a
+    comma, a hyphen or the end of the string.  The longest abbreviation at
+    a token wins, so the result does not depend on the order of the table.
+
+        abbreviations = Abbreviations("Prof|Professor\nAst|Assistant")
+        title = abbreviations.expand("Ast Prof")
+    """
+    __slots__ = ['words', 'starts', 'longest', 'ends']
+
+    def __init__(self, table, ends=None):
+        if ends is None:
+            ends = ABBREVIATION_ENDS
+        self.ends = ends
+        self.words = {}
+        self.starts = set()
+        self.longest = 0
+        for line in table.split('\n'):
+            if line.strip() == "":
+                continue
+            [abbreviation, words] = line.split('|')
+            if abbreviation in self.words:
+                continue
+            self.words[abbreviation] = words
+            tokens = ABBREVIATION_TOKEN.findall(abbreviation)
+            self.starts.add(tokens[0])
+            self.longest = max(self.longest, len(tokens))
+
+    def expand(self, s):
+        """
+        Return s with its abbreviations replaced by words
+        """
+        tokens = ABBREVIATION_TOKEN.findall(s)
+        count = len(tokens)
+        result = []
+        i = 0
+        while i < count:
+            token = tokens[i]
+            if token in self.starts:
+                n = min(self.longest, count - i)
+                while n > 0:
+                    words = self.words.get("".join(tokens[i:i+n]), None)
+                    if i + n == count:
+                        end = ''
+                    else:
+                        end = tokens[i+n]
+                    if words is not None and end in self.ends:
+                        break
+                    n = n - 1
+                if n > 0:
+                    result.append(words)
+                    i = i + n
+                    continue
+            result.append(token)
+            i = i + 1
+        return "".join(result)
+
+def expand_abbreviations(s, table, ends=None):
+    """
+    Given a string s and a table of abbreviations as for Abbreviations,
+    return s with the abbreviations replaced by words.  ends, if given, is
+    the set of tokens that may follow an abbreviation, as for Abbreviations.
+    Each table is parsed the first time it is seen and held in
+    abbreviation_cache
+    """
+    if ends is not None:
+        ends = frozenset(ends)
+    key = (table, ends)
+    abbreviations = abbreviation_cache.get(key, None)
+    if abbreviations is None:
+        abbreviations = Abbreviations(table, ends)
+        abbreviation_cache[key] = abbreviations
+    return abbreviations.expand(s)
+
 def get_triples(uri):
     """
     Given a VIVO URI, return all the triples referencing that URI as subject
+
+    If the triples for the uri have been fetched by prefetch_triples, they
+    are returned from memory without a query
     """
-    query = tempita.Template("""
+    if uri in triples_cache:
+        return triples_cache[uri]
+    query = cached_template("""
     SELECT ?p ?o WHERE
     {
     <{{uri}}> ?p ?o .
@@ -663,6 +1573,76 @@ def get_triples(uri):
     result = vivo_sparql_query(query)
     return result
 
+def get_triples_many(uris, batch_size=TRIPLES_BATCH_SIZE):
+    """
+    Given a list of VIVO URIs, return all the triples referencing each URI
+    as subject.  The subjects are sent batch_size at a time in a VALUES
+    block, so hundreds of subjects cost one query rather than hundreds.
+
+    The result is a dictionary keyed by subject uri.  Each value has the
+    same form as the result of get_triples for that uri.  A uri with no
+    triples has an empty list of bindings.  Subjects in a batch whose query
+    failed are left out of the dictionary.
+    """
+    triples = {}
+    subjects = []
+    for uri in uris:
+        if uri not in subjects:
+            subjects.append(uri)
+    for k in range(0, len(subjects), batch_size):
+        batch = subjects[k:k + batch_size]
+        query = """
+    SELECT ?s ?p ?o WHERE
+    {
+    VALUES ?s { """ + " ".join(['<' + uri + '>' for uri in batch]) + """ }
+    ?s ?p ?o .
+    }"""
+        result = vivo_sparql_query(query)
+        try:
+            rows = result["results"]["bindings"]
+        except:
+            continue
+        triples.update(triples_by_subject(rows, batch))
+    return triples
+
+def triples_by_subject(rows, subjects=[]):
+    """
+    Given the bindings of a query returning ?s ?p ?o, return a dictionary
+    keyed by subject uri.  Each value has the same form as the result of
+    get_triples.  Each uri in subjects is included, with an empty list of
+    bindings if no rows were found for it.
+    """
+    triples = {}
+    for uri in subjects:
+        triples[uri] = {"head": {"vars": ["p", "o"]},
+                        "results": {"bindings": []}}
+    for row in rows:
+        s = row['s']['value']
+        if s not in triples:
+            triples[s] = {"head": {"vars": ["p", "o"]},
+                          "results": {"bindings": []}}
+        triples[s]["results"]["bindings"].append({'p': row['p'],
+                                                   'o': row['o']})
+    return triples
+
+def prefetch_triples(uris, batch_size=TRIPLES_BATCH_SIZE):
+    """
+    Given a list of VIVO URIs, fetch their triples with get_triples_many and
+    hold them in memory.  Until clear_triples_cache is called, get_triples
+    and every get_* accessor built on it answers for these uris without a
+    query.  URIs already held are not fetched again.
+    """
+    uris = [uri for uri in uris if uri not in triples_cache]
+    triples_cache.update(get_triples_many(uris, batch_size=batch_size))
+    return
+
+def clear_triples_cache():
+    """
+    Forget all triples held by prefetch_triples
+    """
+    triples_cache.clear()
+    return
+
 def get_types(uri):
     """
     Given a VIVO URI, return a list of its types
@@ -683,7 +1663,7 @@ def get_references(uri):
     Given a VIVO uri, return all the triples that have the given uri as an
     object
     """
-    query = tempita.Template("""
+    query = cached_template("""
     SELECT ?s ?p WHERE
     {
     ?s ?p <{{uri}}> .
@@ -703,8 +1683,15 @@ def get_vivo_value(uri, predicate):
     --  if no values meet the criteria, None is returned
     --  this function is very inefficient, making a SPARQL query for every
         value. Use only when strictly needed!
+    --  if the triples of the uri are held by prefetch_triples, the value is
+        found without a query
     """
-    query = tempita.Template("""
+    o = get_cached_value(uri, predicate)
+    if o is not None:
+        return o['value']
+    elif uri in triples_cache and untag_predicate(predicate) is not None:
+        return None
+    query = cached_template("""
     SELECT ?o WHERE
     {
     <{{uri}}> {{predicate}} ?o .
@@ -731,8 +1718,15 @@ def get_value(uri, predicate):
     --  if no values meet the criteria, None is returned
     --  this function is very inefficient, making a SPARQL query for every
         value. Use only when strictly needed!
+    --  if the triples of the uri are held by prefetch_triples, the value is
+        found without a query
     """
-    query = tempita.Template("""
+    o = get_cached_value(uri, predicate)
+    if o is not None:
+        return o
+    elif uri in triples_cache and untag_predicate(predicate) is not None:
+        return None
+    query = cached_template("""
     SELECT ?o WHERE
     {
     <{{uri}}> {{predicate}} ?o .
@@ -747,6 +1741,59 @@ def get_value(uri, predicate):
     except:
         return None
 
+def get_cached_value(uri, predicate):
+    """
+    Given a VIVO URI and a tagged predicate, return the first object
+    dictionary for the predicate from the triples held by prefetch_triples.
+    Return None if the uri is not held, the predicate has an unknown tag,
+    or the uri has no value for the predicate.
+    """
+    if uri not in triples_cache:
+        return None
+    p = untag_predicate(predicate)
+    if p is None:
+        return None
+    for b in triples_cache[uri]["results"]["bindings"]:
+        if b['p']['value'] == p:
+            return b['o']
+    return None
+
+def load_uri_index(predicate, fallback=False, debug=False):
+    """
+    Given a VIVO predicate, load the uri of every entity with a value for
+    the predicate into uri_index, keyed by value, with one query.
+    find_vivo_uri then answers for the predicate from the index.  If
+    fallback is True, values not in the index are looked up in VIVO,
+    otherwise they are not found.  Return the number of values indexed.
+    """
+    query = cached_template("""
+    SELECT ?uri ?value WHERE
+    {
+    ?uri {{predicate}} ?value .
+    }
+    """)
+    query = query.substitute(predicate=predicate)
+    result = vivo_sparql_query(query, debug=debug)
+    index = {}
+    for b in result["results"]["bindings"]:
+        value = b['value']['value']
+        if value not in index:
+            index[value] = b['uri']['value']
+    uri_index[predicate] = index
+    uri_index_fallback[predicate] = fallback
+    return len(index)
+
+def clear_uri_index(predicate=None):
+    """
+    Remove the index for predicate, or for all predicates, from uri_index
+    """
+    if predicate is None:
+        uri_index.clear()
+        uri_index_fallback.clear()
+    elif predicate in uri_index:
+        del uri_index[predicate]
+        del uri_index_fallback[predicate]
+
 def find_vivo_uri(predicate, value):
     """
     Given a VIVO predicate, and a value, return the first uri in VIVO that
@@ -757,10 +1804,17 @@ def find_vivo_uri(predicate, value):
     --  if the there are multiple uris that meet the criteria, the first one
         is returned
     --  if no values meet the criteria, None is returned
-    --  this function is very inefficient, making a SPARQL query for every
-        value. Use only when strictly needed!
-    """
-    query = tempita.Template("""
+    --  without an index this function is very inefficient, making a SPARQL
+        query for every value.  Use load_uri_index to index the values of a
+        predicate before looking up many of them
+    """
+    if predicate in uri_index:
+        index = uri_index[predicate]
+        if value in index:
+            return index[value]
+        if not uri_index_fallback[predicate]:
+            return None
+    query = cached_template("""
     SELECT ?uri WHERE
     {
     ?uri {{predicate}} "{{value}}" .
@@ -772,9 +1826,11 @@ def find_vivo_uri(predicate, value):
     try:
         b = result["results"]["bindings"][0]
         uri = b['uri']['value']
-        return uri
     except:
         return None
+    if predicate in uri_index:
+        uri_index[predicate][value] = uri
+    return uri
 
 
 def show_triples(triples):
@@ -985,6 +2041,77 @@ def get_datetime_interval(datetime_interval_uri):
     return datetime_interval
 
 
+def cached_dictionary_query(name, query, subject=None, debug=False):
+    """
+    Given a name, a dictionary query and the name of the query variable
+    holding the entity uri, return the query result from a snapshot kept in
+    DICTIONARY_CACHE_DIR.
+
+    Snapshots are used only when DICTIONARY_CACHE_TTL is set.  By default
+    it is 0 and the query is always run, so a dictionary always sees the
+    RDF loaded by the previous run, and any deletions.
+
+    A snapshot younger than DICTIONARY_CACHE_TTL hours is returned as is.
+    An older snapshot is refreshed by querying only the subjects whose
+    ufv:dateHarvested is later than the snapshot.  Rows for those subjects
+    replace the rows in the snapshot.  With no subject, no snapshot, or a
+    snapshot older than DICTIONARY_CACHE_REBUILD days, the full query is run.
+
+    Entities without ufv:dateHarvested are only seen by a full query.
+    """
+    if DICTIONARY_CACHE_TTL <= 0:
+        return vivo_sparql_query(query, debug=debug)
+    file_name = os.path.join(DICTIONARY_CACHE_DIR, name + ".json")
+    now = datetime.now()
+    taken = now.strftime('%Y-%m-%dT%H:%M:%S')
+    snapshot = None
+    if os.path.exists(file_name):
+        try:
+            snapshot_file = open(file_name)
+            snapshot = json.load(snapshot_file)
+            snapshot_file.close()
+        except ValueError:
+            snapshot = None
+    if snapshot is not None:
+        age = now - datetime.strptime(snapshot['taken'], '%Y-%m-%dT%H:%M:%S')
+        built = datetime.strptime(snapshot['built'], '%Y-%m-%dT%H:%M:%S')
+        if age < timedelta(hours=DICTIONARY_CACHE_TTL):
+            if debug:
+                print "Dictionary", name, "from snapshot", snapshot['taken']
+            return snapshot['result']
+        if subject is None or \
+            now - built >= timedelta(days=DICTIONARY_CACHE_REBUILD):
+            snapshot = None
+    if snapshot is None:
+        result = vivo_sparql_query(query, debug=debug)
+        snapshot = {'built': taken, 'taken': taken, 'result': result}
+    else:
+        k = query.rfind('}')
+        harvested_query = query[0:k] + "?" + subject + \
+            " ufv:dateHarvested ?harvested .\n" + \
+            "    FILTER (str(?harvested) > \"" + snapshot['taken'] + \
+            "\")\n" + \
+            "    " + query[k:]
+        update = vivo_sparql_query(harvested_query, debug=debug)
+        bindings = update["results"]["bindings"]
+        updated = set()
+        for b in bindings:
+            updated.add(b[subject]['value'])
+        for b in snapshot['result']["results"]["bindings"]:
+            if b[subject]['value'] not in updated:
+                bindings.append(b)
+        if debug:
+            print "Dictionary", name, "refreshed", len(updated), "subjects"
+        snapshot['result']["results"]["bindings"] = bindings
+        snapshot['taken'] = taken
+    if not os.path.isdir(DICTIONARY_CACHE_DIR):
+        os.makedirs(DICTIONARY_CACHE_DIR)
+    snapshot_file = open(file_name + ".tmp", "w")
+    json.dump(snapshot, snapshot_file)
+    snapshot_file.close()
+    os.rename(file_name + ".tmp", file_name)
+    return snapshot['result']
+
 def make_concept_dictionary(debug=False):
     """
     Make a dictionary for concepts in UF VIVO.  Key is label.  Value is URI.
@@ -993,14 +2120,15 @@ def make_concept_dictionary(debug=False):
     global concept_dictionary
     concept_dictionary = {}
 
-    query = tempita.Template("""
+    query = cached_template("""
         SELECT ?uri ?label WHERE
         {
         ?uri a skos:Concept .
         ?uri rdfs:label ?label .
         }""")
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('concept', query, 'uri',
+                                     debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1021,7 +2149,7 @@ def make_concept_rdf(label):
     """
     Given a concept label, create a concept in VIVO
     """
-    concept_template = tempita.Template("""
+    concept_template = cached_template("""
     <rdf:Description rdf:about="{{concept_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://www.w3.org/2004/02/skos/core#Concept"/>
@@ -1037,14 +2165,14 @@ def make_deptid_dictionary(debug=False):
     """
     Make a dictionary for orgs in UF VIVO.  Key is DeptID.  Value is URI.
     """
-    query = tempita.Template("""
+    query = cached_template("""
     SELECT ?x ?deptid WHERE
     {
     ?x rdf:type foaf:Organization .
     ?x ufVivo:deptID ?deptid .
     }""")
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('deptid', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1083,14 +2211,15 @@ def make_date_dictionary(datetime_precision="vivo:yearMonthDayPrecision",
     date value.
     """
     date_dictionary = {}
-    query = tempita.Template("""
+    query = cached_template("""
     SELECT ?uri ?dt
     WHERE {
       ?uri vivo:dateTimePrecision {{datetime_precision}} .
       ?uri vivo:dateTime ?dt .
     }""")
     query = query.substitute(datetime_precision=datetime_precision)
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('date_' +
+        datetime_precision.replace('vivo:', ''), query, debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1121,7 +2250,7 @@ def make_datetime_interval_dictionary(debug=False):
     Make a dictionary for datetime intervals in UF VIVO.
     Key is concatenation of start and end uris.  Value is URI.
     """
-    query = tempita.Template("""
+    query = cached_template("""
     SELECT ?uri ?starturi ?enduri
     WHERE
     {
@@ -1130,7 +2259,8 @@ def make_datetime_interval_dictionary(debug=False):
     }
     """)
     query = query.substitute()
-    result = vt.vivo_sparql_query(query)
+    result = cached_dictionary_query('datetime_interval', query,
+                                     debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1191,7 +2321,7 @@ def make_webpage_rdf(full_text_uri, \
     """
     if full_text_uri is None:
         return ["", None]
-    full_text_url_rdf_template = tempita.Template("""
+    full_text_url_rdf_template = cached_template("""
     <rdf:Description rdf:about="{{webpage_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://vivoweb.org/ontology/core#URLLink"/>
@@ -1214,24 +2344,220 @@ def make_webpage_rdf(full_text_uri, \
         harvest_datetime=harvest_datetime)
     return [rdf, webpage_uri]
 
-def get_vivo_uri():
+def reserve_vivo_uris(count=VIVO_URI_BLOCK_SIZE):
     """
-    Find an unused VIVO URI with the specified VIVO_URI_PREFIX
+    Draw count random candidate URIs with the specified VIVO_URI_PREFIX and
+    check them all in one query.  Candidates not used in VIVO, either as
+    subject or as object, are added to the reserve used by get_vivo_uri.
+    Candidates already issued or reserved in this run are never drawn.
     """
-    test_uri = VIVO_URI_PREFIX + 'n' + str(random.randint(1, 9999999999))
+    candidates = []
+    while len(candidates) < count:
+        uri = VIVO_URI_PREFIX + 'n' + str(random.randint(1, 9999999999))
+        if uri not in vivo_uris_issued and uri not in vivo_uri_reserve and \
+           uri not in candidates:
+            candidates.append(uri)
+    values = " ".join(['<' + uri + '>' for uri in candidates])
     query = """
-	SELECT COUNT(?z) WHERE {
-	<""" + test_uri + """> ?y ?z
-	}"""
+    SELECT DISTINCT ?uri WHERE
+    {
+    VALUES ?uri { """ + values + """ }
+    { ?uri ?p ?o . } UNION { ?s ?p ?uri . }
+    }"""
     response = vivo_sparql_query(query)
-    while int(response["results"]["bindings"][0]['.1']['value']) != 0:
-        test_uri = prefix + str(random.randint(1, 9999999999))
-        query = """
-            SELECT COUNT(?z) WHERE {
-            <""" + test_uri + """> ?y ?z
-            }"""
-        response = vivo_sparql_query(query)
-    return test_uri
+    used = set()
+    for b in response["results"]["bindings"]:
+        used.add(b['uri']['value'])
+    for uri in candidates:
+        if uri not in used:
+            vivo_uri_reserve.append(uri)
+    return
+
+def get_vivo_uri():
+    """
+    Find an unused VIVO URI with the specified VIVO_URI_PREFIX
+
+    URIs are handed out from a reserve checked VIVO_URI_BLOCK_SIZE at a
+    time by reserve_vivo_uris.  Each URI is issued once per run.
+    """
+    while len(vivo_uri_reserve) == 0:
+        reserve_vivo_uris()
+    uri = vivo_uri_reserve.pop()
+    vivo_uris_issued.add(uri)
+    return uri
+
+class SparqlConnectionPool(object):
+    """
+    A pool of persistent HTTP/1.1 connections to SPARQL endpoints.  Ingests
+    make thousands of queries.  Opening a new TCP connection for each query
+    costs more than the query itself.  The pool keeps up to size idle
+    connections per endpoint and hands them out again for the next query.
+
+    Connections the server has closed are detected on use and replaced.
+    """
+    def __init__(self, size=VIVO_QUERY_POOL_SIZE, timeout=60):
+        self.size = size
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def get_connection(self, key):
+        """
+        Return an idle connection for key (scheme, host, port) or a new one
+        """
+        with self.lock:
+            connections = self.idle.get(key, [])
+            if len(connections) > 0:
+                return connections.pop()
+        [scheme, host, port] = key
+        if scheme == 'https':
+            return httplib.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            return httplib.HTTPConnection(host, port, timeout=self.timeout)
+
+    def release_connection(self, key, connection):
+        """
+        Return a connection to the pool.  Connections beyond the pool size
+        are closed
+        """
+        with self.lock:
+            connections = self.idle.setdefault(key, [])
+            if len(connections) < self.size:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def resize(self, size):
+        """
+        Change the number of idle connections kept per endpoint
+        """
+        self.size = size
+        with self.lock:
+            for connections in self.idle.values():
+                while len(connections) > size:
+                    connections.pop().close()
+
+    def close(self):
+        """
+        Close all idle connections
+        """
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle = {}
+
+    def post(self, url, body):
+        """
+        POST a form encoded body to url and return the response text, as
+        urllib.urlopen would, whatever the HTTP status.  A pooled connection
+        that turns out to be stale is discarded and the request is sent once
+        more on a fresh connection.  Other errors are raised to the caller.
+        """
+        parts = urlparse.urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path = path + '?' + parts.query
+        headers = {"Content-Type": "application/x-www-form-urlencoded",
+                   "Connection": "keep-alive"}
+        attempt = 0
+        while True:
+            attempt = attempt + 1
+            connection = self.get_connection(key)
+            try:
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (httplib.HTTPException, socket.error):
+                connection.close()
+                if attempt < 2:
+                    continue
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.release_connection(key, connection)
+            return data
+
+sparql_pool = SparqlConnectionPool()
+
+def set_sparql_pool_size(size):
+    """
+    Set the number of keep-alive connections held open to each SPARQL
+    endpoint.  Use a size of 0 to close connections after each query
+    """
+    sparql_pool.resize(size)
+
+def threaded_map(function, items, threads=SPARQL_THREADS):
+    """
+    Apply function to each of items in a pool of threads, yielding the
+    results in the order of items.  Use for functions that spend their time
+    waiting on SPARQL queries.  Each thread makes one query at a time, so
+    threads limits the number of queries in flight.  No more than twice
+    threads items are taken ahead of the result being yielded.
+
+    An exception raised by function is raised again when its result would
+    have been yielded.
+    """
+    import Queue
+    if threads <= 1:
+        for item in items:
+            yield function(item)
+        return
+    if sparql_pool.size < threads:
+        set_sparql_pool_size(threads)
+    tasks = Queue.Queue()
+    done = {}
+    condition = threading.Condition()
+
+    def work():
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            [i, item] = task
+            try:
+                result = [True, function(item)]
+            except Exception:
+                result = [False, sys.exc_info()]
+            with condition:
+                done[i] = result
+                condition.notify_all()
+
+    workers = []
+    for k in range(threads):
+        worker = threading.Thread(target=work)
+        worker.daemon = True
+        worker.start()
+        workers.append(worker)
+    try:
+        items = iter(items)
+        submitted = 0
+        exhausted = False
+        i = 0
+        while True:
+            while not exhausted and submitted - i < 2 * threads:
+                try:
+                    tasks.put([submitted, items.next()])
+                    submitted = submitted + 1
+                except StopIteration:
+                    exhausted = True
+            if exhausted and i == submitted:
+                break
+            with condition:
+                while i not in done:
+                    condition.wait()
+                [ok, result] = done.pop(i)
+            i = i + 1
+            if not ok:
+                raise result[0], result[1], result[2]
+            yield result
+    finally:
+        for worker in workers:
+            tasks.put(None)
 
 def vivo_sparql_query(query,
     baseURL=VIVO_QUERY_URI,
@@ -1286,7 +2612,7 @@ def vivo_sparql_query(query,
     count = 0
     while True:
         try:
-            response = urllib.urlopen(baseURL, querypart).read()
+            response = sparql_pool.post(baseURL, querypart)
             break
         except:
             count = count + 1
@@ -18,13 +18,189 @@ __copyright__ = "Copyright 2014, University of Florida"
 __license__ = "BSD 3-Clause license"
 __version__ = "0.0"
 
+GRANT_ABBREVIATIONS = """
+'S|'s
+2blnd|Double-blind
+A|a
+Aav|AAV
+Aca|Academic
+Acad|Academic
+Acp|ACP
+Acs|ACS
+Act|Acting
+Adj|Adjunct
+Adm|Administrator
+Admin|Administrative
+Adv|Advisory
+Advanc|Advanced
+Aff|Affiliate
+Affl|Affiliate
+Ahec|AHEC
+Aldh|ALDH
+Alk1|ALK1
+Alumn Aff|Alumni Affairs
+Amd3100|AMD3100
+And|and
+Aso|Associate
+Asoc|Associate
+Assoc|Associate
+Ast|Assistant
+Ast-G|Grading Assistant
+Ast-R|Research Assistant
+Ast-T|Teaching Assistant
+Bpm|BPM
+Brcc|BRCC
+Cfo|Chief Financial Officer
+Cio|Chief Information Officer
+Clin|Clinical
+Clncl|Clinical
+Cms|CMS
+Cns|CNS
+Cncr|Cancer
+Co|Courtesy
+Cog|COG
+Communic|Communications
+Compar|Compare
+Coo|Chief Operating Officer
+Copd|COPD
+Cpb|CPB
+Crd|Coordinator
+Ctr|Center
+Cty|County
+Dbs|DBS
+Dev|Development
+Devel|Development
+Dist|Distinguished
+Dna|DNA
+Doh|DOH
+Double Blinded|Double-blind
+Dtra0001|DTRA0001
+Dtra0016|DTRA-0016
+Educ|Education
+Emer|Emeritus
+Emin|Eminent
+Enforce|Enforcement
+Eng|Engineer
+Environ|Environmental
+Epr|EPR
+Eval|Evaluation
+Ext|Extension
+Fdot|FDOT
+Fdots|FDOT
+Fhtcc|FHTCC
+Finan|Financial
+Fla|Florida
+Fllw|Follow
+For|for
+Gen|General
+Gis|GIS
+Grad|Graduate
+Hcv|HCV
+Hiv|HIV
+Hlb|HLB
+Hlth|Health
+Hou|Housing
+Ica|ICA
+Icd|ICD
+Ieee|IEEE
+Ifas|IFAS
+Ii|II
+Iii|III
+In|in
+Info|Information
+Ipa|IPA
+Ipm|IPM
+Ippd|IPPD
+Ips|IPS
+It|Information Technology
+Iv|IV
+Jnt|Joint
+Lng|Long
+Mgmt|Management
+Mgr|Manager
+Mgt|Management
+Mlti|Multi
+Mltictr|Multicenter
+Mri|MRI
+Mstr|Master
+Nih|NIH
+Nmr|NMR
+Nsf|NSF
+Of|of
+On|on
+Or|or
+Opr|Operator
+Phas|Phased
+Php|PHP
+Phs|PHS
+Pky|P. K. Yonge
+Plcbo|Placebo
+Postdoc|Postdoctoral
+Pract|Practitioner
+Pres5|President 5
+Pres6|President 6
+Prg|Programs
+Prof|Professor
+Prog|Programmer
+Progs|Programs
+Prov|Provisional
+Psr|PSR
+Radiol|Radiology
+Rcv|Receiving
+Rdmzd|Randomized
+Rep|Representative
+Res|Research
+Ret|Retirement
+Reu|REU
+Rna|RNA
+Rndmzd|Randomized
+Rsch|Research
+Saf|SAF
+Sbjcts|Subjects
+Sch|School
+Se|SE
+Ser|Service
+Sfwmd|SFWMD
+Sle|SLE
+Sntc|SNTC
+Spec|Specialist
+Spnsrd|Sponsored
+Spv|Supervisor
+Sr|Senior
+Stdy|Study
+Subj|Subject
+Supp|Support
+Supt|Superintendant
+Supv|Supervisor
+Svc|Services
+Svcs|Services
+Tch|Teaching
+Tech|Technician
+Technol|Technologist
+Teh|the
+The|the
+To|to
+Trls|Trials
+Trm|Term
+Tv|TV
+Uf|UF
+Ufrf|UFRF
+Univ|University
+Us|US
+Usa|USA
+Vis|Visiting
+Vp|Vice President
+"""
+
 def improve_grant_title(s):
     """
     DSP uses a series of abbreviations to fit grant titles into limited text
     strings.  Funding agencies often restrict the length of grant titles and
     faculty often clip their titles to fit in available space.  Here we reverse
-    the process and lengthen the name for readability
+    the process and lengthen the name for readability, using the
+    abbreviations in GRANT_ABBREVIATIONS
     """
+    from vivofoundation import expand_abbreviations
     if s == "":
         return s
     if s[len(s)-1] == ',':
@@ -33,227 +209,27 @@ def improve_grant_title(s):
         s = s[0:len(s)-1]
     s = s.lower() # convert to lower
     s = s.title() # uppercase each word
-    s = s + ' '   # add a trailing space so we can find these abbreviated
-                  # words throughout the string
     t = s.replace(", ,", ",")
     t = t.replace("  ", " ")
-    t = t.replace("/", " @")
-    t = t.replace("/", " @") # might be two slashes in the input
-    t = t.replace(",", " !")
-    t = t.replace(",", " !") # might be two commas in input
-    t = t.replace("-", " #")
-    t = t.replace("'S ", "'s ")
-    t = t.replace("2-blnd ", "Double-blind ")
-    t = t.replace("2blnd ", "Double-blind ")
-    t = t.replace("A ", "a ")
-    t = t.replace("Aav ", "AAV ")
-    t = t.replace("Aca ", "Academic ")
-    t = t.replace("Acad ", "Academic ")
-    t = t.replace("Acp ", "ACP ")
-    t = t.replace("Acs ", "ACS ")
-    t = t.replace("Act ", "Acting ")
-    t = t.replace("Adj ", "Adjunct ")
-    t = t.replace("Adm ", "Administrator ")
-    t = t.replace("Admin ", "Administrative ")
-    t = t.replace("Adv ", "Advisory ")
-    t = t.replace("Advanc ", "Advanced ")
-    t = t.replace("Aff ", "Affiliate ")
-    t = t.replace("Affl ", "Affiliate ")
-    t = t.replace("Ahec ", "AHEC ")
-    t = t.replace("Aldh ", "ALDH ")
-    t = t.replace("Alk1 ", "ALK1 ")
-    t = t.replace("Alumn Aff ", "Alumni Affairs ")
-    t = t.replace("Amd3100 ", "AMD3100 ")
-    t = t.replace("And ", "and ")
-    t = t.replace("Aso ", "Associate ")
-    t = t.replace("Asoc ", "Associate ")
-    t = t.replace("Assoc ", "Associate ")
-    t = t.replace("Ast ", "Assistant ")
-    t = t.replace("Ast #G ", "Grading Assistant ")
-    t = t.replace("Ast #R ", "Research Assistant ")
-    t = t.replace("Ast #T ", "Teaching Assistant ")
-    t = t.replace("Bpm ", "BPM ")
-    t = t.replace("Brcc ", "BRCC ")
-    t = t.replace("Cfo ", "Chief Financial Officer ")
-    t = t.replace("Cio ", "Chief Information Officer ")
-    t = t.replace("Clin ", "Clinical ")
-    t = t.replace("Clncl ", "Clinical ")
-    t = t.replace("Cms ", "CMS ")
-    t = t.replace("Cns ", "CNS ")
-    t = t.replace("Cncr ", "Cancer ")
-    t = t.replace("Co ", "Courtesy ")
-    t = t.replace("Cog ", "COG ")
-    t = t.replace("Communic ", "Communications ")
-    t = t.replace("Compar ", "Compare ")
-    t = t.replace("Coo ", "Chief Operating Officer ")
-    t = t.replace("Copd ", "COPD ")
-    t = t.replace("Cpb ", "CPB ")
-    t = t.replace("Crd ", "Coordinator ")
-    t = t.replace("Ctr ", "Center ")
-    t = t.replace("Cty ", "County ")
-    t = t.replace("Dbl-bl ", "Double-blind ")
-    t = t.replace("Dbl-blnd ", "Double-blind ")
-    t = t.replace("Dbs ", "DBS ")
-    t = t.replace("Dev ", "Development ")
-    t = t.replace("Devel ", "Development ")
-    t = t.replace("Dist ", "Distinguished ")
-    t = t.replace("Dna ", "DNA ")
-    t = t.replace("Doh ", "DOH ")
-    t = t.replace("Doh/cms ", "DOH/CMS ")
-    t = t.replace("Double Blinded ", "Double-blind ")
-    t = t.replace("Double-blinded ", "Double-blind ")
-    t = t.replace("Dpt-1 ", "DPT-1 ")
-    t = t.replace("Dtra0001 ", "DTRA0001 ")
-    t = t.replace("Dtra0016 ", "DTRA-0016 ")
-    t = t.replace("Educ ", "Education ")
-    t = t.replace("Eff/saf ", "Safety and Efficacy ")
-    t = t.replace("Emer ", "Emeritus ")
-    t = t.replace("Emin ", "Eminent ")
-    t = t.replace("Enforce ", "Enforcement ")
-    t = t.replace("Eng ", "Engineer ")
-    t = t.replace("Environ ", "Environmental ")
-    t = t.replace("Epr ", "EPR ")
-    t = t.replace("Eval ", "Evaluation ")
-    t = t.replace("Ext ", "Extension ")
-    t = t.replace("Fdot ", "FDOT ")
-    t = t.replace("Fdots ", "FDOT ")
-    t = t.replace("Fhtcc ", "FHTCC ")
-    t = t.replace("Finan ", "Financial ")
-    t = t.replace("Fla ", "Florida ")
-    t = t.replace("Fllw ", "Follow ")
-    t = t.replace("For ", "for ")
-    t = t.replace("G-csf ", "G-CSF ")
-    t = t.replace("Gen ", "General ")
-    t = t.replace("Gis ", "GIS ")
-    t = t.replace("Gm-csf ", "GM-CSF ")
-    t = t.replace("Grad ", "Graduate ")
-    t = t.replace("Hcv ", "HCV ")
-    t = t.replace("Hiv ", "HIV ")
-    t = t.replace("Hiv-infected ", "HIV-infected ")
-    t = t.replace("Hiv/aids ", "HIV/AIDS ")
-    t = t.replace("Hlb ", "HLB ")
-    t = t.replace("Hlth ", "Health ")
-    t = t.replace("Hou ", "Housing ")
-    t = t.replace("Hsv-1 ", "HSV-1 ")
-    t = t.replace("I/ii ", "I/II ")
-    t = t.replace("I/ucrc ", "I/UCRC ")
-    t = t.replace("Ica ", "ICA ")    
-    t = t.replace("Icd ", "ICD ")
-    t = t.replace("Ieee ", "IEEE ")
-    t = t.replace("Ifas ", "IFAS ")
-    t = t.replace("Igf-1 ", "IGF-1 ")
-    t = t.replace("Ii ", "II ")
-    t = t.replace("Ii/iii ", "II/III ")
-    t = t.replace("Iii ", "III ")
-    t = t.replace("In ", "in ")
-    t = t.replace("Info ", "Information ")
-    t = t.replace("Inter-vention ", "Intervention ")
-    t = t.replace("Ipa ", "IPA ")
-    t = t.replace("Ipm ", "IPM ")
-    t = t.replace("Ippd ", "IPPD ")
-    t = t.replace("Ips ", "IPS ")
-    t = t.replace("It ", "Information Technology ")
-    t = t.replace("Iv ", "IV ")
-    t = t.replace("Jnt ", "Joint ")
-    t = t.replace("Lng ", "Long ")
-    t = t.replace("Mgmt ", "Management ")
-    t = t.replace("Mgr ", "Manager ")
-    t = t.replace("Mgt ", "Management ")
-    t = t.replace("Mlti ", "Multi ")
-    t = t.replace("Mlti-ctr ", "Multicenter ")
-    t = t.replace("Mltictr ", "Multicenter ")
-    t = t.replace("Mri ", "MRI ")
-    t = t.replace("Mstr ", "Master ")
-    t = t.replace("Multi-center ", "Multicenter ")
-    t = t.replace("Multi-ctr ", "Multicenter ")
-    t = t.replace("Nih ", "NIH ")
-    t = t.replace("Nmr ", "NMR ")
-    t = t.replace("Nsf ", "NSF ")
-    t = t.replace("Of ", "of ")
-    t = t.replace("On ", "on ")
-    t = t.replace("Or ", "or ")
-    t = t.replace("Open-labeled ", "Open-label ")
-    t = t.replace("Opn-lbl ", "Open-label ")
-    t = t.replace("Opr ", "Operator ")
-    t = t.replace("Phas ", "Phased ")
-    t = t.replace("Php ", "PHP ")
-    t = t.replace("Phs ", "PHS ")
-    t = t.replace("Pk/pd ", "PK/PD ")
-    t = t.replace("Pky ", "P. K. Yonge ")
-    t = t.replace("Pky ", "PK Yonge ")
-    t = t.replace("Plcb-ctrl ", "Placebo-controlled ")
-    t = t.replace("Plcbo ", "Placebo ")
-    t = t.replace("Plcbo-ctrl ", "Placebo-controlled ")
-    t = t.replace("Postdoc ", "Postdoctoral ")
-    t = t.replace("Pract ", "Practitioner ")
-    t = t.replace("Pres5 ", "President 5 ")
-    t = t.replace("Pres6 ", "President 6 ")
-    t = t.replace("Prg ", "Programs ")
-    t = t.replace("Prof ", "Professor ")
-    t = t.replace("Prog ", "Programmer ")
-    t = t.replace("Progs ", "Programs ")
-    t = t.replace("Prov ", "Provisional ")
-    t = t.replace("Psr ", "PSR ")
-    t = t.replace("Radiol ", "Radiology ")
-    t = t.replace("Rcv ", "Receiving ")
-    t = t.replace("Rdmzd ", "Randomized ")
-    t = t.replace("Rep ", "Representative ")
-    t = t.replace("Res ", "Research ")
-    t = t.replace("Ret ", "Retirement ")
-    t = t.replace("Reu ", "REU ")
-    t = t.replace("Rna ", "RNA ")
-    t = t.replace("Rndmzd ", "Randomized ")
-    t = t.replace("Roc-124 ", "ROC-124 ")
-    t = t.replace("Rsch ", "Research ")
-    t = t.replace("Saf ", "SAF ")
-    t = t.replace("Saf/eff ", "Safety and Efficacy ")
-    t = t.replace("Sbjcts ", "Subjects ")
-    t = t.replace("Sch ", "School ")
-    t = t.replace("Se ", "SE ")
-    t = t.replace("Ser ", "Service ")
-    t = t.replace("Sfwmd ", "SFWMD ")
-    t = t.replace("Sle ", "SLE ")
-    t = t.replace("Sntc ", "SNTC ")
-    t = t.replace("Spec ", "Specialist ")
-    t = t.replace("Spnsrd ", "Sponsored ")
-    t = t.replace("Spv ", "Supervisor ")
-    t = t.replace("Sr ", "Senior ")
-    t = t.replace("Stdy ", "Study ")
-    t = t.replace("Subj ", "Subject ")
-    t = t.replace("Supp ", "Support ")
-    t = t.replace("Supt ", "Superintendant ")
-    t = t.replace("Supv ", "Supervisor ")
-    t = t.replace("Svc ", "Services ")
-    t = t.replace("Svcs ", "Services ")
-    t = t.replace("Tch ", "Teaching ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Technol ", "Technologist ")
-    t = t.replace("Teh ", "the ")
-    t = t.replace("The ", "the ")
-    t = t.replace("To ", "to ")
-    t = t.replace("Trls ", "Trials ")
-    t = t.replace("Trm ", "Term ")
-    t = t.replace("Tv ", "TV ")
-    t = t.replace("Uf ", "UF ")
-    t = t.replace("Ufrf ", "UFRF ")
-    t = t.replace("Univ ", "University ")
-    t = t.replace("Us ", "US ")
-    t = t.replace("Usa ", "USA ")
-    t = t.replace("Vis ", "Visiting ")
-    t = t.replace("Vp ", "Vice President ")
-    t = t.replace("Wuft-Fm ", "WUFT-FM ")
-    t = t.replace(" @", "/") # restore /
-    t = t.replace(" @", "/")
-    t = t.replace(" !", ",") # restore ,
-    t = t.replace(" !", ",") # restore ,
-    t = t.replace(" #", "-") # restore -
-    return t[0].upper() + t[1:-1] # Take off the trailing space
+    t = expand_abbreviations(t, GRANT_ABBREVIATIONS)
+    return t[0].upper() + t[1:]
 
 def get_grant(grant_uri, get_investigators=False):
     """
     Given a URI, return an object that contains the grant it represents
+
+    The roles, sponsor, administering org and datetime interval of the grant
+    are fetched together in one batched query before they are dereferenced.
+    They are held only while the grant is read
     """
+    from vivofoundation import triples_cache
+    from vivofoundation import get_triples
+    from vivofoundation import prefetch_triples
+    from vivofoundation import get_organization
+    from vivofoundation import get_datetime_interval
+    from vivofoundation import get_role
+    from vivopeople import get_person
+
     grant = {'grant_uri':grant_uri}
     grant['contributing_role_uris'] = []
     grant['pi_uris'] = []
@@ -266,6 +242,25 @@ def get_grant(grant_uri, get_investigators=False):
         count = len(triples["results"]["bindings"])
     except:
         count = 0
+
+    # fetch the triples of every referenced entity in one batch
+
+    referent_predicates = [
+        "http://vivoweb.org/ontology/core#contributingRole",
+        "http://vivoweb.org/ontology/core#administeredBy",
+        "http://vivoweb.org/ontology/core#grantAwardedBy",
+        "http://vivoweb.org/ontology/core#dateTimeInterval"
+        ]
+    referents = []
+    i = 0
+    while i < count:
+        b = triples["results"]["bindings"][i]
+        if b['p']['value'] in referent_predicates:
+            referents.append(b['o']['value'])
+        i = i + 1
+    held = [uri for uri in set(referents) if uri not in triples_cache]
+    prefetch_triples(referents)
+
     i = 0
     while i < count:
         b = triples["results"]["bindings"][i]
@@ -363,6 +358,12 @@ def get_grant(grant_uri, get_investigators=False):
                     get_person(role['investigator_role_of'])
                 person['role'] = 'investigator'
                 grant['investigators'].append(person)
+
+    # let go of the prefetched triples.  Triples already held by the caller
+    # are left alone
+
+    for uri in held:
+        triples_cache.pop(uri, None)
     return grant
 
 def string_from_grant(grant):
@@ -397,7 +398,9 @@ def make_grant_dictionary(debug=False):
     """
     Make a dictionary for grants in UF VIVO.  Key is pcn.  Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?uri (SAMPLE(DISTINCT ?xpcn) AS ?pcn) WHERE
     {
     ?uri rdf:type vivo:Grant .
@@ -406,7 +409,7 @@ def make_grant_dictionary(debug=False):
     GROUP BY ?uri
     """)
     query = query.substitute()
-    result = vt.vivo_sparql_query(query)
+    result = cached_dictionary_query('grant', query, 'uri', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -429,14 +432,16 @@ def make_sponsor_dictionary(debug=False):
     """
     Make a dictionary for sponsors in UF VIVO.  Key is Sponsor.  Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?sponsorid WHERE
     {
     ?x rdf:type foaf:Organization .
     ?x ufVivo:sponsorID ?sponsorid .
     }""")
     query = query.substitute()
-    result = vt.vivo_sparql_query(query)
+    result = cached_dictionary_query('sponsor', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -472,17 +477,17 @@ def add_grant(grant_data):
     """
     Given grant data, create a grant object in VIVO.  Return the RDF and URI
     """
-    ardf = ""
+    ardf = []
     grant_uri = vt.get_vivo_uri()
     [add, sub] = vt.update_resource_property(grant_uri, "rdf:type", None,
         "http://www.w3.org/2002/07/owl#Thing")
-    ardf = ardf + add
+    ardf.append(add)
     [add, sub] = vt.update_resource_property(grant_uri, "rdf:type", None,
         "http://vivoweb.org/ontology/core#Grant")
-    ardf = ardf + add
+    ardf.append(add)
     [add, sub] = update_grant(grant_uri, grant_data)
-    ardf = ardf + add
-    return [ardf, grant_uri]
+    ardf.append(add)
+    return ["".join(ardf), grant_uri]
 
 def update_grant(grant_uri, grant_data):
     """
@@ -503,8 +508,8 @@ def update_grant(grant_uri, grant_data):
                  'dti_uri':'vivo:dateTimeInterval',
                  'sponsor_uri':'vivo:grantAwardedBy'}
 
-    ardf = ""
-    srdf = ""
+    ardf = []
+    srdf = []
     grant = vt.get_grant(grant_uri)
 
     # Update properties
@@ -524,8 +529,8 @@ def update_grant(grant_uri, grant_data):
             source_value = None
         [add, sub] = vt.update_data_property(grant_uri, properties[property],
                                          vivo_value, source_value)
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     # Update resources
 
@@ -544,8 +549,8 @@ def update_grant(grant_uri, grant_data):
             source_value = None
         [add, sub] = vt.update_resource_property(grant_uri, resources[resource],
                                          vivo_value, source_value)
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     # Update the roles
 
@@ -583,7 +588,7 @@ def update_grant(grant_uri, grant_data):
 
                 role_uri = grant['role_uris'][uri]
                 sub = vt.remove_uri(role_uri)
-                srdf = srdf + sub
+                srdf.append(sub)
 
             else:
 
@@ -594,46 +599,46 @@ def update_grant(grant_uri, grant_data):
                 role_uri = vt.get_vivo_uri()
                 [add, sub] = vt.update_resource_property(role_uri, "rdf:type",
                     None, "http://www.w3.org/2002/07/owl#Thing")
-                ardf = ardf + add
+                ardf.append(add)
                 [add, sub] = vt.update_resource_property(role_uri, "rdf:type",
                     None, "http://vivoweb.org/ontology/core#Role")
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri, "rdf:type",
                     None, "http://vivoweb.org/ontology/core#ResearcherRole")
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri, "rdf:type",
                     None, "http://vivoweb.org/ontology/core#InvestigatorRole")
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri, "rdf:type",
                     None, role_type)
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri, role_property,
                     None, uri)
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri,
                     "vivo:dateTimeInterval",
                     None, grant_data['dti_uri'])
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(grant_uri, \
                     "vivo:contributingRole", None, role_uri)
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(role_uri, \
                     "vivo:roleContributesTo", None, grant_uri)
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
                 [add, sub] = vt.update_resource_property(uri, \
                     person_role, None, role_uri)
-                ardf = ardf + add
-                srdf = srdf + sub
+                ardf.append(add)
+                srdf.append(sub)
 
-    return [ardf, srdf]
+    return ["".join(ardf), "".join(srdf)]
 
 
 
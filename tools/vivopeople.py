@@ -28,17 +28,38 @@ __version__ = "2.00"
 
 import re
 
-def repair_email(email, exp = re.compile(r'\w+\.*\w+@\w+\.(\w+\.*)*\w+')):
+EMAIL_PATTERN = re.compile(r'\w+\.*\w+@\w+\.(\w+\.*)*\w+')
+PHONE_NON_DIGITS = re.compile(r'[^0-9]+')
+
+email_cache = {}
+phone_number_cache = {}
+
+def repair_email(email):
     """
-    Given an email string, fix it
+    Given an email string, fix it.  Repaired emails are remembered in
+    email_cache
     """
-    s = exp.search(email)
+    if email in email_cache:
+        return email_cache[email]
+    s = EMAIL_PATTERN.search(email)
     if s is None:
-        return ""
+        repaired = ""
     elif s.group() is not None:
-        return s.group()
+        repaired = s.group()
     else:
-        return ""
+        repaired = ""
+    email_cache[email] = repaired
+    return repaired
+
+def repair_emails(emails):
+    """
+    Given a list of email strings, return the list of repaired emails.
+    Each distinct email is repaired once.  Emails repaired here or by
+    repair_email are remembered in email_cache
+    """
+    for email in set(emails).difference(email_cache):
+        repair_email(email)
+    return [email_cache[email] for email in emails]
 
 def repair_phone_number(phone, debug=False):
     """
@@ -46,7 +67,11 @@ def repair_phone_number(phone, debug=False):
     return a best attempt to format the phone number according to ITU standards
 
     If the phone number can not be repaired, the function reurns an empty string
+
+    Repaired phone numbers are remembered in phone_number_cache
     """
+    if phone in phone_number_cache:
+        return phone_number_cache[phone]
     phone_text = phone.encode('ascii', 'ignore') # encode to ascii
     phone_text = phone_text.lower()
     phone_text = phone_text.strip()
@@ -60,34 +85,15 @@ def repair_phone_number(phone, debug=False):
         phone_text = phone_text[3:]
     if phone_text.find('(1)') == 0:
         phone_text = phone_text[3:]
-    digits = []
-    for c in list(phone_text):
-        if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-            digits.append(c)
+    digits = PHONE_NON_DIGITS.sub('', phone_text)
     if len(digits) > 10:
         # pull off the extension
         i = phone_text.rfind(' ') # last blank
-        if i > 0:
-            extension = phone_text[i+1:]
-            extension_digits = []
-            for c in list(extension):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    extension_digits.append(c)
-            digits = [] # recalc the digits
-            for c in list(phone_text[:i+1]):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    digits.append(c)
-        elif phone_text.rfind('x') > 0:
+        if i <= 0:
             i = phone_text.rfind('x')
-            extension = phone_text[i+1:]
-            extension_digits = []
-            for c in list(extension):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    extension_digits.append(c)
-            digits = [] # recalc the digits
-            for c in list(phone_text[:i+1]):
-                if c in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']:
-                    digits.append(c)
+        if i > 0:
+            extension_digits = PHONE_NON_DIGITS.sub('', phone_text[i+1:])
+            digits = PHONE_NON_DIGITS.sub('', phone_text[:i+1])
         else:
             extension_digits = digits[10:]
             digits = digits[:10]
@@ -99,24 +105,37 @@ def repair_phone_number(phone, debug=False):
             updated_phone = '' # Another damaged phone number, not to repair
             extension_digits = None
         else:
-            updated_phone = '(352) ' + "".join(digits[0:3])+'-'+ \
-                "".join(digits[3:7])
+            updated_phone = '(352) ' + digits[0:3] + '-' + digits[3:7]
     elif len(digits) == 10:
-        updated_phone = '('+"".join(digits[0:3])+') '+"".join(digits[3:6])+ \
-            '-'+"".join(digits[6:10])
+        updated_phone = '(' + digits[0:3] + ') ' + digits[3:6] + '-' + \
+            digits[6:10]
     elif len(digits) == 5 and digits[0] == '2': # UF special
-        updated_phone = '(352) 392' + "".join(digits[1:5])
+        updated_phone = '(352) 392' + digits[1:5]
     elif len(digits) == 5 and digits[0] == '3': # another UF special
-        updated_phone = '(352) 273' + "".join(digits[1:5])
+        updated_phone = '(352) 273' + digits[1:5]
     else:
         updated_phone = '' # no repair
         extension_digits = None
     if extension_digits is not None and len(extension_digits) > 0:
-        updated_phone = updated_phone + ' ext. ' + "".join(extension_digits)
+        updated_phone = updated_phone + ' ext. ' + extension_digits
     if debug:
         print phone.ljust(25), updated_phone.ljust(25)
+    phone_number_cache[phone] = updated_phone
     return updated_phone
 
+def repair_phone_numbers(phones, debug=False):
+    """
+    Given a list of strings that attempt to represent phone numbers, return
+    the list of repaired phone numbers, as by repair_phone_number.  Each
+    distinct string is repaired once.  Departmental numbers repeat heavily,
+    so a column of phone numbers has far fewer distinct values than rows.
+    Phone numbers repaired here or by repair_phone_number are remembered
+    in phone_number_cache
+    """
+    for phone in set(phones).difference(phone_number_cache):
+        repair_phone_number(phone, debug=debug)
+    return [phone_number_cache[phone] for phone in phones]
+
 def get_position_type(salary_plan):
     """
     Given a salary plan code, map to one of the VIVO position types
@@ -166,133 +185,123 @@ def get_position_type(salary_plan):
     position_type = position_dict.get(salary_plan, None)
     return position_type
 
+JOBCODE_ABBREVIATIONS = """
+Aca|Academic
+Act|Acting
+Advanc|Advanced
+Adv|Advisory
+Agric|Agricultural
+Alumn Aff|Alumni Affairs
+Ast-R|Research Assistant
+Ast-G|Grading Assistant
+Ast-T|Teaching Assistant
+Ast|Assistant
+Affl|Affiliate
+Aso|Associate
+Asoc|Associate
+Assoc|Associate
+Bio|Biological
+Prof|Professor
+Mstr|Master
+Couns|Counselor
+Adj|Adjunct
+Dist|Distinguished
+Chr|Chair
+Cio|Chief Information Officer
+Coo|Chief Operating Officer
+Coord|Coordinator
+Co|Courtesy
+Clin|Clinical
+Dn|Dean
+Finan|Financial
+Stu|Student
+Prg|Program
+Dev|Development
+Aff|Affiliate
+Svcs|Services
+Devel|Development
+Tech|Technician
+Progs|Programs
+Facil|Facility
+Hlth|Health
+Int|Interim
+Sctst|Scientist
+Supp|Support
+Cty|County
+Ext|Extension
+Emer|Emeritus
+Enforce|Enforcement
+Environ|Environmental
+Gen|General
+Jnt|Joint
+Eng|Engineer
+Ctr|Center
+Opr|Operator
+Admin|Administrative
+Dis|Distinguished
+Ser|Service
+Rep|Representative
+Radiol|Radiology
+Technol|Technologist
+Pres|President
+Pres5|President 5
+Pres6|President 6
+Emin|Eminent
+Cfo|Chief Financial Officer
+Prov|Provisional
+Adm|Administrator
+Info|Information
+It|Information Technology
+Mgr|Manager
+Mgt|Management
+Vis|Visiting
+Phas|Phased
+Prog|Programmer
+Pract|Practitioner
+Registr|Registration
+Rsch|Research
+Rsrh|Research
+Ret|Retirement
+Sch|School
+Sci|Scientist
+Serv|Service
+Tch|Teaching
+Tele|Telecommunications
+Tv|TV
+Univ|University
+Educ|Education
+Crd|Coordinator
+Res|Research
+Dir|Director
+Pky|PK Yonge
+Rcv|Receiving
+Sr|Senior
+Spec|Specialist
+Spc|Specialist
+Spv|Supervisor
+Supv|Supervisor
+Supt|Superintendant
+Ii|II
+Iii|III
+Iv|IV
+Communic|Communications
+Postdoc|Postdoctoral
+Vp|Vice President
+"""
+
 def improve_jobcode_description(s):
     """
     HR uses a series of abbreviations to fit job titles into limited text
     strings.
     Here we attempt to reverse the process -- a short title is turned into a
-    longer one
+    longer one, using the abbreviations in JOBCODE_ABBREVIATIONS
     """
-
+    from vivofoundation import expand_abbreviations
     s = s.lower() # convert to lower
     s = s.title() # uppercase each word
-    s = s + ' '   # add a trailing space so we can find these abbreviated
-                  # words throughout the string
     t = s.replace(", ,", ",")
     t = t.replace("  ", " ")
-    t = t.replace("/", " @")
-    t = t.replace("/", " @") # might be two slashes in the input
-    t = t.replace(",", " !")
-    t = t.replace("-", " #")
-    t = t.replace("Aca ", "Academic ")
-    t = t.replace("Act ", "Acting ")
-    t = t.replace("Advanc ", "Advanced ")
-    t = t.replace("Adv ", "Advisory ")
-    t = t.replace("Agric ", "Agricultural ")
-    t = t.replace("Alumn Aff ", "Alumni Affairs ")
-    t = t.replace("Ast #R ", "Research Assistant ")
-    t = t.replace("Ast #G ", "Grading Assistant ")
-    t = t.replace("Ast #T ", "Teaching Assistant ")
-    t = t.replace("Ast ", "Assistant ")
-    t = t.replace("Affl ", "Affiliate ")
-    t = t.replace("Aso ", "Associate ")
-    t = t.replace("Asoc ", "Associate ")
-    t = t.replace("Assoc ", "Associate ")
-    t = t.replace("Bio ", "Biological ")
-    t = t.replace("Prof ", "Professor ")
-    t = t.replace("Mstr ", "Master ")
-    t = t.replace("Couns ", "Counselor ")
-    t = t.replace("Adj ", "Adjunct ")
-    t = t.replace("Dist ", "Distinguished ")
-    t = t.replace("Chr ", "Chair ")
-    t = t.replace("Cio ", "Chief Information Officer ")
-    t = t.replace("Coo ", "Chief Operating Officer ")
-    t = t.replace("Coord ", "Coordinator ")
-    t = t.replace("Co ", "Courtesy ")
-    t = t.replace("Clin ", "Clinical ")
-    t = t.replace("Dn ", "Dean ")
-    t = t.replace("Finan ", "Financial ")
-    t = t.replace("Stu ", "Student ")
-    t = t.replace("Prg ", "Program ")
-    t = t.replace("Dev ", "Development ")
-    t = t.replace("Aff ", "Affiliate ")
-    t = t.replace("Svcs ", "Services ")
-    t = t.replace("Devel ", "Development ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Progs ", "Programs ")
-    t = t.replace("Facil ", "Facility ")
-    t = t.replace("Hlth ", "Health ")
-    t = t.replace("Int ", "Interim ")
-    t = t.replace("Sctst ", "Scientist ")
-    t = t.replace("Supp ", "Support ")
-    t = t.replace("Cty ", "County ")
-    t = t.replace("Ext ", "Extension ")
-    t = t.replace("Emer ", "Emeritus ")
-    t = t.replace("Enforce ", "Enforcement ")
-    t = t.replace("Environ ", "Environmental ")
-    t = t.replace("Gen ", "General ")
-    t = t.replace("Jnt ", "Joint ")
-    t = t.replace("Eng ", "Engineer ")
-    t = t.replace("Ctr ", "Center ")
-    t = t.replace("Opr ", "Operator ")
-    t = t.replace("Admin ", "Administrative ")
-    t = t.replace("Dis ", "Distinguished ")
-    t = t.replace("Ser ", "Service ")
-    t = t.replace("Rep ", "Representative ")
-    t = t.replace("Radiol ", "Radiology ")
-    t = t.replace("Technol ", "Technologist ")
-    t = t.replace("Pres ", "President ")
-    t = t.replace("Pres5 ", "President 5 ")
-    t = t.replace("Pres6 ", "President 6 ")
-    t = t.replace("Emin ", "Eminent ")
-    t = t.replace("Cfo ", "Chief Financial Officer ")
-    t = t.replace("Prov ", "Provisional ")
-    t = t.replace("Adm ", "Administrator ")
-    t = t.replace("Info ", "Information ")
-    t = t.replace("It ", "Information Technology ")
-    t = t.replace("Mgr ", "Manager ")
-    t = t.replace("Mgt ", "Management ")
-    t = t.replace("Vis ", "Visiting ")
-    t = t.replace("Phas ", "Phased ")
-    t = t.replace("Prog ", "Programmer ")
-    t = t.replace("Pract ", "Practitioner ")
-    t = t.replace("Registr ", "Registration ")
-    t = t.replace("Rsch ", "Research ")
-    t = t.replace("Rsrh ", "Research ")
-    t = t.replace("Ret ", "Retirement ")
-    t = t.replace("Sch ", "School ")
-    t = t.replace("Sci ", "Scientist ")
-    t = t.replace("Svcs ", "Services ")
-    t = t.replace("Serv ", "Service ")
-    t = t.replace("Tch ", "Teaching ")
-    t = t.replace("Tele ", "Telecommunications ")
-    t = t.replace("Tv ", "TV ")
-    t = t.replace("Univ ", "University ")
-    t = t.replace("Educ ", "Education ")
-    t = t.replace("Crd ", "Coordinator ")
-    t = t.replace("Res ", "Research ")
-    t = t.replace("Dir ", "Director ")
-    t = t.replace("Pky ", "PK Yonge ")
-    t = t.replace("Rcv ", "Receiving ")
-    t = t.replace("Sr ", "Senior ")
-    t = t.replace("Spec ", "Specialist ")
-    t = t.replace("Spc ", "Specialist ")
-    t = t.replace("Spv ", "Supervisor ")
-    t = t.replace("Supv ", "Supervisor ")
-    t = t.replace("Supt ", "Superintendant ")
-    t = t.replace("Pky ", "P. K. Yonge ")
-    t = t.replace("Ii ", "II ")
-    t = t.replace("Iii ", "III ")
-    t = t.replace("Iv ", "IV ")
-    t = t.replace("Communic ", "Communications ")
-    t = t.replace("Postdoc ", "Postdoctoral ")
-    t = t.replace("Tech ", "Technician ")
-    t = t.replace("Vp ", "Vice President ")
-    t = t.replace(" @", "/") # restore /
-    t = t.replace(" @", "/")
-    t = t.replace(" !", ",") # restore ,
-    t = t.replace(" #", "-") # restore -
-    return t[:-1] # Take off the trailing space
+    return expand_abbreviations(t, JOBCODE_ABBREVIATIONS)
 
 def get_position_uris(person_uri):
     """
@@ -484,6 +493,78 @@ def get_person(person_uri, get_contact=True):
         
     return person
 
+def load_person(person_uri, get_contact=True):
+    """
+    Given the URI of a person in VIVO, return the same structure as
+    get_person.  get_person makes a query for the person, the vcard, the
+    name and each telephone, email and title.  Here the whole
+    person -> vcard -> name/telephone/email/title subgraph is fetched in one
+    query and get_person is run against it without further queries.
+    """
+    from vivofoundation import vivo_sparql_query
+    from vivofoundation import triples_by_subject
+    from vivofoundation import triples_cache
+    query = """
+    #  Return the triples of a person, the person's vcard and the entities
+    #  attached to the vcard
+
+    SELECT ?s ?p ?o
+      WHERE {
+        {
+          VALUES ?s { <person_uri> }
+          ?s ?p ?o .
+        }
+        UNION
+        {
+          <person_uri> obo:ARG_2000028 ?s .
+          ?s ?p ?o .
+        }
+        UNION
+        {
+          <person_uri> obo:ARG_2000028 ?vcard_uri .
+          ?vcard_uri vcard:hasName|vcard:hasTelephone|vcard:hasEmail|
+            vcard:hasTitle ?s .
+          ?s ?p ?o .
+        }
+    }
+    """
+    query = query.replace('person_uri', person_uri)
+    result = vivo_sparql_query(query)
+    try:
+        rows = result["results"]["bindings"]
+    except:
+        return get_person(person_uri, get_contact=get_contact)
+
+    #   Hold the subgraph while get_person runs, then let it go.  Triples
+    #   already held by the caller are left alone
+
+    subgraph = triples_by_subject(rows, [person_uri])
+    held = []
+    for uri in subgraph.keys():
+        if uri not in triples_cache:
+            triples_cache[uri] = subgraph[uri]
+            held.append(uri)
+    try:
+        person = get_person(person_uri, get_contact=get_contact)
+    finally:
+        for uri in held:
+            triples_cache.pop(uri, None)
+    return person
+
+def read_person(person_uri):
+    """
+    Given the URI of a person in VIVO, return the structure of load_person
+    with the person's positions, as returned by get_position, in
+    'positions'.  update_person then makes no queries of its own, so the
+    VIVO side of many updates can be read concurrently by threaded_map
+    """
+    person = load_person(person_uri)
+    positions = []
+    for position_uri in get_position_uris(person_uri):
+        positions.append(get_position(position_uri))
+    person['positions'] = positions
+    return person
+
 def get_degree(degree_uri):
     """
     Given a URI, return an object that contains the degree (educational
@@ -612,24 +693,24 @@ def add_position(person_uri, position):
     from vivofoundation import add_dti
     from vivofoundation import get_vivo_uri
     
-    ardf = ""
+    ardf = []
     position_uri = get_vivo_uri()
     dti = {'start' : position.get('start_date',None),
            'end': position.get('end_date',None)}
     [add, dti_uri] = add_dti(dti)
-    ardf = ardf + add
-    ardf = ardf + assert_resource_property(position_uri,
-            'rdf:type', position['position_type'])
-    ardf = ardf + assert_resource_property(position_uri,
-            'rdfs:label', position['position_label'])
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:dateTimeInterval', dti_uri)
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:relates', person_uri)
-    ardf = ardf + assert_resource_property(position_uri,
-            'vivo:relates', position['position_orguri'])
+    ardf.append(add)
+    ardf.append(assert_resource_property(position_uri,
+            'rdf:type', position['position_type']))
+    ardf.append(assert_resource_property(position_uri,
+            'rdfs:label', position['position_label']))
+    ardf.append(assert_resource_property(position_uri,
+            'vivo:dateTimeInterval', dti_uri))
+    ardf.append(assert_resource_property(position_uri,
+            'vivo:relates', person_uri))
+    ardf.append(assert_resource_property(position_uri,
+            'vivo:relates', position['position_orguri']))
     
-    return [ardf, position_uri]
+    return ["".join(ardf), position_uri]
 
 def add_vcard(person_uri, vcard):
     """
@@ -676,29 +757,29 @@ def add_vcard(person_uri, vcard):
         'name_prefix' : 'vcard:honoraryPrefix',
         'name_suffix' : 'vcard:honorarySuffix'
         }
-    ardf = ""
+    ardf = []
     vcard_uri = get_vivo_uri()
-    ardf = ardf + assert_resource_property(vcard_uri, 'rdf:type',
-                                           untag_predicate('vcard:Individual'))
-    ardf = ardf + assert_resource_property(person_uri, 'obo:ARG2000028',
-                                           vcard_uri) # hasContactInfo
-    ardf = ardf + assert_resource_property(vcard_uri, 'obo:ARG2000029',
-                                           person_uri) # contactInfoOf
+    ardf.append(assert_resource_property(vcard_uri, 'rdf:type',
+                                         untag_predicate('vcard:Individual')))
+    ardf.append(assert_resource_property(person_uri, 'obo:ARG2000028',
+                                         vcard_uri)) # hasContactInfo
+    ardf.append(assert_resource_property(vcard_uri, 'obo:ARG2000029',
+                                         person_uri)) # contactInfoOf
 
     # Create the name entity and attach to vcard. For each key in the
     # name_table, assert its value to the name entity
 
     name_uri = get_vivo_uri()
-    ardf = ardf + assert_resource_property(name_uri, 'rdf:type',
-                                           untag_predicate('vcard:Name'))
-    ardf = ardf + assert_resource_property(vcard_uri, 'vcard:hasName',
-                                           name_uri)
+    ardf.append(assert_resource_property(name_uri, 'rdf:type',
+                                         untag_predicate('vcard:Name')))
+    ardf.append(assert_resource_property(vcard_uri, 'vcard:hasName',
+                                         name_uri))
     for key in vcard.keys():
         if key in name_table:
             pred = name_table[key]
             val = vcard[key]
-            ardf = ardf + assert_data_property(name_uri,
-                pred, val)            
+            ardf.append(assert_data_property(name_uri,
+                pred, val)            )
 
     # Process single entry vcard bits of info:
     #   Go through the keys in the vcard.  If it's a single entry key, then
@@ -710,13 +791,13 @@ def add_vcard(person_uri, vcard):
             val = vcard[key]
             entry = single_entry[key]
             entry_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(entry_uri,
-                'rdf:type', untag_predicate(entry['type']))
-            ardf = ardf + assert_data_property(entry_uri,
-                entry['pred'], val)
-            ardf = ardf + assert_resource_property(vcard_uri,
-                entry['resource'], entry_uri)
-    return [ardf, vcard_uri]
+            ardf.append(assert_resource_property(entry_uri,
+                'rdf:type', untag_predicate(entry['type'])))
+            ardf.append(assert_data_property(entry_uri,
+                entry['pred'], val))
+            ardf.append(assert_resource_property(vcard_uri,
+                entry['resource'], entry_uri))
+    return ["".join(ardf), vcard_uri]
 
 def update_vcard(vivo_vcard, source_vcard):
     """
@@ -731,8 +812,8 @@ def update_vcard(vivo_vcard, source_vcard):
     from vivofoundation import assert_resource_property
     from vivofoundation import untag_predicate
 
-    ardf = ""
-    srdf = ""
+    ardf = []
+    srdf = []
 
     # Update the name entity
 
@@ -752,34 +833,34 @@ def update_vcard(vivo_vcard, source_vcard):
     
     if 'name' in source_vcard and 'name' not in vivo_vcard:
         name_uri = get_vivo_uri()
-        ardf = ardf + assert_resource_property(name_uri, 'rdf:type',
-                                           untag_predicate('vcard:Name'))
-        ardf = ardf + assert_resource_property(vcard['vcard_uri'],
-            'vcard:hasName', name_uri)
+        ardf.append(assert_resource_property(name_uri, 'rdf:type',
+                                           untag_predicate('vcard:Name')))
+        ardf.append(assert_resource_property(vcard['vcard_uri'],
+            'vcard:hasName', name_uri))
         vivo_vcard['name_uri'] = name_uri
         vivo_vcard['name'] = {}
     if 'name' in source_vcard:
         vivo_vcard['name']['uri'] = vivo_vcard['name_uri']
         [add, sub] = update_entity(vivo_vcard['name'],
                                    source_vcard['name'], name_keys)
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     #   Update title
 
     if 'title' in source_vcard and 'title' not in vivo_vcard:
         title_uri = get_vivo_uri()
-        ardf = ardf + assert_resource_property(title_uri, 'rdf:type',
-                                           untag_predicate('vcard:Title'))
-        ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-            'vcard:hasTitle', title_uri)
+        ardf.append(assert_resource_property(title_uri, 'rdf:type',
+                                           untag_predicate('vcard:Title')))
+        ardf.append(assert_resource_property(vivo_vcard['vcard_uri'],
+            'vcard:hasTitle', title_uri))
         vivo_vcard['title_uri'] = title_uri
         vivo_vcard['title'] = None
     if 'title' in source_vcard:
         [add, sub] = update_data_property(vivo_vcard['title_uri'],
             'vcard:title', vivo_vcard['title'], source_vcard['title'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     #   Update phone.  For now, assert a phone.  We can't seem to tell which
     #   phone is to be "updated".  If VIVO has telephones a and b, and the
@@ -793,10 +874,10 @@ def update_vcard(vivo_vcard, source_vcard):
     if 'phone' in source_vcard and source_vcard['phone'] is not None:
         if 'telephones' not in vivo_vcard or vivo_vcard['telephones'] == []:
             telephone_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasTelephone', telephone_uri)
-            ardf = ardf + assert_resource_property(telephone_uri,
-                'rdf:type', untag_predicate('vcard:telephone'))
+            ardf.append(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasTelephone', telephone_uri))
+            ardf.append(assert_resource_property(telephone_uri,
+                'rdf:type', untag_predicate('vcard:telephone')))
             telephone_value = None
         else:
             for telephone in vivo_vcard['telephones']:
@@ -806,18 +887,18 @@ def update_vcard(vivo_vcard, source_vcard):
                     continue
         [add, sub] = update_data_property(telephone_uri,
             'vcard:telephone', telephone_value, source_vcard['phone'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     #   Analogous processing with analogous comments for a fax number
 
     if 'fax' in source_vcard and source_vcard['fax'] is not None:
         if 'telephones' not in vivo_vcard or vivo_vcard['telephones'] == []:
             telephone_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasTelephone', telephone_uri)
-            ardf = ardf + assert_resource_property(telephone_uri,
-                'rdf:type', untag_predicate('vcard:Fax'))
+            ardf.append(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasTelephone', telephone_uri))
+            ardf.append(assert_resource_property(telephone_uri,
+                'rdf:type', untag_predicate('vcard:Fax')))
             telephone_value = None
         else:
             for telephone in vivo_vcard['telephones']:
@@ -827,8 +908,8 @@ def update_vcard(vivo_vcard, source_vcard):
                     continue
         [add, sub] = update_data_property(telephone_uri,
             'vcard:telephone', telephone_value, source_vcard['fax'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
 
     #   Analogous processing with analogous comments for an email address
 
@@ -837,20 +918,20 @@ def update_vcard(vivo_vcard, source_vcard):
         if 'email_addresses' not in vivo_vcard or \
            vivo_vcard['email_addresses'] == []:
             email_uri = get_vivo_uri()
-            ardf = ardf + assert_resource_property(vivo_vcard['vcard_uri'],
-                'vcard:hasEmail', email_uri)
-            ardf = ardf + assert_resource_property(email_uri,
-                'rdf:type', untag_predicate('vcard:Email'))
+            ardf.append(assert_resource_property(vivo_vcard['vcard_uri'],
+                'vcard:hasEmail', email_uri))
+            ardf.append(assert_resource_property(email_uri,
+                'rdf:type', untag_predicate('vcard:Email')))
             email_value = None
         else:
             email_uri = email_addresses[0]['email_uri']
             email_value = email_address[0]['email_address']
         [add, sub] = update_data_property(email_uri,
             'vcard:email', email_value, source_vcard['primary_email'])
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
     
-    return [ardf, srdf]
+    return ["".join(ardf), "".join(srdf)]
 
 def update_position(vivo_position, source_position):
     """
@@ -871,11 +952,11 @@ def update_position(vivo_position, source_position):
         'position_orguri': {'predicate':'vivo:relates','action':'resource'},
         'person_uri': {'predicate':'vivo:relates','action':'resource'}
         }
-    ardf = ""
-    srdf = ""
+    ardf = []
+    srdf = []
     [add, sub] = update_entity(vivo_position, source_position, update_keys)
-    ardf = ardf + add
-    srdf = srdf + sub
+    ardf.append(add)
+    srdf.append(sub)
 
     #  Compare the start and end dates of vivo and source.  If not
     #  equal, replace the vivo referent with a new datetime interval
@@ -891,10 +972,10 @@ def update_position(vivo_position, source_position):
         [add, dti_uri] = \
             add_dti({'start':source_position.get('start_date', None),
                                  'end':source_position.get('end_date', None)})
-        ardf = ardf + add
+        ardf.append(add)
         [add, sub] = update_resource_property(vivo_position['uri'],
             'vivo:dateTimeInterval', vivo_position.get('dti_uri',None), dti_uri)
-    return [ardf, srdf]
+    return ["".join(ardf), "".join(srdf)]
 
 def add_person(person):
     """
@@ -908,17 +989,17 @@ def add_person(person):
     from vivofoundation import untag_predicate
     from vivofoundation import get_vivo_uri
     
-    ardf = ""
+    ardf = []
     person_uri = get_vivo_uri()
 
     # Add direct assertions
 
     person_type = person['person_type']
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type', person_type)
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type',
-                        untag_predicate('ufv:UFEntity'))
-    ardf = ardf + assert_resource_property(person_uri, 'rdf:type',
-                        untag_predicate('ufv:UFCurrentEntity'))
+    ardf.append(assert_resource_property(person_uri, 'rdf:type', person_type))
+    ardf.append(assert_resource_property(person_uri, 'rdf:type',
+                        untag_predicate('ufv:UFEntity')))
+    ardf.append(assert_resource_property(person_uri, 'rdf:type',
+                        untag_predicate('ufv:UFCurrentEntity')))
 
     direct_data_preds = {'ufid':'ufv:ufid',
                          'privacy_flag':'ufv:privacyFlag',
@@ -930,12 +1011,12 @@ def add_person(person):
         if key in person:
             pred = direct_data_preds[key]
             val = person[key]
-            ardf = ardf + assert_data_property(person_uri, pred, val)
+            ardf.append(assert_data_property(person_uri, pred, val))
     for key in direct_resource_preds:
         if key in person:
             pred = direct_resource_preds[key]
             val = person[key]
-            ardf = ardf + assert_resource_property(person_uri, pred, val)
+            ardf.append(assert_resource_property(person_uri, pred, val))
 
     # Add Vcard Assertions
 
@@ -946,7 +1027,7 @@ def add_person(person):
         if key in person.keys():
             vcard[key] = person[key]
     [add, vcard_uri] = add_vcard(person_uri, vcard)
-    ardf = ardf + add
+    ardf.append(add)
 
     # Add Position Assertions
 
@@ -957,9 +1038,9 @@ def add_person(person):
             position[key] = person[key]
 
     [add, position_uri] = add_position(person_uri, position)
-    ardf = ardf + add
+    ardf.append(add)
     
-    return [ardf, person_uri]
+    return ["".join(ardf), person_uri]
 
 def update_person(vivo_person, source_person):
     """
@@ -976,6 +1057,9 @@ def update_person(vivo_person, source_person):
     Key values are grouped into three sets -- direct (attributes of the
     person directly), vcard attributes and position attributes
 
+    If vivo_person has the positions read by read_person, they are used.
+    Otherwise the positions are read from VIVO
+
     There are only 22 attributes.  How difficult could it be to update
     them in VIVO?
     """
@@ -1011,8 +1095,8 @@ def update_person(vivo_person, source_person):
     position_keys = ['position_label', 'end_date', 'position_type',
                      'position_orguri', 'start_date']
     
-    ardf = ""
-    srdf = ""
+    ardf = []
+    srdf = []
 
     #   Update some things.  This never goes well
     #   First.  The vivo entity has to have a key value 'uri'
@@ -1026,8 +1110,8 @@ def update_person(vivo_person, source_person):
 
     [add, sub] = update_entity(vivo_person, source_person, \
                                direct_key_table)
-    ardf = ardf + add
-    srdf = srdf + sub
+    ardf.append(add)
+    srdf.append(sub)
 
     #   Update vcard and its assertions
 
@@ -1045,8 +1129,8 @@ def update_person(vivo_person, source_person):
     print "Source Vcard:\n",json.dumps(source_vcard, indent=4)
     
     [add, sub] = update_vcard(vivo_vcard, source_vcard)
-    ardf = ardf + add
-    srdf = srdf + sub
+    ardf.append(add)
+    srdf.append(sub)
 
     #   Update position.  Examine each position.  If you find a match on
     #   department and title, update it.  Otherwise add it.
@@ -1055,10 +1139,14 @@ def update_person(vivo_person, source_person):
     for key in position_keys:
         source_position[key] = source_person[key]
     source_position['person_uri'] = person_uri
-    position_uris = get_position_uris(person_uri)
+    if 'positions' in vivo_person:
+        vivo_positions = vivo_person['positions']
+    else:
+        vivo_positions = []
+        for position_uri in get_position_uris(person_uri):
+            vivo_positions.append(get_position(position_uri))
     updated = False
-    for position_uri in position_uris:
-        vivo_position = get_position(position_uri)
+    for vivo_position in vivo_positions:
         print "\nVIVO position",vivo_position
         print "\nSource position",source_position
         if vivo_position.get('position_type',None) == \
@@ -1067,27 +1155,29 @@ def update_person(vivo_person, source_person):
             source_position.get('position_orguri',None):
             [add, sub] = update_position(vivo_position, source_position)
             updated = True
-            ardf = ardf + add
-            srdf = srdf + sub
+            ardf.append(add)
+            srdf.append(sub)
             continue
     if updated == False:
         [add, sub] = add_position(person_uri, source_position)
-        ardf = ardf + add
-        srdf = srdf + sub
+        ardf.append(add)
+        srdf.append(sub)
     
-    return [ardf, srdf]
+    return ["".join(ardf), "".join(srdf)]
 
 def make_ufid_dictionary(debug=False):
     """
     Make a dictionary for people in UF VIVO.  Key is UFID.  Value is URI.
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?ufid WHERE
     {
     ?x ufVivo:ufid ?ufid .
     }""")
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('ufid', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
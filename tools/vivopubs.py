@@ -9,37 +9,53 @@ __copyright__ = "Copyright 2014, University of Florida"
 __license__ = "BSD 3-Clause license"
 __version__ = "2.00"
 
+PUBMED_SEARCH_BATCH_SIZE = 50 # DOIs per esearch in get_pmids_from_dois
+PUBMED_BATCH_SIZE = 200 # PMIDs per efetch in get_pubmed_values_many
+ENTREZ_CACHE_DIR = "entrez_cache" # Entrez answers, by DOI and by PMID
+ENTREZ_CACHE_TTL = 30 # days an Entrez answer is used. 0 to always ask Entrez
+ENTREZ_OFFLINE = False # answer only from ENTREZ_CACHE_DIR, never ask Entrez
+MAX_AUTHORS = 0 # authors after this many are a corporate author. 0 for none
+PUB_ABBREVIATION_ENDS = set([' ']) # journal abbreviations end in a space
+
+author_index = None
+
+PUB_ABBREVIATIONS = """
+Dept|Department
+Soc|Society
+Med|Medical
+Natl|National
+Univ|University
+Publ|Publishers
+Am|American
+Assoc|Association
+Acad|Academy
+Of|of
+In|in
+As|as
+Ieee|IEEE
+A|a
+For|for
+And|and
+The|the
+Inst|Institute
+Sci|Science
+Amer|American
+'S|'s
+Ii|II
+Iii|III
+Iv|IV
+"""
+
 def abbrev_to_words(s):
     """
     Text is often abbreviated in the names of publishers and journals.
     This helper function takes a string s and returns an improved version
-    with abbreviations replaced by words.  Handle cosmetic improvements.
-    Replace special characters with escape versions for RDF
-    """
-    t = s.replace("Dept ", "Department ")
-    t = t.replace("Soc ", "Society ")
-    t = t.replace("Med ", "Medical ")
-    t = t.replace("Natl ", "National ")
-    t = t.replace("Univ ", "University ")
-    t = t.replace("Publ ", "Publishers ")
-    t = t.replace("Am ", "American ")
-    t = t.replace("Assoc ", "Association ")
-    t = t.replace("Acad ", "Academy ")
-    t = t.replace("Of ", "of ")
-    t = t.replace("In ", "in ")
-    t = t.replace("As ", "as ")
-    t = t.replace("Ieee ", "IEEE ")
-    t = t.replace("A ", "a ")
-    t = t.replace("For ", "for ")
-    t = t.replace("And ", "and ")
-    t = t.replace("The ", "the ")
-    t = t.replace("Inst ", "Institute ")
-    t = t.replace("Sci ", "Science ")
-    t = t.replace("Amer ", "American ")
-    t = t.replace("'S ", "'s ")
-    t = t.replace("Ii ", "II ")
-    t = t.replace("Iii ", "III ")
-    t = t.replace("Iv ", "IV ")
+    with abbreviations replaced by words, as given in PUB_ABBREVIATIONS.
+    Handle cosmetic improvements.  Replace special characters with escape
+    versions for RDF
+    """
+    from vivofoundation import expand_abbreviations
+    t = expand_abbreviations(s, PUB_ABBREVIATIONS, PUB_ABBREVIATION_ENDS)
     t = t.replace("\&", "&amp;")
     t = t.replace("<", "&lt;")
     t = t.replace(">", "&gt;")
@@ -105,7 +121,8 @@ def make_publisher_rdf(value):
     """
     Given a bibtex publication value, create the RDF for a publisher
     """
-    publisher_template = tempita.Template(
+    from vivofoundation import cached_template
+    publisher_template = cached_template(
     """
     <rdf:Description rdf:about="{{uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
@@ -170,7 +187,8 @@ def make_journal_rdf(value, journal_create, journal_name, journal_uri):
     Given a bibtex publication value, create the RDF for the journal of
     the journal of the publication if the journal is not already in VIVO
     """
-    journal_template = tempita.Template(
+    from vivofoundation import cached_template
+    journal_template = cached_template(
     """
     <rdf:Description rdf:about="{{journal_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
@@ -206,7 +224,8 @@ def make_publisher_journal_rdf(publisher_uri, journal_uri):
     Create the assertions PublisherOf and PublishedBy between a
     publisher and a journal
     """
-    publisher_journal_template = tempita.Template("""
+    from vivofoundation import cached_template
+    publisher_journal_template = cached_template("""
     <rdf:Description rdf:about="{{publisher_uri}}">
         <core:publisherOf  rdf:resource="{{journal_uri}}"/>
     </rdf:Description>
@@ -274,25 +293,105 @@ def name_parts(author):
     result = [last, first, middle, case]
     return result
 
-def update_dict(dict, key, val):
-    """
-    return a list of the results of dict[key] with val appended
-    """
-    try:
-        l = dict[key]
-    except:
-        l = []
-    l.append(val)
-    return l
-
-def make_people_dictionaries(debug=False):
-    """
-    Get all the UFEntity people from VIVO and build seven dictionaries:
-    put each person in as many dictionaries as they can be (between 1
-    and 7) based on the presence of their name parts in VIVO.  A last
-    name part is required to be in the SPARQL result set.
-    """
-    query = tempita.Template("""
+class AuthorIndex(object):
+    """
+    An index of people by name, for finding the authors of papers.  Each
+    person is filed under a key for each of the seven cases of name_parts
+    their name parts allow, as for the seven case dictionaries this
+    replaces.  Keys are the case number and the key_string of the name
+    parts, computed once per person.  The uris filed under a key are a
+    tuple.  Equal tuples are shared, so a person whose keys all lead to
+    them alone is held once however many keys they have.  Authors found
+    are remembered, so each author name is looked up once.
+
+        index = AuthorIndex([[uri, 'Conlon', 'Michael', 'W']])
+        uris = index.find('Conlon, M. W.')
+    """
+    __slots__ = ['index', 'found']
+
+    def __init__(self, people=None):
+        self.index = {}
+        self.found = {}
+        if people is not None:
+            self.add_people(people)
+
+    def name_keys(self, lname, fname, mname):
+        """
+        Given the last, first and middle names of a person, return the keys
+        to file the person under.  A person with a first and middle name
+        has seven keys, with a first name only three, with neither one
+        """
+        from vivofoundation import key_string
+        l = key_string(lname)
+        if len(fname) > 0 and len(mname) > 0:
+            f = key_string(fname)
+            f1 = key_string(fname[0])
+            m = key_string(mname)
+            m1 = key_string(mname[0])
+            return ['0' + l, '1' + l + f1, '2' + l + f, '3' + l + f1 + m1,
+                    '4' + l + f1 + m, '5' + l + f + m1, '6' + l + f + m]
+        elif len(fname) > 0:
+            return ['0' + l, '1' + l + key_string(fname[0]),
+                    '2' + l + key_string(fname)]
+        elif len(mname) == 0:
+            return ['0' + l]
+        return []
+
+    def add_people(self, people):
+        """
+        Given a list of people, each [uri, last, first, middle], file each
+        person under their keys
+        """
+        uris = {}
+        for [uri, lname, fname, mname] in people:
+            for key in self.name_keys(lname, fname, mname):
+                if key in uris:
+                    uris[key].append(uri)
+                else:
+                    uris[key] = [uri]
+        shared = {}
+        for key, key_uris in uris.items():
+            key_uris = self.index.get(key, ()) + tuple(key_uris)
+            self.index[key] = shared.setdefault(key_uris, key_uris)
+        self.found = {}
+
+    def find(self, author):
+        """
+        Given an author name in the form last, first middle, return the
+        list of uris of the people filed under the key for the author's case
+        """
+        if author in self.found:
+            return list(self.found[author])
+        from vivofoundation import key_string
+        [lname, fname, mname, case] = name_parts(author)
+        key = str(case) + key_string(lname)
+        if case in [1, 3, 4]:
+            key = key + key_string(fname[0])
+        elif case in [2, 5, 6]:
+            key = key + key_string(fname)
+        if case in [3, 5]:
+            key = key + key_string(mname[0])
+        elif case in [4, 6]:
+            key = key + key_string(mname)
+        self.found[author] = self.index.get(key, ())
+        return list(self.found[author])
+
+    def __len__(self):
+        return len(self.index)
+
+def make_author_index(debug=False):
+    """
+    Get all the UFEntity people from VIVO and return an AuthorIndex of them,
+    built in one pass.  A last name is required to be in the SPARQL result
+    set.  The query is run by cached_dictionary_query, so with
+    DICTIONARY_CACHE_TTL set, later runs refresh a snapshot of the people
+    rather than query them all again.  The index is kept as author_index
+    for find_author
+    """
+    global author_index
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?fname ?lname ?mname WHERE
     {
     ?x rdf:type foaf:Person .
@@ -302,7 +401,7 @@ def make_people_dictionaries(debug=False):
     OPTIONAL {?x foaf:firstName ?fname .}
     }""")
     query = query.substitute()
-    result = vivotools.vivo_sparql_query(query)
+    result = cached_dictionary_query('people', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -310,111 +409,25 @@ def make_people_dictionaries(debug=False):
     if debug:
         print query, count, result["results"]["bindings"][0],\
             result["results"]["bindings"][1]
-
-    # make the dictionaries
-    #
-    # Case 0 last name only
-    # Case 1 last name, first initial
-    # Case 2 last name, first name
-    # Case 3 last name, first initial, middle initial
-    # Case 4 last name, first initial, middle name
-    # Case 5 last name, first name, middle initial
-    # Case 6 last name, first name, middle name
-
-    case0_dict = {}
-    case1_dict = {}
-    case2_dict = {}
-    case3_dict = {}
-    case4_dict = {}
-    case5_dict = {}
-    case6_dict = {}
+    people = []
     i = 0
     while i < count:
         b = result["results"]["bindings"][i]
-        lname = b['lname']['value']
-        uri = b['x']['value']
-        try:
-            fname = b['fname']['value']
-        except:
-            fname = ""
-        try:
-            mname = b['mname']['value']
-        except:
-            mname = ""
-        if len(fname) > 0 and len(mname) > 0:
-
-            # seven cases here
-
-            k0 = vivotools.key_string(lname)
-            k1 = vivotools.key_string(lname + ':' + fname[0])
-            k2 = vivotools.key_string(lname + ':' + fname)
-            k3 = vivotools.key_string(lname + ':' + fname[0] +\
-                ':' + mname[0])
-            k4 = vivotools.key_string(lname + ':' + fname[0] +\
-                ':' + mname)
-            k5 = vivotools.key_string(lname + ':' + fname + ':' +\
-                mname[0])
-            k6 = vivotools.key_string(lname + ':' + fname + ':' +\
-                mname)
-            case0_dict[k0] = update_dict(case0_dict, k0, uri)
-            case1_dict[k1] = update_dict(case1_dict, k1, uri)
-            case2_dict[k2] = update_dict(case2_dict, k2, uri)
-            case3_dict[k3] = update_dict(case3_dict, k3, uri)
-            case4_dict[k4] = update_dict(case4_dict, k4, uri)
-            case5_dict[k5] = update_dict(case5_dict, k5, uri)
-            case6_dict[k6] = update_dict(case6_dict, k6, uri)
-        elif len(fname) > 0 and len(mname) == 0:
-
-            # three cases here
-
-            k0 = vivotools.key_string(lname)
-            k1 = vivotools.key_string(lname + ':' + fname[0])
-            k2 = vivotools.key_string(lname + ':' + fname)
-            case0_dict[k0] = update_dict(case0_dict, k0, uri)
-            case1_dict[k1] = update_dict(case1_dict, k1, uri)
-            case2_dict[k2] = update_dict(case2_dict, k2, uri)
-        elif len(fname) == 0 and len(mname) == 0:
-
-            # one case here
-
-            k0 = vivotools.key_string(lname)
-            case0_dict[k0] = update_dict(case0_dict, k0, uri)
+        people.append([b['x']['value'], b['lname']['value'],
+                       b.get('fname', {}).get('value', ""),
+                       b.get('mname', {}).get('value', "")])
         i = i + 1
-    return [case0_dict, case1_dict, case2_dict, case3_dict, case4_dict,\
-        case5_dict, case6_dict]
+    author_index = AuthorIndex(people)
+    return author_index
 
 def find_author(author):
     """
     Given an author name in the form last, first middle with middle
     and/or first eitehr blank or single character with or with periods,
-    find the name in the appropriate case dictionary.  The
-    case dictionaries are prepared using make_people_dictionaries
-    """
-    [lname, fname, mname, case] = name_parts(author)
-    [case0_dict, case1_dict, case2_dict, case3_dict, case4_dict,\
-        case5_dict, case6_dict] = dictionaries
-    if case == 0:
-        k0 = vivotools.key_string(lname)
-        result = case0_dict.get(k0, [])
-    elif case == 1:
-        k1 = vivotools.key_string(lname + ':' + fname[0])
-        result = case1_dict.get(k1, [])
-    elif case == 2:
-        k2 = vivotools.key_string(lname + ':' + fname)
-        result = case2_dict.get(k2, [])
-    elif case == 3:
-        k3 = vivotools.key_string(lname + ':' + fname[0] +':' + mname[0])
-        result = case3_dict.get(k3, [])
-    elif case == 4:
-        k4 = vivotools.key_string(lname + ':' + fname[0] + ':' + mname)
-        result = case4_dict.get(k4, [])
-    elif case == 5:
-        k5 = vivotools.key_string(lname + ':' + fname + ':' + mname[0])
-        result = case5_dict.get(k5, [])
-    else:
-        k6 = vivotools.key_string(lname + ':' + fname + ':' + mname)
-        result = case6_dict.get(k6, [])
-    return result
+    find the name in author_index, as prepared by make_author_index.
+    Return the list of uris of the people found
+    """
+    return author_index.find(author)
 
 def uf_affiliation(affiliation):
     """
@@ -433,6 +446,74 @@ def uf_affiliation(affiliation):
         k5 >= 0
     return isUF_affiliation
 
+class NameMatcher(object):
+    """
+    An Aho-Corasick matcher for a list of names.  matches finds every
+    occurrence of every name in a text, overlapping occurrences included,
+    in one pass over the text, however many names there are.
+
+        matcher = NameMatcher(['Childs, A.', 'Childs, A. Baker'])
+        for [start, end, name] in matcher.matches(text):
+            ...
+    """
+    __slots__ = ['goto', 'fail', 'out']
+
+    def __init__(self, names):
+        from collections import deque
+        self.goto = [{}]
+        self.out = [[]]
+        for name in names:
+            if len(name) == 0:
+                continue
+            state = 0
+            for c in name:
+                next_state = self.goto[state].get(c, None)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto.append({})
+                    self.out.append([])
+                    self.goto[state][c] = next_state
+                state = next_state
+            if name not in self.out[state]:
+                self.out[state].append(name)
+
+        #  Each state fails to the state of the longest proper suffix of its
+        #  text that is in the trie, and outputs the names of that state too
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for c, next_state in self.goto[state].items():
+                queue.append(next_state)
+                f = self.fail[state]
+                while f > 0 and c not in self.goto[f]:
+                    f = self.fail[f]
+                if state > 0:
+                    self.fail[next_state] = self.goto[f].get(c, 0)
+                self.out[next_state] = self.out[next_state] + \
+                    self.out[self.fail[next_state]]
+
+    def matches(self, text):
+        """
+        Return a list of [start, end, name], one for each occurrence of a
+        name in text, in the order the occurrences end
+        """
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        found = []
+        state = 0
+        i = 0
+        for c in text:
+            i = i + 1
+            while state > 0 and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for name in out[state]:
+                found.append([i - len(name), i, name])
+        return found
+
 def make_authors(value, debug=False):
     """
     Given a bibtex publication value, return a dictionary, one entry per
@@ -442,10 +523,16 @@ def make_authors(value, debug=False):
     from 0 to 6 indicating how much of a name we actually have.  See
     name_parts for description.
 
-    To do:  Add code to improve parsing of similar names.  The current
-    code can be confused if author names are subsets, such as Childs, A.
-    and Childs, A. Baker
+    The author names are found in the affiliation text in a single pass by
+    a NameMatcher, so papers of any number of authors are processed in
+    full.  If MAX_AUTHORS is more than zero, authors after the first
+    MAX_AUTHORS are placed in a corporate author.
+
+    Author names that are subsets of other names, such as Childs, A. and
+    Childs, A. Baker, are each found.  An affiliation naming Childs, A.
+    Baker also names Childs, A., so both are found in it
     """
+    import bisect
     authors = {}
     try:
         author_names = value.fields['author'].split(' and ')
@@ -455,33 +542,46 @@ def make_authors(value, debug=False):
         affiliation_text = value.fields['affiliation']
     except:
         affiliation_text = ""
-    if len(author_names) > MAX_AUTHORS:
+    if MAX_AUTHORS > 0 and len(author_names) > MAX_AUTHORS:
         other_authors = ";".join(author_names[MAX_AUTHORS:])
         author_names = author_names[0:MAX_AUTHORS]
         author_names.append(other_authors)
 
-    #  prepare the affiliation_list
-
     order = 0
     for author in author_names:
         order = order + 1
-        if order > MAX_AUTHORS:
+        if MAX_AUTHORS > 0 and order > MAX_AUTHORS:
             authors[author] = [order, False, False, True, author,
                 "", "", None]
             break
         authors[author] = [order, False, False, False] + name_parts(author)
-        k = affiliation_text.find(author)
-        auth = author
-        auth = author.replace('.', '+')
-        if auth == author:
-            continue # nothing to do, there are no periods to replace
-        else:
-            while k >= 0:
-                affiliation_text = affiliation_text.replace(author, "/" +\
-                    auth + "/", 1)
-                k = affiliation_text.find(author)
-    affiliation_list = affiliation_text.split('.')
-    affiliation_list = affiliation_list[0:-1]
+
+    #  prepare the affiliation_list.  Affiliations end with a period.
+    #  Periods in author names, as in Conlon, M. W., do not end an
+    #  affiliation.  Each affiliation keeps the names of the authors found in
+    #  it
+
+    found = NameMatcher(author_names).matches(affiliation_text)
+    in_name = set()
+    for [start, end, author] in found:
+        if author.find('.') >= 0:
+            in_name.update(xrange(start, end))
+    affiliation_list = []
+    affiliation_starts = []
+    affiliation_authors = []
+    start = 0
+    k = affiliation_text.find('.')
+    while k >= 0:
+        if k not in in_name:
+            affiliation_list.append(affiliation_text[start:k])
+            affiliation_starts.append(start)
+            affiliation_authors.append(set())
+            start = k + 1
+        k = affiliation_text.find('.', k + 1)
+    for [start, end, author] in found:
+        j = bisect.bisect_right(affiliation_starts, start) - 1
+        if j >= 0 and end <= affiliation_starts[j] + len(affiliation_list[j]):
+            affiliation_authors[j].add(author)
 
     # find the corresponding author. Corresponding authors are not listed by
     # full name. Typically they are listed by last name, first initial, but
@@ -489,11 +589,17 @@ def make_authors(value, debug=False):
     # could result in an error if two authors have the same last name and
     # the first one is not the corresponding author
 
+    last_names = None
     for affiliation in affiliation_list:
+        if affiliation.find('(Reprint Author)') < 0:
+            continue
+        if last_names is None:
+            last_names = NameMatcher([authors[author][4] for author in
+                                      author_names])
+        found_last_names = set([name for [start, end, name] in
+                                last_names.matches(affiliation)])
         for author in author_names:
-            last_name = authors[author][4]
-            if affiliation.find(last_name) >= 0 and\
-                affiliation.find('(Reprint Author)') >= 0:
+            if authors[author][4] in found_last_names:
                 authors[author][1] = True
 
                 # while we are here, check to see if this is a UF affiliation.
@@ -516,11 +622,8 @@ def make_authors(value, debug=False):
     # if all the affiliations are UF affiliations, then all the authors are
     # UF authors
 
-    count_uf_affiliations = 0
-    for a in affiliation_list:
-        if uf_affiliation(a):
-            count_uf_affiliations = count_uf_affiliations + 1
-    if len(affiliation_list) == count_uf_affiliations:
+    uf_list = [uf_affiliation(a) for a in affiliation_list]
+    if False not in uf_list:
 
         # all affiliations are UF, so all authors are UF
 
@@ -530,18 +633,19 @@ def make_authors(value, debug=False):
 
         # Not all the affiliations are UF, so we need to check each one
 
-        for a in affiliation_list:
-            affiliation = a.replace('+', '.')
-            if uf_affiliation(affiliation):
+        j = 0
+        while j < len(affiliation_list):
+            if uf_list[j]:
                 if len(author_names) == 1:
                     authors[author_names[0]][2] = True
                 else:
-                    for author in author_names:
-                        if debug:
-                            print "...Looking for>" + author +\
-                                "< in UF affiliation>" + affiliation + "<"
-                        if affiliation.find(author) >= 0:
-                            authors[author][2] = True
+                    if debug:
+                        print "...Found>" + \
+                            "<>".join(sorted(affiliation_authors[j])) + \
+                            "< in UF affiliation>" + affiliation_list[j] + "<"
+                    for author in affiliation_authors[j]:
+                        authors[author][2] = True
+            j = j + 1
     return authors
 
 def count_uf_authors(authors, debug=False):
@@ -592,7 +696,8 @@ def make_author_rdf(value):
     Otherwise produce RDF for authors to be added
     Return the URIs of all authors (found or added)
     """
-    author_template = tempita.Template("""
+    from vivofoundation import cached_template
+    author_template = cached_template("""
     <rdf:Description rdf:about="{{author_uri}}">
         <rdfs:label>{{author_name}}</rdfs:label>
         {{if len(first) > 0:}}
@@ -611,7 +716,7 @@ def make_author_rdf(value):
         <ufVivo:dateHarvested>{{harvest_datetime}}</ufVivo:dateHarvested>
     </rdf:Description>
     """)
-    corporate_author_template = tempita.Template("""
+    corporate_author_template = cached_template("""
     <rdf:Description rdf:about="{{author_uri}}">
         <rdfs:label>{{group_name}}</rdfs:label>
         <core:overview>{{author_name}}</core:overview>
@@ -719,7 +824,8 @@ def make_authorship_rdf(authors, publication_uri):
     Authorships link authors to publications, supporting the many-to-many
     relationship between authors and publications.
     """
-    authorship_template = tempita.Template("""
+    from vivofoundation import cached_template
+    authorship_template = cached_template("""
     <rdf:Description rdf:about="{{authorship_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <rdf:type rdf:resource="http://vivoweb.org/ontology/core#Authorship"/>
@@ -754,7 +860,8 @@ def make_author_in_authorship_rdf(authors, authorship_uris):
     publication, create the RDF for the AuthorInAuthorship relationships of
     people to authorships.
     """
-    author_in_authorship_template = tempita.Template("""
+    from vivofoundation import cached_template
+    author_in_authorship_template = cached_template("""
     <rdf:Description rdf:about="{{author_uri}}">
         <core:authorInAuthorship rdf:resource="{{authorship_uri}}"/>
     </rdf:Description>
@@ -778,7 +885,8 @@ def make_journal_publication_rdf(journal_uri, publication_uri):
     Create the assertions publicationVenueFor and hasPublicationVenue between
     a journal and a publication
     """
-    journal_publication_template = tempita.Template("""
+    from vivofoundation import cached_template
+    journal_publication_template = cached_template("""
     <rdf:Description rdf:about="{{journal_uri}}">
         <core:publicationVenueFor  rdf:resource="{{publication_uri}}"/>
     </rdf:Description>
@@ -889,7 +997,8 @@ def make_publication_rdf(value, title, publication_uri, datetime_uri,\
     previously created or discovered objects, including the timestamp, the
     journal and the authorships
     """
-    publication_template = tempita.Template("""
+    from vivofoundation import cached_template
+    publication_template = cached_template("""
     <rdf:Description rdf:about="{{publication_uri}}">
         <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
         <ufVivo:dateHarvested>{{harvest_datetime}}</ufVivo:dateHarvested>
@@ -1075,6 +1184,66 @@ def make_pub_datetime(value):
     document['date'] = {'month':str(month), 'day':'1', 'year':str(year)}
     return dt.isoformat()
 
+def entrez_cache_file_name(key):
+    """
+    Given a cache key, return the name of the file in ENTREZ_CACHE_DIR
+    holding the answer for the key.  Files are named by the SHA-1 of the key
+    in subdirectories named by its first two characters
+    """
+    import hashlib
+    import os
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(ENTREZ_CACHE_DIR, digest[0:2], digest + ".json")
+
+def entrez_cache_get(key):
+    """
+    Given a key such as doi:10.1016/j.arcmed.2006.09.002 or pmid:17174768,
+    return [True, answer] if an answer to the Entrez request for the key is
+    in ENTREZ_CACHE_DIR and younger than ENTREZ_CACHE_TTL days, or
+    [False, None] if not.  With ENTREZ_OFFLINE, answers of any age are used
+    """
+    from datetime import datetime
+    from datetime import timedelta
+    import json
+    import os
+    if ENTREZ_CACHE_TTL <= 0 and not ENTREZ_OFFLINE:
+        return [False, None]
+    file_name = entrez_cache_file_name(key)
+    if not os.path.exists(file_name):
+        return [False, None]
+    try:
+        cache_file = open(file_name)
+        entry = json.load(cache_file)
+        cache_file.close()
+    except ValueError:
+        return [False, None]
+    if entry['key'] != key:
+        return [False, None]
+    age = datetime.now() - \
+        datetime.strptime(entry['taken'], '%Y-%m-%dT%H:%M:%S')
+    if not ENTREZ_OFFLINE and age >= timedelta(days=ENTREZ_CACHE_TTL):
+        return [False, None]
+    return [True, entry['answer']]
+
+def entrez_cache_put(key, answer):
+    """
+    Keep the answer to the Entrez request for key in ENTREZ_CACHE_DIR
+    """
+    from datetime import datetime
+    import json
+    import os
+    if ENTREZ_CACHE_TTL <= 0:
+        return
+    file_name = entrez_cache_file_name(key)
+    directory = os.path.dirname(file_name)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    entry = {'key': key, 'answer': answer,
+             'taken': datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}
+    cache_file = open(file_name + ".tmp", "w")
+    json.dump(entry, cache_file)
+    cache_file.close()
+    os.rename(file_name + ".tmp", file_name)
 
 def get_pmid_from_doi(doi, email='mconlon@ufl.edu', tool='PythonQuery',
                       database='pubmed'):
@@ -1083,7 +1252,14 @@ def get_pmid_from_doi(doi, email='mconlon@ufl.edu', tool='PythonQuery',
     found in PubMed, return None. Adapted from
     http://simon.net.nz/articles/query-pubmed-for-citation-information-
         using-a-doi-and-python/
+
+    Answers are kept by entrez_cache_put, including DOIs not in PubMed
     """
+    [found, pmid] = entrez_cache_get('doi:' + doi.lower())
+    if found:
+        return pmid
+    if ENTREZ_OFFLINE:
+        return None
     params = {'db':database, 'tool':tool, 'email':email, 'term': doi,
         'usehistory':'y', 'retmax':1}
     url = 'http://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?' + \
@@ -1103,7 +1279,7 @@ def get_pmid_from_doi(doi, email='mconlon@ufl.edu', tool='PythonQuery',
                 pmid = None
             else:
                 pmid = ids[0].childNodes[0].data
-            return pmid
+            break
         except:
             count = count + 1
             if count > retries:
@@ -1113,7 +1289,8 @@ def get_pmid_from_doi(doi, email='mconlon@ufl.edu', tool='PythonQuery',
                 " Will sleep now for "+str(sleep_seconds)+ \
                 " seconds and retry -->"
             time.sleep(sleep_seconds) # increase the wait time with each retry
-
+    entrez_cache_put('doi:' + doi.lower(), pmid)
+    return pmid
 
 def get_pubmed_values(doi, pmid= None, debug=False):
     """
@@ -1123,6 +1300,8 @@ def get_pubmed_values(doi, pmid= None, debug=False):
 
     Return items in a dictionary.  Grants_cited and keywod_list are
     lists of strings.
+
+    The values of a PMID are kept by entrez_cache_put
     """
     Entrez.email = 'mconlon@ufl.edu'
     values = {}
@@ -1134,6 +1313,12 @@ def get_pubmed_values(doi, pmid= None, debug=False):
             return {}
     else:
         values['pmid'] = pmid
+    [found, entry] = entrez_cache_get('pmid:' + str(pmid))
+    if found:
+        values.update(entry['values'])
+        return values
+    if ENTREZ_OFFLINE:
+        return {}
 
     # Get record(s) from Entrez.  Retry if Entrez does not respond
 
@@ -1157,37 +1342,12 @@ def get_pubmed_values(doi, pmid= None, debug=False):
 
     # Find the desired attributes in the record structures returned by Entrez
 
+    dois = []
     for record in records:
         if debug:
             print "Entrez record:", record
-        article_id_list = record['PubmedData']['ArticleIdList']
-        for article_id in article_id_list:
-            attributes = article_id.attributes
-            if 'IdType' in attributes:
-                if attributes['IdType'] == 'pmc':
-                    values["pmcid"] = str(article_id)
-                if attributes['IdType'] == 'mid':
-                    values["nihmsid"] = str(article_id)
-        try:
-            values['abstract'] = \
-                record['MedlineCitation']['Article']['Abstract']\
-                ['AbstractText'][0]
-        except:
-            pass
-        try:
-            keywords = record['MedlineCitation']['MeshHeadingList']
-            for keyword in keywords:
-                keyword_list.append(str(keyword['DescriptorName']))
-            values["keyword_list"] = keyword_list
-        except:
-            pass
-        try:
-            grants = record['MedlineCitation']['Article']['GrantList']
-            for grant in grants:
-                grants_cited.append(grant['GrantID'])
-            values["grants_cited"] = grants_cited
-        except:
-            pass
+        pubmed_record_values(record, values, keyword_list, grants_cited)
+        dois.extend(pubmed_record_dois(record))
 
     # If we found a pmcid, construct the full text uri by formula
 
@@ -1195,8 +1355,206 @@ def get_pubmed_values(doi, pmid= None, debug=False):
         values["full_text_uri"] = \
             "http://www.ncbi.nlm.nih.gov/pmc/articles/" + \
             values["pmcid"].upper()+ "/pdf"
+    record_values = dict(values)
+    record_values.pop('pmid', None)
+    entrez_cache_put('pmid:' + str(pmid), {'dois': dois,
+                                           'values': record_values})
+    return values
+
+def pubmed_record_values(record, values, keyword_list, grants_cited):
+    """
+    Given a record returned by Entrez for a paper in PubMed, put its PMCID,
+    NIHMSID, abstract, keywords and grants cited in values, as returned by
+    get_pubmed_values.  Keywords and grants cited are appended to the lists
+    given
+    """
+    article_id_list = record['PubmedData']['ArticleIdList']
+    for article_id in article_id_list:
+        attributes = article_id.attributes
+        if 'IdType' in attributes:
+            if attributes['IdType'] == 'pmc':
+                values["pmcid"] = str(article_id)
+            if attributes['IdType'] == 'mid':
+                values["nihmsid"] = str(article_id)
+    try:
+        values['abstract'] = \
+            record['MedlineCitation']['Article']['Abstract']\
+            ['AbstractText'][0]
+    except:
+        pass
+    try:
+        keywords = record['MedlineCitation']['MeshHeadingList']
+        for keyword in keywords:
+            keyword_list.append(str(keyword['DescriptorName']))
+        values["keyword_list"] = keyword_list
+    except:
+        pass
+    try:
+        grants = record['MedlineCitation']['Article']['GrantList']
+        for grant in grants:
+            grants_cited.append(grant['GrantID'])
+        values["grants_cited"] = grants_cited
+    except:
+        pass
     return values
 
+def pubmed_record_dois(record):
+    """
+    Given a record returned by Entrez for a paper in PubMed, return the DOIs
+    of the paper, lower cased
+    """
+    dois = []
+    for article_id in record['PubmedData']['ArticleIdList']:
+        if article_id.attributes.get('IdType', None) == 'doi':
+            dois.append(str(article_id).lower())
+    try:
+        for location in record['MedlineCitation']['Article']['ELocationID']:
+            if location.attributes.get('EIdType', None) == 'doi':
+                dois.append(str(location).lower())
+    except KeyError:
+        pass
+    return dois
+
+def entrez_request(request, retries=10, start=2.0):
+    """
+    Given a function making a request of Entrez, return its result.  Retry
+    if Entrez does not respond, waiting longer before each retry.  Return
+    None if Entrez has not responded after retries
+    """
+    import time
+    count = 0
+    while True:
+        try:
+            return request()
+        except:
+            count = count + 1
+            if count > retries:
+                return None
+            sleep_seconds = start**count
+            print "<!-- Failed Entrez query. Count = "+str(count)+ \
+                " Will sleep now for "+str(sleep_seconds)+ \
+                " seconds and retry -->"
+            time.sleep(sleep_seconds) # increase the wait time with each retry
+
+def get_pmids_from_dois(dois, email='mconlon@ufl.edu', tool='PythonQuery'):
+    """
+    Given a list of DOIs, return the PMIDs of the PubMed articles with any of
+    the DOIs, searching for PUBMED_SEARCH_BATCH_SIZE DOIs at a time.  PMIDs
+    are not matched to DOIs here.  See get_pubmed_values_many.  Return None
+    if Entrez does not respond
+    """
+    from Bio import Entrez
+    Entrez.email = email
+    Entrez.tool = tool
+    pmids = []
+    start = 0
+    while start < len(dois):
+        batch = dois[start:start+PUBMED_SEARCH_BATCH_SIZE]
+        start = start + PUBMED_SEARCH_BATCH_SIZE
+        term = " OR ".join(['"' + doi.replace('"', '') + '"[doi]'
+                            for doi in batch])
+        result = entrez_request(lambda: Entrez.read(Entrez.esearch(
+            db="pubmed", term=term, retmax=2*len(batch))))
+        if result is None:
+            return None
+        pmids.extend(result['IdList'])
+    return pmids
+
+def get_pubmed_values_many(dois, debug=False):
+    """
+    Given a list of DOIs, return a dictionary keyed by DOI of the PubMed
+    values of each paper, as returned by get_pubmed_values, with the PMID.
+    The PMIDs of all the papers are found by get_pmids_from_dois and their
+    records fetched PUBMED_BATCH_SIZE at a time, so a few Entrez requests
+    serve a whole bibtex file.  Records are matched to DOIs by the DOIs in
+    the records, ignoring case.  DOIs not found in PubMed have the value {}
+
+    Answers for DOIs and PMIDs seen before are taken from ENTREZ_CACHE_DIR,
+    see entrez_cache_get.  Only the others are searched for and fetched
+    """
+    from Bio import Entrez
+    Entrez.email = 'mconlon@ufl.edu'
+    pubmed_values = {}
+    requested = {}
+    for doi in dois:
+        pubmed_values[doi] = {}
+        requested.setdefault(doi.lower(), []).append(doi)
+    complete = True
+
+    # PMIDs of DOIs seen before are in the cache.  Search for the others
+
+    pmids = []
+    search = []
+    for doi in requested.keys():
+        [found, pmid] = entrez_cache_get('doi:' + doi)
+        if found:
+            if pmid is not None:
+                pmids.append(pmid)
+        elif not ENTREZ_OFFLINE:
+            search.append(doi)
+    found_pmids = get_pmids_from_dois(search)
+    if found_pmids is None:
+        complete = False
+        found_pmids = []
+    for pmid in found_pmids:
+        if pmid not in pmids:
+            pmids.append(pmid)
+
+    # Values of PMIDs seen before are in the cache.  Fetch the others
+
+    entries = {}
+    fetch = []
+    for pmid in pmids:
+        [found, entry] = entrez_cache_get('pmid:' + pmid)
+        if found:
+            entries[pmid] = entry
+        elif not ENTREZ_OFFLINE:
+            fetch.append(pmid)
+    start = 0
+    while start < len(fetch):
+        batch = fetch[start:start+PUBMED_BATCH_SIZE]
+        start = start + PUBMED_BATCH_SIZE
+        records = entrez_request(lambda: Entrez.read(Entrez.efetch(
+            db="pubmed", id=",".join(batch), retmode="xml")))
+        if records is None:
+            complete = False
+            continue
+        if isinstance(records, dict):
+            records = records['PubmedArticle'] # Biopython 1.70 and later
+        for record in records:
+            if debug:
+                print "Entrez record:", record
+            pmid = str(record['MedlineCitation']['PMID'])
+            values = pubmed_record_values(record, {}, [], [])
+            if 'pmcid' in values:
+                values["full_text_uri"] = \
+                    "http://www.ncbi.nlm.nih.gov/pmc/articles/" + \
+                    values["pmcid"].upper()+ "/pdf"
+            entries[pmid] = {'dois': pubmed_record_dois(record),
+                             'values': values}
+            entrez_cache_put('pmid:' + pmid, entries[pmid])
+
+    # Match the records to the DOIs requested
+
+    for pmid in pmids:
+        if pmid not in entries:
+            continue
+        for record_doi in entries[pmid]['dois']:
+            for doi in requested.get(record_doi, []):
+                if pubmed_values[doi] == {}:
+                    values = dict(entries[pmid]['values'])
+                    values['pmid'] = pmid
+                    pubmed_values[doi] = values
+
+    # Keep the PMID of each DOI searched for.  If every request was answered,
+    # DOIs without a record are not in PubMed.  Keep that too
+
+    for doi in search:
+        pmid = pubmed_values[requested[doi][0]].get('pmid', None)
+        if pmid is not None or complete:
+            entrez_cache_put('doi:' + doi, pmid)
+    return pubmed_values
+
 def get_authorship(authorship_uri):
     """
     Given a URI, return an object that contains the authorship it represents
@@ -1369,7 +1727,9 @@ def make_doi_dictionary(debug=False):
     Extract all the dois of documents in VIVO and organize them into a
     dictionary keyed by prepared label with value URI
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?doi WHERE
     {
     ?x rdf:type bibo:Document .
@@ -1377,7 +1737,7 @@ def make_doi_dictionary(debug=False):
     }""")
     doi_dictionary = {}
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('doi', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1401,7 +1761,9 @@ def make_title_dictionary(debug=False):
     Extract all the titles of documents in VIVO and organize them into a
     dictionary keyed by prepared label with value URI
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?label WHERE
     {
     ?x rdf:type bibo:Document .
@@ -1409,7 +1771,7 @@ def make_title_dictionary(debug=False):
     }""")
     title_dictionary = {}
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('title', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1448,14 +1810,16 @@ def make_publisher_dictionary(debug=False):
     Extract all the publishers from VIVO and organize them into a dictionary
     keyed by prepared label with value URI
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?label WHERE
     {
     ?x rdf:type core:Publisher .
     ?x rdfs:label ?label .
     }""")
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('publisher', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1495,14 +1859,16 @@ def make_journal_dictionary(debug=False):
     Extract all the journals from VIVO and organize them into a dictionary
     keyed by ISSN with value URI
     """
-    query = tempita.Template("""
+    from vivofoundation import cached_template
+    from vivofoundation import cached_dictionary_query
+    query = cached_template("""
     SELECT ?x ?issn WHERE
     {
     ?x rdf:type bibo:Journal .
     ?x bibo:issn ?issn .
     }""")
     query = query.substitute()
-    result = vivo_sparql_query(query)
+    result = cached_dictionary_query('journal', query, 'x', debug=debug)
     try:
         count = len(result["results"]["bindings"])
     except:
@@ -1542,7 +1908,8 @@ def catalyst_pmid_request(first, middle, last, email, debug=False):
 
     Uses HTTP XML Post request, by www.forceflow.be
     """
-    request = tempita.Template("""
+    from vivofoundation import cached_template
+    request = cached_template("""
         <?xml version="1.0"?>
         <FindPMIDs>
             <Name>
@@ -1711,12 +2078,19 @@ def string_from_document(doc):
         s = s + ' pmcid: ' + doc['pmcid']
     return s
 
-def update_pubmed(pub_uri, doi=None, pmid=None, inVivo=True):
+def update_pubmed(pub_uri, doi=None, pmid=None, inVivo=True, values=None):
     """
     Given the uri of a pub in VIVO and a module concept dictionary,
     update the PubMed attributes for the paper, and include RDF
-    to add to the concept dictionary if necessary
-    """
+    to add to the concept dictionary if necessary.  If values are given, as
+    returned by get_pubmed_values_many, PubMed is not queried
+    """
+    from vivofoundation import concept_dictionary
+    from vivofoundation import make_concept_rdf
+    from vivofoundation import make_webpage_rdf
+    from vivofoundation import remove_uri
+    from vivofoundation import update_data_property
+    from vivofoundation import update_resource_property
     ardf = ""
     srdf = ""
     if inVivo:
@@ -1748,10 +2122,13 @@ def update_pubmed(pub_uri, doi=None, pmid=None, inVivo=True):
 
     # Get the paper's attributes from PubMed
 
-    try:
-        values = get_pubmed_values(doi, pmid)
-    except:
-        return {}
+    if values is None:
+        try:
+            values = get_pubmed_values(doi, pmid)
+        except:
+            return {}
+    else:
+        values = dict(values)
 
     if values == {}:
         return ["", ""]